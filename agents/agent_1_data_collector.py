@@ -4,24 +4,39 @@ Converts Gregorian date to Lunar calendar, calculates Can Chi, and Personal Day
 """
 
 from datetime import datetime
-from core.lunar_calendar import get_lunar_date, format_lunar_date, get_season_from_lunar_month
-from core.can_chi import get_can_chi_day, get_truc
-from core.numerology import calculate_personal_day_number
+from typing import Iterable, List
+from core.almanac import get_almanac, encode_days, FLAG_LEAP_MONTH, NUMPY_FIELDS
+from core.lunar_calendar import get_lunar_date, format_lunar_date, get_season_index
+from core.lunar_table import FIRST_ORDINAL, END_ORDINAL, FIRST_YEAR
+from core.can_chi import (
+    get_can_chi_day, get_can_chi_many, get_truc_index, REFERENCE_DATE, CAN_ELEMENT_INDEX, CHI_ELEMENT_INDEX
+)
+from core.constants import (
+    THIEN_CAN, DIA_CHI, CHI_TO_ANIMAL, NGU_HANH, SEASONS, TRUC_12
+)
+from core.numerology import calculate_personal_day_number, reduce_to_single_digit
+from core.seed import stable_seed
+
+# reduce_to_single_digit for every sum a personal day number can reach
+_REDUCED = [reduce_to_single_digit(n) for n in range(64)]
 
 
 class DataCollectorAgent:
     """Agent responsible for collecting and converting temporal data"""
     
-    def __init__(self, user_birth_day: int, user_birth_month: int):
+    def __init__(self, user_birth_day: int, user_birth_month: int, profile_key: tuple = None):
         """
         Initialize the Data Collector Agent
         
         Args:
             user_birth_day: User's birth day
             user_birth_month: User's birth month
+            profile_key: Values identifying the profile, mixed into the forecast seed
+                (defaults to birth day and month)
         """
         self.user_birth_day = user_birth_day
         self.user_birth_month = user_birth_month
+        self.profile_key = profile_key or (user_birth_day, user_birth_month)
     
     def analyze(self, target_date: datetime) -> dict:
         """
@@ -33,16 +48,93 @@ class DataCollectorAgent:
         Returns:
             Complete temporal analysis including lunar date, Can Chi, and numerology
         """
-        # Convert to lunar calendar
-        lunar_info = get_lunar_date(target_date)
-        lunar_formatted = format_lunar_date(lunar_info)
-        season = get_season_from_lunar_month(lunar_info["lunar_month"])
+        return self._analyze(target_date, datetime.now().isoformat())
+    
+    def analyze_many(self, target_dates: Iterable[datetime]) -> List[dict]:
+        """
+        Collect temporal data for a batch of dates
+        Lunar dates, Trực and seasons come from the almanac records (or are encoded
+        for the batch's span in one pass), Can Chi from the vectorized engine.
+        
+        Args:
+            target_dates: The dates to analyze
+            
+        Returns:
+            List of results in the same format as analyze()
+        """
+        import numpy as np
+        
+        target_dates = list(target_dates)
+        if not target_dates:
+            return []
+        
+        # One timestamp for the whole batch
+        timestamp = datetime.now().isoformat()
         
-        # Get Can Chi for the day
-        can_chi_info = get_can_chi_day(target_date)
+        ordinals = np.fromiter((d.toordinal() for d in target_dates), dtype=np.int64, count=len(target_dates))
+        first, last = int(ordinals.min()), int(ordinals.max())
+        if first < FIRST_ORDINAL or last >= END_ORDINAL:
+            # Outside the lunar table: the single-date path raises the usual error
+            return [self._analyze(target_date, timestamp) for target_date in target_dates]
         
-        # Calculate Trực (Duty God)
-        truc = get_truc(lunar_info["lunar_month"], can_chi_info["chi_index"])
+        almanac = get_almanac()
+        if almanac is not None and almanac.first_ordinal <= first and last < almanac.end_ordinal:
+            records = almanac.as_numpy()[ordinals - almanac.first_ordinal]
+        else:
+            records = np.frombuffer(encode_days(first, last + 1), dtype=np.dtype(NUMPY_FIELDS))[ordinals - first]
+        can_chi = get_can_chi_many(ordinals - REFERENCE_DATE.toordinal())
+        
+        columns = zip(
+            target_dates,
+            (records["lunar_year_offset"].astype(np.int32) + FIRST_YEAR).tolist(),
+            records["lunar_month"].tolist(),
+            records["lunar_day"].tolist(),
+            (records["flags"] & FLAG_LEAP_MONTH).astype(bool).tolist(),
+            can_chi["can"].tolist(),
+            can_chi["chi"].tolist(),
+            records["truc"].tolist(),
+            records["season"].tolist()
+        )
+        
+        # Personal day number: only the date part changes within the batch
+        birth_part = _REDUCED[self.user_birth_day] + _REDUCED[self.user_birth_month]
+        year_parts = {}
+        results = []
+        for target_date, *fields in columns:
+            year_part = year_parts.get(target_date.year)
+            if year_part is None:
+                year_part = year_parts[target_date.year] = reduce_to_single_digit(
+                    sum(int(d) for d in str(target_date.year))
+                )
+            personal_day_number = _REDUCED[
+                _REDUCED[target_date.day] + _REDUCED[target_date.month] + year_part + birth_part
+            ]
+            results.append(self._build_result(target_date, timestamp, *fields, personal_day_number))
+        return results
+    
+    def _analyze(self, target_date: datetime, timestamp: str) -> dict:
+        """Collect all temporal data for the target date (see analyze)"""
+        almanac = get_almanac()
+        if almanac is not None and target_date in almanac:
+            # Precomputed: lunar date, Can Chi, Trực and season in one record
+            (lunar_year, lunar_month, lunar_day, is_leap_month,
+             can_index, chi_index, truc_index, season_index, _) = almanac.lookup(target_date)
+        else:
+            # Convert to lunar calendar
+            lunar_info = get_lunar_date(target_date)
+            lunar_year = lunar_info["lunar_year"]
+            lunar_month = lunar_info["lunar_month"]
+            lunar_day = lunar_info["lunar_day"]
+            is_leap_month = lunar_info["is_leap_month"]
+            season_index = get_season_index(lunar_month)
+            
+            # Get Can Chi for the day
+            can_chi_info = get_can_chi_day(target_date)
+            can_index = can_chi_info["can_index"]
+            chi_index = can_chi_info["chi_index"]
+            
+            # Calculate Trực (Duty God)
+            truc_index = get_truc_index(lunar_month, chi_index)
         
         # Calculate Personal Day Number
         personal_day_number = calculate_personal_day_number(
@@ -51,6 +143,36 @@ class DataCollectorAgent:
             self.user_birth_month
         )
         
+        return self._build_result(
+            target_date, timestamp, lunar_year, lunar_month, lunar_day, is_leap_month,
+            can_index, chi_index, truc_index, season_index, personal_day_number
+        )
+    
+    def _build_result(
+        self,
+        target_date: datetime,
+        timestamp: str,
+        lunar_year: int,
+        lunar_month: int,
+        lunar_day: int,
+        is_leap_month: bool,
+        can_index: int,
+        chi_index: int,
+        truc_index: int,
+        season_index: int,
+        personal_day_number: int
+    ) -> dict:
+        """Assemble the analyze() result from the day's calendar indices"""
+        lunar_formatted = format_lunar_date({
+            "lunar_day": lunar_day,
+            "lunar_month": lunar_month,
+            "is_leap_month": is_leap_month
+        })
+        can = THIEN_CAN[can_index]
+        chi = DIA_CHI[chi_index]
+        element_can_index = CAN_ELEMENT_INDEX[can_index]
+        element_chi_index = CHI_ELEMENT_INDEX[chi_index]
+        
         # Compile result
         result = {
             # Solar date info
@@ -60,31 +182,42 @@ class DataCollectorAgent:
             "weekday_vn": self._get_weekday_vietnamese(target_date.weekday()),
             
             # Lunar date info
-            "lunar_day": lunar_info["lunar_day"],
-            "lunar_month": lunar_info["lunar_month"],
-            "lunar_year": lunar_info["lunar_year"],
+            "lunar_day": lunar_day,
+            "lunar_month": lunar_month,
+            "lunar_year": lunar_year,
             "lunar_formatted": lunar_formatted,
-            "season": season,
-            "is_leap_month": lunar_info["is_leap_month"],
+            "season": SEASONS[season_index],
+            "season_index": season_index,
+            "is_leap_month": is_leap_month,
             
             # Can Chi info
-            "can": can_chi_info["can"],
-            "chi": can_chi_info["chi"],
-            "can_chi": can_chi_info["can_chi"],
-            "element_can": can_chi_info["element_can"],
-            "element_chi": can_chi_info["element_chi"],
-            "animal": can_chi_info["animal"],
-            "chi_index": can_chi_info["chi_index"],
+            "can": can,
+            "chi": chi,
+            "can_chi": f"{can} {chi}",
+            "element_can": NGU_HANH[element_can_index],
+            "element_chi": NGU_HANH[element_chi_index],
+            "animal": CHI_TO_ANIMAL[chi],
+            "can_index": can_index,
+            "chi_index": chi_index,
+            "element_can_index": element_can_index,
+            "element_chi_index": element_chi_index,
             
             # Trực (Duty God)
-            "truc": truc,
+            "truc": TRUC_12[truc_index],
+            "truc_index": truc_index,
             
             # Numerology
             "personal_day_number": personal_day_number,
             
+            # Seed for reproducible choices in later agents (same date + profile = same forecast)
+            "seed": stable_seed(
+                f"{target_date.year:04d}-{target_date.month:02d}-{target_date.day:02d}",
+                *self.profile_key
+            ),
+            
             # Metadata
             "agent": "DataCollectorAgent",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         }
         
         return result
@@ -3,14 +3,29 @@ Agent 2: Thầy Phán Bát Tự (The Metaphysical Analyst)
 Analyzes metaphysical compatibility and energy patterns
 """
 
-from core.can_chi import check_xung, check_hop, check_element_relationship
-from core.constants import (
-    HOANG_DAO, HAC_DAO, ELEMENT_STATE_BY_SEASON,
-    NGU_HANH_SINH, NGU_HANH_KHAC
+from typing import List
+
+from core.can_chi import (
+    check_element_relationship, XUNG_MATRIX, HOP_MATRIX, ELEMENT_RELATION,
+    SEASON_ELEMENT_STATE, TRUC_IS_HOANG_DAO
 )
+from core.constants import NGU_HANH, DIA_CHI, ELEMENT_STATES
+from core.enums import Relation, CHI_INDEX, ELEMENT_INDEX
 from core.numerology import get_number_meaning, check_number_compatibility
 
 
+# Luck score modifiers, indexed by Relation and by ELEMENT_STATES index
+RELATION_MODIFIERS = {
+    Relation.SAME: 0,
+    Relation.SINH: 1,
+    Relation.DUOC_SINH: 1,
+    Relation.KHAC: -1,
+    Relation.BI_KHAC: -1,
+    Relation.NEUTRAL: 0
+}
+STATE_MODIFIERS = (2, 1, 0, -1, -2)  # Vượng, Tướng, Hưu, Tù, Tử
+
+
 class MetaphysicalAnalystAgent:
     """Agent responsible for Bát Tự and metaphysical analysis"""
     
@@ -26,6 +41,21 @@ class MetaphysicalAnalystAgent:
         self.user_element = user_element
         self.user_branch = user_branch
         self.user_life_path = user_life_path
+        
+        # Integer codes for the user, so analyze() only does index lookups
+        self.user_element_index = ELEMENT_INDEX[user_element]
+        self.user_branch_index = CHI_INDEX[user_branch]
+        
+        # Descriptions depend only on the day's element/branch: render them once
+        self._relationship_by_element = tuple(
+            check_element_relationship(element, user_element) for element in NGU_HANH
+        )
+        self._xung_descriptions = tuple(
+            f"Ngày {chi} XUNG với {user_branch} của bạn" for chi in DIA_CHI
+        )
+        self._hop_descriptions = tuple(
+            f"Ngày {chi} HỢP với {user_branch} của bạn" for chi in DIA_CHI
+        )
     
     def analyze(self, data_collector_result: dict) -> dict:
         """
@@ -37,48 +67,37 @@ class MetaphysicalAnalystAgent:
         Returns:
             Complete metaphysical analysis
         """
-        # Extract key data
-        day_chi = data_collector_result["chi"]
-        day_can = data_collector_result["can"]
-        day_element_can = data_collector_result["element_can"]
-        day_element_chi = data_collector_result["element_chi"]
-        truc = data_collector_result["truc"]
+        # Extract key data (integer codes from Agent 1)
+        day_chi_index = data_collector_result["chi_index"]
+        element_can_index = data_collector_result["element_can_index"]
+        element_chi_index = data_collector_result["element_chi_index"]
+        truc_index = data_collector_result["truc_index"]
+        season_index = data_collector_result["season_index"]
         personal_day_number = data_collector_result["personal_day_number"]
-        season = data_collector_result["season"]
-        
-        # Check Xung (Clash)
-        has_xung = check_xung(day_chi, self.user_branch)
         
-        # Check Hợp (Harmony)
-        has_hop = check_hop(day_chi, self.user_branch)
+        # Check Xung (Clash) and Hợp (Harmony)
+        has_xung = XUNG_MATRIX[day_chi_index][self.user_branch_index]
+        has_hop = HOP_MATRIX[day_chi_index][self.user_branch_index]
         
-        # Analyze element relationships (Can vs User element)
-        element_relationship_can = check_element_relationship(
-            day_element_can, 
-            self.user_element
-        )
-        
-        # Analyze element relationships (Chi vs User element)
-        element_relationship_chi = check_element_relationship(
-            day_element_chi,
-            self.user_element
-        )
+        # Element relationships (Can / Chi vs User element)
+        relation_can = ELEMENT_RELATION[element_can_index][self.user_element_index]
+        relation_chi = ELEMENT_RELATION[element_chi_index][self.user_element_index]
         
         # Determine if Hoàng Đạo or Hắc Đạo
-        is_hoang_dao = truc in HOANG_DAO
-        is_hac_dao = truc in HAC_DAO
+        is_hoang_dao = TRUC_IS_HOANG_DAO[truc_index]
         
         # Get element state based on season
-        menh_state = ELEMENT_STATE_BY_SEASON[season].get(self.user_element, "Hưu")
+        menh_state_index = SEASON_ELEMENT_STATE[season_index][self.user_element_index]
+        menh_state = ELEMENT_STATES[menh_state_index]
         
         # Calculate luck score (1-10)
         luck_score = self._calculate_luck_score(
             has_xung=has_xung,
             has_hop=has_hop,
             is_hoang_dao=is_hoang_dao,
-            element_relationship_can=element_relationship_can,
-            element_relationship_chi=element_relationship_chi,
-            menh_state=menh_state
+            relation_can=relation_can,
+            relation_chi=relation_chi,
+            menh_state_index=menh_state_index
         )
         
         # Get numerology insights
@@ -93,20 +112,23 @@ class MetaphysicalAnalystAgent:
             # Branch analysis
             "has_xung": has_xung,
             "has_hop": has_hop,
-            "xung_description": f"Ngày {day_chi} XUNG với {self.user_branch} của bạn" if has_xung else None,
-            "hop_description": f"Ngày {day_chi} HỢP với {self.user_branch} của bạn" if has_hop else None,
+            "xung_description": self._xung_descriptions[day_chi_index] if has_xung else None,
+            "hop_description": self._hop_descriptions[day_chi_index] if has_hop else None,
             
             # Element analysis
-            "element_relationship_can": element_relationship_can,
-            "element_relationship_chi": element_relationship_chi,
+            "element_relationship_can": self._relationship_by_element[element_can_index],
+            "element_relationship_chi": self._relationship_by_element[element_chi_index],
+            "relation_can": relation_can,
+            "relation_chi": relation_chi,
             
             # Hoàng Đạo / Hắc Đạo
             "is_hoang_dao": is_hoang_dao,
-            "is_hac_dao": is_hac_dao,
+            "is_hac_dao": not is_hoang_dao,
             "truc_type": "Hoàng Đạo" if is_hoang_dao else "Hắc Đạo",
             
             # Element state
             "menh_state": menh_state,
+            "menh_state_index": menh_state_index,
             "menh_description": self._get_menh_description(menh_state),
             
             # Luck score
@@ -117,7 +139,10 @@ class MetaphysicalAnalystAgent:
             "number_compatibility": number_compatibility,
             
             # Dominant element of the day
-            "dominant_element": self._get_dominant_element(day_element_can, day_element_chi),
+            "dominant_element": self._get_dominant_element(
+                data_collector_result["element_can"],
+                data_collector_result["element_chi"]
+            ),
             
             # Metadata
             "agent": "MetaphysicalAnalystAgent"
@@ -125,20 +150,32 @@ class MetaphysicalAnalystAgent:
         
         return result
     
+    def analyze_many(self, data_collector_results: List[dict]) -> List[dict]:
+        """
+        Perform metaphysical analysis on a batch of Agent 1 results
+        
+        Args:
+            data_collector_results: Outputs from Agent 1
+            
+        Returns:
+            List of results in the same format as analyze()
+        """
+        return [self.analyze(data) for data in data_collector_results]
+    
     def _calculate_luck_score(
         self,
         has_xung: bool,
         has_hop: bool,
         is_hoang_dao: bool,
-        element_relationship_can: dict,
-        element_relationship_chi: dict,
-        menh_state: str
+        relation_can: Relation,
+        relation_chi: Relation,
+        menh_state_index: int
     ) -> int:
         """
         Calculate overall luck score from 1-10
         
         Args:
-            Various metaphysical indicators
+            Various metaphysical indicators (integer-coded)
             
         Returns:
             Luck score (1-10)
@@ -160,25 +197,11 @@ class MetaphysicalAnalystAgent:
             score -= 1
         
         # Element relationships
-        if element_relationship_can["type"] in ["sinh", "duoc_sinh"]:
-            score += 1
-        elif element_relationship_can["type"] in ["khac", "bi_khac"]:
-            score -= 1
-        
-        if element_relationship_chi["type"] in ["sinh", "duoc_sinh"]:
-            score += 1
-        elif element_relationship_chi["type"] in ["khac", "bi_khac"]:
-            score -= 1
+        score += RELATION_MODIFIERS[relation_can]
+        score += RELATION_MODIFIERS[relation_chi]
         
         # Element state bonus/penalty
-        state_modifiers = {
-            "Vượng": 2,
-            "Tướng": 1,
-            "Hưu": 0,
-            "Tù": -1,
-            "Tử": -2
-        }
-        score += state_modifiers.get(menh_state, 0)
+        score += STATE_MODIFIERS[menh_state_index]
         
         # Clamp to 1-10
         return max(1, min(10, score))
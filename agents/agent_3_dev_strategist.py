@@ -5,13 +5,64 @@ Translates metaphysical signals into developer-specific advice
 
 from typing import List, Tuple
 
+from core.constants import NGU_HANH_SINH
+from core.seed import seeded_choice
+from agents.message_templates import StrategyTemplate
+
+# Clothing color of each element (Vietnamese color names)
+ELEMENT_COLOR_NAMES = {
+    "Kim": "trắng",
+    "Thổ": "vàng",
+    "Thủy": "đen",
+    "Mộc": "xanh lá",
+    "Hỏa": "đỏ"
+}
+
+# Developer trait of each life path number
+LIFE_PATH_TRAITS = {
+    1: "tiên phong",
+    2: "hợp tác",
+    3: "sáng tạo",
+    4: "kỷ luật",
+    5: "linh hoạt",
+    6: "tận tâm",
+    7: "phân tích",
+    8: "quyết đoán",
+    9: "bao dung"
+}
+
 
 class DevStrategistAgent:
     """Agent responsible for mapping Feng Shui to developer context"""
     
-    def __init__(self):
-        """Initialize the Dev Strategist Agent"""
-        pass
+    def __init__(self, user_element: str = None, user_life_path: int = None):
+        """
+        Initialize the Dev Strategist Agent
+        
+        Args:
+            user_element: User's element (Mệnh), defaults to settings.USER_ELEMENT
+            user_life_path: User's life path number, defaults to the one from settings
+        """
+        if user_element is None or user_life_path is None:
+            from config.settings import settings
+            user_element = user_element or settings.USER_ELEMENT
+            user_life_path = user_life_path or settings.get_life_path_number()
+        
+        self.user_element = user_element
+        self.user_life_path = user_life_path
+        
+        # Profile-specific advice, built once: colors of the element and of the one that
+        # generates it, the life path's trait, and the element this one generates
+        mother_element = next(parent for parent, child in NGU_HANH_SINH.items() if child == user_element)
+        self.color_advice = (
+            f"Mặc áo màu {ELEMENT_COLOR_NAMES[user_element]}/{ELEMENT_COLOR_NAMES[mother_element]} "
+            f"(tương sinh với {user_element})"
+        )
+        self.life_path_label = f"Dev số {user_life_path} ({LIFE_PATH_TRAITS[user_life_path]})"
+        self.growth_element = NGU_HANH_SINH[user_element]
+        
+        # Compiled summary templates per format (see agents.message_templates)
+        self.templates = {}
     
     def analyze(
         self,
@@ -28,6 +79,35 @@ class DevStrategistAgent:
         Returns:
             Developer-specific recommendations
         """
+        result = self.analyze_state(data_collector_result, metaphysical_result)
+        
+        return {
+            "should_do": result["should_do"],
+            "should_avoid": result["should_avoid"],
+            "cosmic_message": self._generate_cosmic_message(
+                data_collector_result=data_collector_result,
+                cosmic_messages=result["cosmic_messages"]
+            ),
+            "agent": "DevStrategistAgent"
+        }
+    
+    def analyze_state(
+        self,
+        data_collector_result: dict,
+        metaphysical_result: dict
+    ) -> dict:
+        """
+        Everything in analyze() that does not depend on the date's seed
+        The result only depends on the forecast state, so it can be memoized.
+        
+        Args:
+            data_collector_result: Output from Agent 1
+            metaphysical_result: Output from Agent 2
+            
+        Returns:
+            dict with should_do, should_avoid and cosmic_messages (the pool
+            the cosmic message is picked from)
+        """
         # Extract key indicators
         luck_score = metaphysical_result["luck_score"]
         has_xung = metaphysical_result["has_xung"]
@@ -53,21 +133,37 @@ class DevStrategistAgent:
             personal_day_number=personal_day_number
         )
         
-        # Generate mystical message
-        cosmic_message = self._generate_cosmic_message(
+        # Candidate mystical messages
+        cosmic_messages = self._get_cosmic_messages(
             data_collector_result=data_collector_result,
             metaphysical_result=metaphysical_result
         )
         
-        # Compile result
-        result = {
+        return {
             "should_do": should_do,
             "should_avoid": should_avoid,
-            "cosmic_message": cosmic_message,
-            "agent": "DevStrategistAgent"
+            "cosmic_messages": cosmic_messages
         }
+    
+    def analyze_many(
+        self,
+        data_collector_results: List[dict],
+        metaphysical_results: List[dict]
+    ) -> List[dict]:
+        """
+        Translate a batch of analyses into developer-specific recommendations
         
-        return result
+        Args:
+            data_collector_results: Outputs from Agent 1
+            metaphysical_results: Outputs from Agent 2
+            
+        Returns:
+            List of results in the same format as analyze()
+        """
+        return [
+            self.analyze(data, meta)
+            for data, meta in zip(data_collector_results, metaphysical_results)
+        ]
     
     def _generate_should_do(
         self,
@@ -117,7 +213,7 @@ class DevStrategistAgent:
         
         # Based on menh state
         if menh_state in ["Vượng", "Tướng"]:
-            recommendations.append("Mặc áo màu trắng/vàng (tương sinh với Kim)")
+            recommendations.append(self.color_advice)
         
         # Always include one lifestyle recommendation
         if is_hoang_dao:
@@ -173,10 +269,21 @@ class DevStrategistAgent:
     def _generate_cosmic_message(
         self,
         data_collector_result: dict,
-        metaphysical_result: dict
+        cosmic_messages: List[str]
     ) -> str:
         """
-        Generate a mystical yet developer-relevant message
+        Pick the mystical message for the date
+        Reproducible for the same date and profile (seeded by Agent 1)
+        """
+        return seeded_choice(data_collector_result["seed"], "cosmic_message", cosmic_messages)
+    
+    def _get_cosmic_messages(
+        self,
+        data_collector_result: dict,
+        metaphysical_result: dict
+    ) -> List[str]:
+        """
+        Generate mystical yet developer-relevant message candidates
         Combines numerology and element analysis with humor
         """
         luck_score = metaphysical_result["luck_score"]
@@ -202,37 +309,29 @@ class DevStrategistAgent:
             messages = [
                 f"Tứ hành xung! Code review sẽ harsh. Comment kỹ, giải thích rõ ràng.",
                 "Xung khí mạnh - Tránh meeting lúc 2-4h chiều, lúc đó conflict max.",
-                "Ngày xung nhưng bạn là Dev số 3 (sáng tạo) - Dùng humor để hóa giải căng thẳng!"
+                f"Ngày xung nhưng bạn là {self.life_path_label} - Dùng humor để hóa giải căng thẳng!"
             ]
         else:
             messages = [
                 f"Năng lượng số {personal_day_number} hòa hợp với {dominant_element}. Code flow nhẹ nhàng như stream processing.",
-                "Mệnh Kim của bạn cần Thủy để mài giũa. Hãy học thêm, code nhiều hơn!",
+                f"Mệnh {self.user_element} của bạn cần {self.growth_element} để mài giũa. Hãy học thêm, code nhiều hơn!",
                 "Ngày ổn định - Thích hợp refactor, viết test, và uống cà phê ☕"
             ]
         
-        # Select random message from pool
-        import random
-        return random.choice(messages)
+        return messages
     
-    def get_summary(self, data: dict) -> str:
+    def get_summary(self, data: dict, fmt: str = "plain") -> str:
         """
         Generate formatted summary
         
         Args:
             data: Result from analyze()
+            fmt: Template format ("plain", "markdown", "markdownv2" or "html")
             
         Returns:
             Formatted summary string
         """
-        summary = "✅ NÊN LÀM:\n"
-        for item in data["should_do"]:
-            summary += f"  • {item}\n"
-        
-        summary += "\n❌ NÊN TRÁNH:\n"
-        for item in data["should_avoid"]:
-            summary += f"  • {item}\n"
-        
-        summary += f"\n💡 LỜI NHẮN VŨ TRỤ:\n  \"{data['cosmic_message']}\"\n"
-        
-        return summary.strip()
+        template = self.templates.get(fmt)
+        if template is None:
+            template = self.templates[fmt] = StrategyTemplate(fmt)
+        return template.render(data)
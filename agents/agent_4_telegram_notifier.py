@@ -3,17 +3,42 @@ Agent 4: Sứ Giả Telegram (The Telegram Notifier)
 Formats and sends the final forecast message
 """
 
-import random
 from datetime import datetime
+from typing import List
 from core.constants import ELEMENT_COLORS
+from core.seed import seeded_choice
+from agents.message_templates import ForecastTemplate
+
+# Telegram rejects messages longer than this (characters)
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+# Calendar grid column headers, Monday first
+WEEKDAY_LABELS = ["T2", "T3", "T4", "T5", "T6", "T7", "CN"]
 
 
 class TelegramNotifierAgent:
     """Agent responsible for formatting and preparing Telegram messages"""
     
-    def __init__(self):
-        """Initialize the Telegram Notifier Agent"""
-        pass
+    def __init__(
+        self,
+        user_name: str = "Nguyễn Hùng Mạnh",
+        user_element: str = "Kim",
+        year_pillar: str = "Tân Tỵ"
+    ):
+        """
+        Initialize the Telegram Notifier Agent
+        
+        Args:
+            user_name: Name shown in the header
+            user_element: User's element (e.g., "Kim")
+            year_pillar: Can Chi of the birth year (e.g., "Tân Tỵ")
+        """
+        self.user_name = user_name
+        self.user_element = user_element
+        self.year_pillar = year_pillar
+        
+        # Compiled message templates per format (see agents.message_templates)
+        self.templates = {}
     
     def analyze(
         self,
@@ -32,9 +57,50 @@ class TelegramNotifierAgent:
         Returns:
             Formatted message and metadata
         """
+        return self._analyze(
+            data_collector_result,
+            metaphysical_result,
+            dev_strategist_result,
+            datetime.now().isoformat()
+        )
+    
+    def analyze_many(
+        self,
+        data_collector_results: List[dict],
+        metaphysical_results: List[dict],
+        dev_strategist_results: List[dict]
+    ) -> List[dict]:
+        """
+        Compile a batch of agent results into Telegram messages
+        
+        Args:
+            data_collector_results: Outputs from Agent 1
+            metaphysical_results: Outputs from Agent 2
+            dev_strategist_results: Outputs from Agent 3
+            
+        Returns:
+            List of results in the same format as analyze()
+        """
+        # One timestamp for the whole batch
+        timestamp = datetime.now().isoformat()
+        return [
+            self._analyze(data, meta, dev, timestamp)
+            for data, meta, dev in zip(
+                data_collector_results, metaphysical_results, dev_strategist_results
+            )
+        ]
+    
+    def _analyze(
+        self,
+        data_collector_result: dict,
+        metaphysical_result: dict,
+        dev_strategist_result: dict,
+        timestamp: str
+    ) -> dict:
+        """Compile all agent results into a Telegram message (see analyze)"""
         # Generate lucky color
         dominant_element = data_collector_result["element_can"]
-        lucky_color = self._get_lucky_color(dominant_element)
+        lucky_color = self._get_lucky_color(dominant_element, data_collector_result["seed"])
         
         # Format the complete message
         message = self._format_message(
@@ -50,7 +116,7 @@ class TelegramNotifierAgent:
             "lucky_color": lucky_color,
             "luck_score": metaphysical_result["luck_score"],
             "agent": "TelegramNotifierAgent",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": timestamp
         }
         
         return result
@@ -60,66 +126,135 @@ class TelegramNotifierAgent:
         data_collector_result: dict,
         metaphysical_result: dict,
         dev_strategist_result: dict,
-        lucky_color: str
+        lucky_color: str,
+        fmt: str = "markdown"
     ) -> str:
         """
         Format the complete Telegram message
         
+        Args:
+            fmt: Template format ("markdown", "markdownv2", "html" or "plain")
+        
         Returns:
-            Markdown-formatted message string
-        """
-        # Extract data
-        solar_date = data_collector_result["solar_formatted"]
-        lunar_date = data_collector_result["lunar_formatted"]
-        can_chi = data_collector_result["can_chi"]
-        personal_day_number = data_collector_result["personal_day_number"]
-        luck_score = metaphysical_result["luck_score"]
-        menh_state = metaphysical_result["menh_state"]
-        should_do = dev_strategist_result["should_do"]
-        should_avoid = dev_strategist_result["should_avoid"]
-        cosmic_message = dev_strategist_result["cosmic_message"]
-        
-        # Build message
-        message = f"""🔮 *BẢN TIN THIÊN CƠ CHO NGUYỄN HÙNG MẠNH*
-📅 *Dự báo cho ngày:* {solar_date} ({lunar_date} - {can_chi})
-
-📊 *Chỉ số năng lượng:*
-• Thần số học ngày cá nhân: Số *{personal_day_number}*
-• Độ may mắn: *{luck_score}/10* {"⭐" * min(luck_score, 10)}
-• Trạng thái mệnh Kim (Tân Tỵ): *{menh_state}*
-
-✅ *NÊN LÀM (Good Commit):*
-"""
+            Message string in the requested format
+        """
+        return self.get_template(fmt).render(
+            data_collector_result,
+            metaphysical_result,
+            dev_strategist_result,
+            lucky_color
+        )
+    
+    def get_template(self, fmt: str = "markdown") -> ForecastTemplate:
+        """
+        Get the compiled template for a format, compiling it the first time
         
-        for item in should_do:
-            message += f"• {item}\n"
+        Args:
+            fmt: Template format ("markdown", "markdownv2", "html" or "plain")
+            
+        Returns:
+            ForecastTemplate for this agent's profile
+        """
+        template = self.templates.get(fmt)
+        if template is None:
+            template = self.templates[fmt] = ForecastTemplate(
+                self.user_name, self.user_element, self.year_pillar, fmt
+            )
+        return template
+    
+    def render(
+        self,
+        data_collector_result: dict,
+        metaphysical_result: dict,
+        dev_strategist_result: dict,
+        fmt: str = "markdown"
+    ) -> str:
+        """
+        Render the forecast message in another format than analyze()'s Markdown
+        
+        Args:
+            data_collector_result: Output from Agent 1
+            metaphysical_result: Output from Agent 2
+            dev_strategist_result: Output from Agent 3
+            fmt: Template format ("markdown", "markdownv2", "html" or "plain")
+            
+        Returns:
+            Message string (send with message_templates.PARSE_MODES[fmt])
+        """
+        lucky_color = self._get_lucky_color(
+            data_collector_result["element_can"], data_collector_result["seed"]
+        )
+        return self._format_message(
+            data_collector_result,
+            metaphysical_result,
+            dev_strategist_result,
+            lucky_color,
+            fmt
+        )
+    
+    def format_calendar(self, title: str, days: List[dict]) -> List[str]:
+        """
+        Format a compact calendar grid with one line per day
         
-        message += f"\n❌ *NÊN TRÁNH (Bad Request):*\n"
+        Args:
+            title: Calendar title (e.g. "THÁNG 01/2026")
+            days: Consecutive day summaries from AgentPipeline.evaluate_many()
+            
+        Returns:
+            Markdown message split into chunks of at most TELEGRAM_MESSAGE_LIMIT characters
+        """
+        # Grid: per week, a row of day numbers and a row of scores (* Hoàng Đạo, ! Xung)
+        rows = ["".join(f"{label:>3}  " for label in WEEKDAY_LABELS).rstrip()]
+        offset = days[0]["date"].weekday()
+        for week_start in range(-offset, len(days), 7):
+            week = [
+                days[i] if 0 <= i < len(days) else None
+                for i in range(week_start, week_start + 7)
+            ]
+            rows.append("".join(
+                f"{day['date'].day:>3}  " if day else " " * 5 for day in week
+            ).rstrip())
+            rows.append("".join(
+                f"{day['luck_score']:>3}{'*' if day['is_hoang_dao'] else ' '}{'!' if day['has_xung'] else ' '}"
+                if day else " " * 5
+                for day in week
+            ).rstrip())
         
-        for item in should_avoid:
-            message += f"• {item}\n"
+        best = max(days, key=lambda day: day["luck_score"])
         
-        message += f"""
-💡 *LỜI NHẮN VŨ TRỤ (Daily Log):*
-"{cosmic_message}"
+        message = f"""🗓️ *LỊCH THIÊN CƠ {title} CHO {self.user_name.upper()}*
+
+```
+{chr(10).join(rows)}
+```
+Số = độ may mắn (1-10) · `*` Hoàng Đạo · `!` Xung tuổi
+
+🏆 *Ngày tốt nhất:* {best['date'].strftime('%d/%m/%Y')} ({best['luck_score']}/10)
 
-🎯 *Màu may mắn:* `{lucky_color}`
+📋 *Chi tiết:*
 """
+        for day in days:
+            markers = ("🟢" if day["is_hoang_dao"] else "⚫") + (" ⚠️" if day["has_xung"] else "")
+            message += (
+                f"{WEEKDAY_LABELS[day['date'].weekday()]} {day['date'].strftime('%d/%m')}: "
+                f"*{day['luck_score']}/10* {markers} {day['can_chi']} · Trực {day['truc']}\n"
+            )
         
-        return message.strip()
+        return split_message(message.strip())
     
-    def _get_lucky_color(self, element: str) -> str:
+    def _get_lucky_color(self, element: str, seed: int) -> str:
         """
         Get lucky color hex code based on the dominant element
         
         Args:
             element: Element name (Hỏa, Thủy, Mộc, Kim, Thổ)
+            seed: Forecast seed from Agent 1
             
         Returns:
             Hex color code
         """
         colors = ELEMENT_COLORS.get(element, ["#808080"])  # Default to gray
-        return random.choice(colors)
+        return seeded_choice(seed, "lucky_color", colors)
     
     def get_preview(self, data: dict) -> str:
         """
@@ -132,3 +267,59 @@ class TelegramNotifierAgent:
             Message preview
         """
         return data["message"]
+
+
+def split_message(text: str, limit: int = TELEGRAM_MESSAGE_LIMIT) -> List[str]:
+    """
+    Split a message into chunks Telegram accepts
+    Splits between paragraphs where possible, then between lines, so
+    Markdown entities and code blocks stay intact; only a single line
+    longer than the limit is cut mid-line.
+    
+    Args:
+        text: Message text
+        limit: Maximum chunk length
+        
+    Returns:
+        List of chunks (a single chunk when the text already fits)
+    """
+    if len(text) <= limit:
+        return [text]
+    
+    chunks = []
+    current = ""
+    for paragraph in text.split("\n\n"):
+        for i, piece in enumerate(_split_lines(paragraph, limit)):
+            # Pieces of one paragraph were separated by single newlines
+            separator = "\n" if i else "\n\n"
+            if current and len(current) + len(separator) + len(piece) <= limit:
+                current += separator + piece
+            else:
+                if current:
+                    chunks.append(current)
+                current = piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_lines(paragraph: str, limit: int) -> List[str]:
+    """Split an oversized paragraph into pieces of whole lines (see split_message)"""
+    if len(paragraph) <= limit:
+        return [paragraph]
+    
+    pieces = []
+    current = ""
+    for line in paragraph.split("\n"):
+        while len(line) > limit:
+            pieces.append(line[:limit])
+            line = line[limit:]
+        if current and len(current) + 1 + len(line) <= limit:
+            current += "\n" + line
+        else:
+            if current:
+                pieces.append(current)
+            current = line
+    if current:
+        pieces.append(current)
+    return pieces
@@ -0,0 +1,370 @@
+"""
+Parallel offline almanac builder
+Splits a range of years into chunks, builds each chunk on a process pool and
+merges the chunks into one file. Finished chunks are kept next to the output
+until the merge, so an interrupted build resumes where it stopped.
+
+Two kinds of tables:
+    almanac   the user-independent core.almanac file (readable by core.almanac.Almanac)
+    profiles  per-profile day tables (luck score, personal day number, mệnh state,
+              Xung/Hợp/Hoàng Đạo flags) for every subscriber, readable by ProfileAlmanac
+
+Usage:
+    python -m agents.almanac_builder almanac FROM_YEAR TO_YEAR [output] [--workers N] [--chunk-years N]
+    python -m agents.almanac_builder profiles FROM_YEAR TO_YEAR [output] [--workers N] [--chunk-years N]
+"""
+
+import json
+import os
+import shutil
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+from typing import List, Optional, Tuple
+
+from config.profiles import Profile, SubscriberRegistry
+from core.almanac import HEADER, MAGIC, NUMPY_FIELDS, RECORD, VERSION, FLAG_HOANG_DAO, encode_days
+from core.can_chi import HOP_MATRIX, SEASON_ELEMENT_STATE, XUNG_MATRIX
+from core.lunar_table import FIRST_ORDINAL, END_ORDINAL
+from core.numerology import reduce_to_single_digit
+from agents.best_days import luck_score_table
+
+PROFILE_MAGIC = b"TCPF"
+PROFILE_VERSION = 1
+
+# Header: magic, version, record size, first day ordinal, day count, profile count
+PROFILE_HEADER = struct.Struct("<4sHHIII")
+
+# Index entry per profile: birth day, birth month, element index, branch index
+PROFILE_ENTRY = struct.Struct("<BBBB")
+
+# Record: luck score, personal day number, mệnh state index, flags
+PROFILE_RECORD = struct.Struct("<BBBB")
+
+PROFILE_FLAG_XUNG = 0x01
+PROFILE_FLAG_HOP = 0x02
+PROFILE_FLAG_HOANG_DAO = 0x04
+
+# NumPy dtype matching PROFILE_RECORD
+PROFILE_NUMPY_FIELDS = [
+    ("luck_score", "u1"), ("personal_day_number", "u1"), ("menh_state", "u1"), ("flags", "u1")
+]
+
+BUILD_MODES = ("almanac", "profiles")
+DEFAULT_CHUNK_YEARS = 10
+
+
+def profile_entry(profile: Profile) -> tuple:
+    """The values a profile's day table depends on (profiles sharing them share a table)"""
+    return (profile.birth_day, profile.birth_month, profile.element_index, profile.branch_index)
+
+
+def year_chunks(first_year: int, last_year: int, chunk_years: int) -> List[Tuple[int, int, int, int]]:
+    """
+    Split a range of years into chunks, clipped to the lunar table
+    
+    Args:
+        first_year: First year (inclusive)
+        last_year: Last year (inclusive)
+        chunk_years: Years per chunk
+    
+    Returns:
+        List of (first_year, last_year, first_ordinal, end_ordinal), end exclusive
+    """
+    chunks = []
+    for start in range(first_year, last_year + 1, chunk_years):
+        end = min(start + chunk_years - 1, last_year)
+        first_ordinal = max(date(start, 1, 1).toordinal(), FIRST_ORDINAL)
+        end_ordinal = min(date(end + 1, 1, 1).toordinal(), END_ORDINAL)
+        if first_ordinal < end_ordinal:
+            chunks.append((start, end, first_ordinal, end_ordinal))
+    return chunks
+
+
+def build_chunk(mode: str, first_ordinal: int, end_ordinal: int, entries: List[tuple], part_path: str) -> int:
+    """
+    Build one chunk into a part file (runs in a worker process)
+    
+    Args:
+        mode: "almanac" or "profiles"
+        first_ordinal: First day (inclusive)
+        end_ordinal: Last day (exclusive)
+        entries: profile_entry() tuples ("profiles" mode)
+        part_path: Where to write the part (written atomically)
+    
+    Returns:
+        Rows written (days, times profiles in "profiles" mode)
+    """
+    import numpy as np
+    
+    data = encode_days(first_ordinal, end_ordinal)
+    days = end_ordinal - first_ordinal
+    
+    if mode == "almanac":
+        output = [data]
+        rows = days
+    else:
+        records = np.frombuffer(data, dtype=np.dtype(NUMPY_FIELDS))
+        can, chi, truc, season = records["can"], records["chi"], records["truc"], records["season"]
+        hoang_dao = np.where(records["flags"] & FLAG_HOANG_DAO, PROFILE_FLAG_HOANG_DAO, 0)
+        
+        # Personal day number = reduce(reduce(day) + reduce(month) + reduce(year digits) + birth part)
+        date_parts = np.empty(days, dtype=np.int16)
+        for i, ordinal in enumerate(range(first_ordinal, end_ordinal)):
+            day = date.fromordinal(ordinal)
+            date_parts[i] = (
+                reduce_to_single_digit(day.day)
+                + reduce_to_single_digit(day.month)
+                + reduce_to_single_digit(sum(int(d) for d in str(day.year)))
+            )
+        reduced = np.array([reduce_to_single_digit(n) for n in range(64)], dtype=np.uint8)
+        
+        states = np.array(SEASON_ELEMENT_STATE, dtype=np.uint8)
+        xung = np.array(XUNG_MATRIX, dtype=np.uint8)
+        hop = np.array(HOP_MATRIX, dtype=np.uint8)
+        
+        output = []
+        score_tables = {}
+        for birth_day, birth_month, element, branch in entries:
+            table = score_tables.get((element, branch))
+            if table is None:
+                table = score_tables[(element, branch)] = luck_score_table(element, branch)
+            
+            block = np.empty(days, dtype=np.dtype(PROFILE_NUMPY_FIELDS))
+            block["luck_score"] = table[can, chi, truc, season]
+            birth_part = reduce_to_single_digit(birth_day) + reduce_to_single_digit(birth_month)
+            block["personal_day_number"] = reduced[date_parts + birth_part]
+            block["menh_state"] = states[season, element]
+            block["flags"] = (
+                xung[chi, branch] * PROFILE_FLAG_XUNG
+                | hop[chi, branch] * PROFILE_FLAG_HOP
+                | hoang_dao
+            )
+            output.append(block.tobytes())
+        rows = days * len(entries)
+    
+    temp_path = f"{part_path}.tmp"
+    with open(temp_path, "wb") as f:
+        for block in output:
+            f.write(block)
+    os.replace(temp_path, part_path)
+    return rows
+
+
+def build(
+    mode: str,
+    first_year: int,
+    last_year: int,
+    path: str,
+    profiles: Optional[List[Profile]] = None,
+    workers: Optional[int] = None,
+    chunk_years: int = DEFAULT_CHUNK_YEARS,
+    progress=print
+) -> int:
+    """
+    Build a table file from year chunks on a process pool
+    
+    Args:
+        mode: "almanac" or "profiles"
+        first_year: First year (inclusive)
+        last_year: Last year (inclusive)
+        path: Output file path
+        profiles: Profiles to build tables for ("profiles" mode)
+        workers: Worker processes (defaults to all cores)
+        chunk_years: Years per chunk
+        progress: Called with one progress line per finished chunk
+    
+    Returns:
+        Rows in the output file
+    
+    Raises:
+        ValueError: On an unknown mode or an empty range
+    """
+    if mode not in BUILD_MODES:
+        raise ValueError(f"Unknown build mode: {mode}. Use one of: {', '.join(BUILD_MODES)}")
+    chunks = year_chunks(first_year, last_year, chunk_years)
+    if not chunks:
+        raise ValueError(f"No days between {first_year} and {last_year} in the lunar table")
+    
+    entries = []
+    if mode == "profiles":
+        entries = sorted({profile_entry(profile) for profile in profiles or []})
+        if not entries:
+            raise ValueError("No profiles to build tables for")
+    
+    # Finished parts are reused only if they belong to the same build
+    parts_dir = f"{path}.parts"
+    manifest = {"mode": mode, "chunks": chunks, "entries": entries, "version": PROFILE_VERSION}
+    manifest_path = os.path.join(parts_dir, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            if json.load(f) != json.loads(json.dumps(manifest)):
+                shutil.rmtree(parts_dir)
+    os.makedirs(parts_dir, exist_ok=True)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    
+    part_paths = [os.path.join(parts_dir, f"{start}-{end}.part") for start, end, _, _ in chunks]
+    pending = [
+        (chunk, part_path) for chunk, part_path in zip(chunks, part_paths)
+        if not os.path.exists(part_path)
+    ]
+    if len(pending) < len(chunks):
+        progress(f"Resuming: {len(chunks) - len(pending)}/{len(chunks)} chunks already built")
+    
+    began = time.perf_counter()
+    rows = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            futures = {
+                pool.submit(build_chunk, mode, first_ordinal, end_ordinal, entries, part_path): (start, end)
+                for (start, end, first_ordinal, end_ordinal), part_path in pending
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                start, end = futures[future]
+                rows += future.result()
+                elapsed = time.perf_counter() - began
+                progress(
+                    f"[{done}/{len(pending)}] {start}-{end} built "
+                    f"({rows:,} rows, {rows / elapsed:,.0f} rows/s)"
+                )
+    
+    first_ordinal = chunks[0][2]
+    days = chunks[-1][3] - first_ordinal
+    _merge(mode, path, part_paths, chunks, entries, first_ordinal, days)
+    shutil.rmtree(parts_dir)
+    
+    total = days * max(1, len(entries))
+    progress(f"Merged {total:,} rows into {path} in {time.perf_counter() - began:.2f}s")
+    return total
+
+
+def _merge(
+    mode: str,
+    path: str,
+    part_paths: List[str],
+    chunks: list,
+    entries: List[tuple],
+    first_ordinal: int,
+    days: int
+):
+    """Concatenate the part files into the output file (atomically, see build)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as output:
+        if mode == "almanac":
+            output.write(HEADER.pack(MAGIC, VERSION, RECORD.size, first_ordinal, days))
+            for part_path in part_paths:
+                with open(part_path, "rb") as part:
+                    shutil.copyfileobj(part, output)
+        else:
+            output.write(PROFILE_HEADER.pack(
+                PROFILE_MAGIC, PROFILE_VERSION, PROFILE_RECORD.size, first_ordinal, days, len(entries)
+            ))
+            for entry in entries:
+                output.write(PROFILE_ENTRY.pack(*entry))
+            # Each part holds one block per profile; the output holds one block per profile
+            parts = [open(part_path, "rb") for part_path in part_paths]
+            try:
+                for _ in entries:
+                    for part, (_, _, chunk_first, chunk_end) in zip(parts, chunks):
+                        output.write(part.read((chunk_end - chunk_first) * PROFILE_RECORD.size))
+            finally:
+                for part in parts:
+                    part.close()
+    os.replace(temp_path, path)
+
+
+class ProfileAlmanac:
+    """Read-only view of a per-profile table file"""
+    
+    def __init__(self, path: str):
+        """
+        Load the index and map the records
+        
+        Args:
+            path: File written by build(mode="profiles")
+        
+        Raises:
+            ValueError: If the file is not a valid profile table file
+        """
+        import numpy as np
+        
+        with open(path, "rb") as f:
+            header = f.read(PROFILE_HEADER.size)
+            if len(header) < PROFILE_HEADER.size:
+                raise ValueError(f"{path} is not a profile table file")
+            magic, version, record_size, self.first_ordinal, self.days, count = PROFILE_HEADER.unpack(header)
+            if magic != PROFILE_MAGIC or version != PROFILE_VERSION or record_size != PROFILE_RECORD.size:
+                raise ValueError(f"{path} is not a version {PROFILE_VERSION} profile table file")
+            index = f.read(PROFILE_ENTRY.size * count)
+        
+        self.entries = {
+            PROFILE_ENTRY.unpack_from(index, i * PROFILE_ENTRY.size): i for i in range(count)
+        }
+        self.records = np.memmap(
+            path, dtype=np.dtype(PROFILE_NUMPY_FIELDS), mode="r",
+            offset=PROFILE_HEADER.size + len(index), shape=(count, self.days)
+        )
+    
+    def table(self, profile: Profile):
+        """
+        A profile's day table
+        
+        Args:
+            profile: Subscriber profile
+        
+        Returns:
+            NumPy structured array (PROFILE_NUMPY_FIELDS), one record per day
+            from first_ordinal, or None if the profile is not in the file
+        """
+        i = self.entries.get(profile_entry(profile))
+        return None if i is None else self.records[i]
+
+
+def main():
+    """CLI: python -m agents.almanac_builder almanac|profiles FROM_YEAR TO_YEAR [output] [--workers N] [--chunk-years N]"""
+    args = sys.argv[1:]
+    options = {}
+    for option in ("--workers", "--chunk-years"):
+        if option in args:
+            i = args.index(option)
+            options[option] = int(args[i + 1])
+            del args[i:i + 2]
+    
+    if len(args) < 3 or args[0] not in BUILD_MODES:
+        print(
+            "Usage: python -m agents.almanac_builder almanac|profiles FROM_YEAR TO_YEAR [output] "
+            "[--workers N] [--chunk-years N]"
+        )
+        sys.exit(1)
+    
+    mode = args[0]
+    first_year, last_year = int(args[1]), int(args[2])
+    if len(args) > 3:
+        path = args[3]
+    elif mode == "almanac":
+        from config.settings import settings
+        path = settings.ALMANAC_FILE
+    else:
+        path = "data/profiles.bin"
+    
+    profiles = None
+    if mode == "profiles":
+        profiles = list(SubscriberRegistry.load()) + [Profile.from_settings()]
+    
+    build(
+        mode, first_year, last_year, path,
+        profiles=profiles,
+        workers=options.get("--workers"),
+        chunk_years=options.get("--chunk-years", DEFAULT_CHUNK_YEARS)
+    )
+
+
+if __name__ == "__main__":
+    main()
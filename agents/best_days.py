@@ -0,0 +1,194 @@
+"""
+Best-day finder: top-K days in a date range for a profile
+Backed by a per-profile index of luck scores for every day in the almanac,
+bucketed by score, so queries over decades answer in milliseconds.
+"""
+
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from config.profiles import Profile
+from core.almanac import get_day_records, FLAG_HOANG_DAO
+from core.can_chi import (
+    CAN_ELEMENT_INDEX, CHI_ELEMENT_INDEX, ELEMENT_RELATION, HOP_MATRIX, XUNG_MATRIX,
+    SEASON_ELEMENT_STATE, TRUC_IS_HOANG_DAO
+)
+from core.constants import THIEN_CAN, DIA_CHI, NGU_HANH, TRUC_12
+from agents.agent_2_metaphysical import MetaphysicalAnalystAgent
+
+
+def luck_score_table(element_index: int, branch_index: int):
+    """
+    Agent 2's luck score for every (Can, Chi, Trực, season) of a day
+    The score only depends on the day's values and the profile's element and branch.
+    
+    Args:
+        element_index: Profile element (0-4)
+        branch_index: Profile branch (0-11)
+        
+    Returns:
+        NumPy int8 array of shape (10, 12, 12, 4); 0 for invalid Can Chi pairs
+    """
+    import numpy as np
+    
+    agent = MetaphysicalAnalystAgent(NGU_HANH[element_index], DIA_CHI[branch_index], 1)
+    table = np.zeros((10, 12, 12, 4), dtype=np.int8)
+    for can in range(10):
+        for chi in range(12):
+            if can % 2 != chi % 2:
+                continue  # not a valid Can Chi pair
+            for truc in range(12):
+                for season in range(4):
+                    table[can, chi, truc, season] = agent._calculate_luck_score(
+                        has_xung=XUNG_MATRIX[chi][branch_index],
+                        has_hop=HOP_MATRIX[chi][branch_index],
+                        is_hoang_dao=TRUC_IS_HOANG_DAO[truc],
+                        relation_can=ELEMENT_RELATION[CAN_ELEMENT_INDEX[can]][element_index],
+                        relation_chi=ELEMENT_RELATION[CHI_ELEMENT_INDEX[chi]][element_index],
+                        menh_state_index=SEASON_ELEMENT_STATE[season][element_index]
+                    )
+    return table
+
+
+class BestDayIndex:
+    """Luck score of every almanac day for one element/branch, bucketed by score"""
+    
+    def __init__(self, profile: Profile):
+        """
+        Build the index (vectorized, ~tens of milliseconds)
+        
+        Args:
+            profile: Subscriber profile (only element and branch matter)
+        """
+        import numpy as np
+        
+        element, branch = profile.element_index, profile.branch_index
+        table = luck_score_table(element, branch)
+        
+        self.first_ordinal, records = get_day_records()
+        self.can = records["can"]
+        self.chi = records["chi"]
+        self.truc = records["truc"]
+        self.is_hoang_dao = (records["flags"] & FLAG_HOANG_DAO) != 0
+        self.has_xung = np.asarray([XUNG_MATRIX[chi][branch] for chi in range(12)])[self.chi]
+        self.scores = table[self.can, self.chi, self.truc, records["season"]]
+        # date.fromordinal(1) is a Monday, so weekday = (ordinal - 1) % 7
+        self.weekday = ((np.arange(len(records)) + self.first_ordinal - 1) % 7).astype(np.int8)
+        
+        # Buckets: day positions (ascending) for each score 1-10
+        self.buckets = {
+            score: np.flatnonzero(self.scores == score) for score in range(1, 11)
+        }
+    
+    def query(
+        self,
+        start: date,
+        end: date,
+        top_k: int = 5,
+        min_score: int = 1,
+        hoang_dao_only: bool = False,
+        no_xung: bool = False,
+        truc: Optional[str] = None,
+        weekday: Optional[int] = None
+    ) -> List[dict]:
+        """
+        Find the best days in [start, end]
+        Highest luck score first, earliest date first within a score.
+        
+        Args:
+            start: First date (inclusive)
+            end: Last date (inclusive)
+            top_k: Maximum number of days returned
+            min_score: Minimum luck score (1-10)
+            hoang_dao_only: Only Hoàng Đạo days
+            no_xung: Skip days that clash with the profile's branch
+            truc: Only days with this Trực (e.g. "Thành")
+            weekday: Only this weekday (0=Monday ... 6=Sunday)
+            
+        Returns:
+            List of dicts with date, luck_score, can_chi, truc, is_hoang_dao, has_xung
+            
+        Raises:
+            ValueError: On an unknown Trực
+        """
+        import numpy as np
+        
+        truc_index = None
+        if truc is not None:
+            if truc not in TRUC_12:
+                raise ValueError(f"Trực không hợp lệ: {truc}. Chọn một trong: {', '.join(TRUC_12)}")
+            truc_index = TRUC_12.index(truc)
+        
+        low = max(0, start.toordinal() - self.first_ordinal)
+        high = min(len(self.scores), end.toordinal() - self.first_ordinal + 1)
+        
+        results = []
+        for score in range(10, max(1, min_score) - 1, -1):
+            bucket = self.buckets[score]
+            days = bucket[np.searchsorted(bucket, low):np.searchsorted(bucket, high)]
+            
+            if hoang_dao_only:
+                days = days[self.is_hoang_dao[days]]
+            if no_xung:
+                days = days[~self.has_xung[days]]
+            if truc_index is not None:
+                days = days[self.truc[days] == truc_index]
+            if weekday is not None:
+                days = days[self.weekday[days] == weekday]
+            
+            for position in days[:top_k - len(results)]:
+                results.append(self._describe(int(position)))
+            if len(results) >= top_k:
+                break
+        
+        return results
+    
+    def _describe(self, position: int) -> dict:
+        """Result dict for one day position"""
+        can, chi = int(self.can[position]), int(self.chi[position])
+        return {
+            "date": datetime.fromordinal(self.first_ordinal + position),
+            "luck_score": int(self.scores[position]),
+            "can_chi": f"{THIEN_CAN[can]} {DIA_CHI[chi]}",
+            "truc": TRUC_12[int(self.truc[position])],
+            "is_hoang_dao": bool(self.is_hoang_dao[position]),
+            "has_xung": bool(self.has_xung[position])
+        }
+
+
+# Indexes built in this process, keyed on (element, branch)
+_INDEXES: Dict[tuple, BestDayIndex] = {}
+
+
+def get_best_day_index(profile: Profile) -> BestDayIndex:
+    """
+    Get the index for a profile, building it the first time
+    Profiles with the same element and branch share an index.
+    
+    Args:
+        profile: Subscriber profile
+        
+    Returns:
+        BestDayIndex
+    """
+    key = (profile.element, profile.branch)
+    index = _INDEXES.get(key)
+    if index is None:
+        index = _INDEXES[key] = BestDayIndex(profile)
+    return index
+
+
+def find_best_days_job(profile: Profile, start: date, end: date, options: dict) -> List[dict]:
+    """
+    Run a best-day query in a worker (module-level so it can be pickled)
+    
+    Args:
+        profile: Subscriber profile
+        start: First date (inclusive)
+        end: Last date (inclusive)
+        options: Keyword arguments for BestDayIndex.query
+        
+    Returns:
+        Query results
+    """
+    return get_best_day_index(profile).query(start, end, **options)
@@ -0,0 +1,228 @@
+"""
+Streaming forecast export (NDJSON or CSV, optionally gzipped)
+Records flow through a generator chain (dates -> batches -> pipeline results ->
+rows -> encoded lines), so memory stays flat however long the range is.
+
+Usage:
+    python -m agents.export export FROM TO [ndjson|csv] [output] [--gzip]
+    e.g. python -m agents.export export 2000-01-01 2029-12-31 csv forecasts.csv.gz --gzip
+"""
+
+import csv
+import gzip
+import io
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List
+
+from config.profiles import Profile
+from agents.pipeline import get_pipeline
+
+# Columns of an exported row, in order
+EXPORT_FIELDS = [
+    "date", "weekday", "lunar_date", "lunar_year", "can_chi", "truc",
+    "personal_day_number", "luck_score", "is_hoang_dao", "has_xung", "menh_state",
+    "should_do", "should_avoid", "cosmic_message", "lucky_color"
+]
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# Dates run through the pipeline per batch (bounds memory)
+EXPORT_BATCH_DAYS = 366
+
+
+def iter_dates(start: datetime, end: datetime) -> Iterator[datetime]:
+    """Every date from start to end (inclusive), lazily"""
+    for offset in range((end - start).days + 1):
+        yield start + timedelta(days=offset)
+
+
+def iter_batches(dates: Iterable[datetime], size: int = EXPORT_BATCH_DAYS) -> Iterator[List[datetime]]:
+    """Group dates into lists of at most size"""
+    batch = []
+    for target_date in dates:
+        batch.append(target_date)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_row(result: dict) -> dict:
+    """
+    Flatten one pipeline result into an export row
+    
+    Args:
+        result: Result of AgentPipeline.run()
+    
+    Returns:
+        dict with EXPORT_FIELDS keys
+    """
+    data = result["data"]
+    meta = result["metaphysical"]
+    strategy = result["strategy"]
+    return {
+        "date": data["solar_date"].strftime("%Y-%m-%d"),
+        "weekday": data["weekday_vn"],
+        "lunar_date": data["lunar_formatted"],
+        "lunar_year": data["lunar_year"],
+        "can_chi": data["can_chi"],
+        "truc": data["truc"],
+        "personal_day_number": data["personal_day_number"],
+        "luck_score": meta["luck_score"],
+        "is_hoang_dao": meta["is_hoang_dao"],
+        "has_xung": meta["has_xung"],
+        "menh_state": meta["menh_state"],
+        "should_do": "; ".join(strategy["should_do"]),
+        "should_avoid": "; ".join(strategy["should_avoid"]),
+        "cosmic_message": strategy["cosmic_message"],
+        "lucky_color": result["telegram"]["lucky_color"]
+    }
+
+
+def iter_rows(profile: Profile, dates: Iterable[datetime]) -> Iterator[dict]:
+    """
+    Export rows for dates, one pipeline batch at a time
+    
+    Args:
+        profile: Subscriber profile
+        dates: Dates to export (any iterable, consumed lazily)
+    
+    Yields:
+        Export rows, in date order
+    """
+    pipeline = get_pipeline(profile)
+    for batch in iter_batches(dates):
+        for result in pipeline.run_many(batch):
+            yield export_row(result)
+
+
+def iter_ndjson(rows: Iterable[dict]) -> Iterator[str]:
+    """One JSON object per line"""
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + "\n"
+
+
+def iter_csv(rows: Iterable[dict], header: bool = True) -> Iterator[str]:
+    """CSV lines (with a header line first unless header=False)"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, lineterminator="\n")
+    
+    def flush() -> str:
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+    
+    if header:
+        writer.writeheader()
+        yield flush()
+    for row in rows:
+        writer.writerow(row)
+        yield flush()
+
+
+def iter_lines(rows: Iterable[dict], fmt: str, header: bool = True) -> Iterator[str]:
+    """
+    Encode rows in an export format
+    
+    Args:
+        rows: Export rows
+        fmt: "ndjson" or "csv"
+        header: Start with the CSV header line (ignored for NDJSON)
+    
+    Yields:
+        Encoded lines
+    
+    Raises:
+        ValueError: On an unknown format
+    """
+    if fmt == "ndjson":
+        return iter_ndjson(rows)
+    if fmt == "csv":
+        return iter_csv(rows, header)
+    raise ValueError(f"Unknown export format: {fmt}. Use one of: {', '.join(EXPORT_FORMATS)}")
+
+
+def export_chunk_job(profile: Profile, dates: List[datetime], fmt: str, header: bool) -> str:
+    """
+    Encode one batch of dates in a worker (used by the streaming HTTP export)
+    
+    Args:
+        profile: Subscriber profile
+        dates: One batch of dates
+        fmt: "ndjson" or "csv"
+        header: Include the CSV header line
+    
+    Returns:
+        Encoded text for the batch
+    """
+    return "".join(iter_lines(iter_rows(profile, dates), fmt, header))
+
+
+def export(output, start: datetime, end: datetime, profile: Profile, fmt: str = "ndjson") -> int:
+    """
+    Stream an export into a text file object
+    
+    Args:
+        output: Writable text file object
+        start: First date (inclusive)
+        end: Last date (inclusive)
+        profile: Subscriber profile
+        fmt: "ndjson" or "csv"
+    
+    Returns:
+        Number of rows written
+    """
+    lines = 0
+    for line in iter_lines(iter_rows(profile, iter_dates(start, end)), fmt):
+        output.write(line)
+        lines += 1
+    # The CSV header line is not a row
+    return lines - 1 if fmt == "csv" else lines
+
+
+def main():
+    """CLI: python -m agents.export export FROM TO [ndjson|csv] [output] [--gzip]"""
+    args = [arg for arg in sys.argv[1:] if arg != "--gzip"]
+    compress = "--gzip" in sys.argv
+    if len(args) < 3 or args[0] != "export":
+        print("Usage: python -m agents.export export YYYY-MM-DD YYYY-MM-DD [ndjson|csv] [output] [--gzip]")
+        sys.exit(1)
+    
+    start = datetime.strptime(args[1], "%Y-%m-%d")
+    end = datetime.strptime(args[2], "%Y-%m-%d")
+    fmt = args[3] if len(args) > 3 else "ndjson"
+    path = args[4] if len(args) > 4 else None
+    if fmt not in EXPORT_FORMATS:
+        print(f"Unknown format: {fmt}. Use one of: {', '.join(EXPORT_FORMATS)}")
+        sys.exit(1)
+    
+    if path is None:
+        # stdout; gzip goes to the binary stream
+        output = gzip.open(sys.stdout.buffer, "wt", encoding="utf-8") if compress else sys.stdout
+    elif compress:
+        output = gzip.open(path, "wt", encoding="utf-8", newline="")
+    else:
+        output = open(path, "w", encoding="utf-8", newline="")
+    
+    began = time.perf_counter()
+    try:
+        rows = export(output, start, end, Profile.from_settings(), fmt)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - began
+    
+    print(
+        f"Exported {rows} rows ({fmt}{', gzip' if compress else ''}) in {elapsed:.2f}s "
+        f"({rows / elapsed:,.0f} rows/s)",
+        file=sys.stderr
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Forecast Engine: memoizes Agent 2 and Agent 3 per forecast state
+Everything they produce depends only on a small tuple (day Can, Chi, Trực,
+season, personal day number + the profile's element, branch and life path),
+so each distinct state is computed once and then served from a table.
+"""
+
+from typing import Tuple
+
+from core.can_chi import CAN_ELEMENT_INDEX, CHI_ELEMENT_INDEX
+from core.constants import NGU_HANH
+
+# Bump whenever agents produce different output for the same state and date
+# (invalidates ETags handed out by the HTTP API)
+ENGINE_VERSION = 2
+
+# State table shared by all profiles: packed state key -> (Agent 2 result, Agent 3 state)
+# Results are shared between dates: treat them as read-only.
+_STATE_TABLE = {}
+
+
+def pack_state(
+    can_index: int,
+    chi_index: int,
+    truc_index: int,
+    season_index: int,
+    personal_day_number: int,
+    element_index: int,
+    branch_index: int,
+    life_path: int
+) -> int:
+    """
+    Pack a forecast state into one int (29 bits)
+    
+    Args:
+        can_index: Day Can (0-9)
+        chi_index: Day Chi (0-11)
+        truc_index: Trực (0-11)
+        season_index: Season (0-3)
+        personal_day_number: Personal day number (1-9)
+        element_index: Profile element (0-4)
+        branch_index: Profile branch (0-11)
+        life_path: Profile life path number (1-9)
+        
+    Returns:
+        Packed state key
+    """
+    return (
+        can_index << 25 | chi_index << 21 | truc_index << 17 | season_index << 15
+        | personal_day_number << 11 | element_index << 8 | branch_index << 4 | life_path
+    )
+
+
+class ForecastEngine:
+    """Serves Agent 2 / Agent 3 results for a profile from the state table"""
+    
+    def __init__(self, pipeline):
+        """
+        Initialize the engine
+        
+        Args:
+            pipeline: AgentPipeline whose agents compute missing states
+        """
+        self.agent2 = pipeline.agent2
+        self.agent3 = pipeline.agent3
+        
+        # The profile part of every key is fixed for this engine
+        profile = pipeline.profile
+        self._profile_bits = profile.element_index << 8 | profile.branch_index << 4 | profile.life_path
+    
+    def state_key(self, data_collector_result: dict) -> int:
+        """
+        Derive the packed state key from an Agent 1 result
+        
+        Args:
+            data_collector_result: Output from Agent 1
+            
+        Returns:
+            Packed state key (see pack_state)
+        """
+        return (
+            data_collector_result["can_index"] << 25
+            | data_collector_result["chi_index"] << 21
+            | data_collector_result["truc_index"] << 17
+            | data_collector_result["season_index"] << 15
+            | data_collector_result["personal_day_number"] << 11
+            | self._profile_bits
+        )
+    
+    def lookup(self, data_collector_result: dict) -> Tuple[dict, dict]:
+        """
+        Get the Agent 2 result and Agent 3 state for a day, computing it once
+        
+        Args:
+            data_collector_result: Output from Agent 1
+            
+        Returns:
+            (metaphysical_result, dev_state) - see DevStrategistAgent.analyze_state
+        """
+        key = self.state_key(data_collector_result)
+        entry = _STATE_TABLE.get(key)
+        if entry is None:
+            meta_result = self.agent2.analyze(data_collector_result)
+            dev_state = self.agent3.analyze_state(data_collector_result, meta_result)
+            entry = _STATE_TABLE[key] = (meta_result, dev_state)
+        return entry
+    
+    def precompute(self) -> int:
+        """
+        Enumerate every reachable state for this profile and fill the table
+        60 Can Chi pairs x 12 Trực x 4 seasons x 9 day numbers = 25,920 states.
+        
+        Returns:
+            Number of states added
+        """
+        before = len(_STATE_TABLE)
+        for sexagenary in range(60):
+            can_index, chi_index = sexagenary % 10, sexagenary % 12
+            for truc_index in range(12):
+                for season_index in range(4):
+                    for personal_day_number in range(1, 10):
+                        self.lookup(_state_data(
+                            can_index, chi_index, truc_index, season_index, personal_day_number
+                        ))
+        return len(_STATE_TABLE) - before
+
+
+def _state_data(
+    can_index: int,
+    chi_index: int,
+    truc_index: int,
+    season_index: int,
+    personal_day_number: int
+) -> dict:
+    """Minimal Agent 1 result carrying only the state fields"""
+    element_can_index = CAN_ELEMENT_INDEX[can_index]
+    element_chi_index = CHI_ELEMENT_INDEX[chi_index]
+    return {
+        "can_index": can_index,
+        "chi_index": chi_index,
+        "truc_index": truc_index,
+        "season_index": season_index,
+        "personal_day_number": personal_day_number,
+        "element_can_index": element_can_index,
+        "element_chi_index": element_chi_index,
+        "element_can": NGU_HANH[element_can_index],
+        "element_chi": NGU_HANH[element_chi_index]
+    }
+
+
+def state_table_size() -> int:
+    """Number of states computed so far in this process"""
+    return len(_STATE_TABLE)
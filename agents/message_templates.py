@@ -0,0 +1,301 @@
+"""
+Message templates: precompiled forecast layouts for each Telegram parse mode
+Static segments (headings, the profile's name and mệnh line) are rendered once
+per profile; per-state fragments (score line, advice lists, cosmic messages)
+are rendered once and reused, so a forecast is a single join.
+"""
+
+import html
+from typing import Callable
+
+# Template formats and the Telegram parse_mode each one is sent with
+PARSE_MODES = {
+    "markdown": "Markdown",
+    "markdownv2": "MarkdownV2",
+    "html": "HTML",
+    "plain": None
+}
+
+# Characters that must be escaped outside entities
+_MARKDOWN_SPECIAL = "_*`["
+_MARKDOWN_V2_SPECIAL = "_*[]()~`>#+-=|{}.!\\"
+_MARKDOWN_V2_CODE_SPECIAL = "`\\"
+
+
+def _escaper(special: str) -> Callable[[str], str]:
+    """
+    Build a function that backslash-escapes every character in special
+    (chained str.replace: much faster than str.translate for short texts
+    that rarely contain any of the characters)
+    """
+    # The backslash itself must be escaped first
+    chars = sorted(special, key=lambda char: char != "\\")
+    
+    def escape(text: str) -> str:
+        for char in chars:
+            if char in text:
+                text = text.replace(char, "\\" + char)
+        return text
+    
+    return escape
+
+
+_escape_markdown = _escaper(_MARKDOWN_SPECIAL)
+_escape_markdown_v2 = _escaper(_MARKDOWN_V2_SPECIAL)
+_escape_markdown_v2_code = _escaper(_MARKDOWN_V2_CODE_SPECIAL)
+
+
+class Style:
+    """How one parse mode escapes text and marks bold and code"""
+    
+    def __init__(
+        self,
+        escape: Callable[[str], str],
+        bold: Callable[[str], str],
+        code: Callable[[str], str]
+    ):
+        """
+        Initialize a style
+        
+        Args:
+            escape: Makes raw text safe to send
+            bold: Raw text -> bold entity
+            code: Raw text -> inline code entity
+        """
+        self.escape = escape
+        self.bold = bold
+        self.code = code
+
+
+STYLES = {
+    # Legacy Markdown cannot escape inside entities; entity text is sent as is
+    "markdown": Style(
+        escape=_escape_markdown,
+        bold=lambda text: f"*{text}*",
+        code=lambda text: f"`{text}`"
+    ),
+    "markdownv2": Style(
+        escape=_escape_markdown_v2,
+        bold=lambda text: f"*{_escape_markdown_v2(text)}*",
+        code=lambda text: f"`{_escape_markdown_v2_code(text)}`"
+    ),
+    "html": Style(
+        escape=lambda text: html.escape(text, quote=False),
+        bold=lambda text: f"<b>{html.escape(text, quote=False)}</b>",
+        code=lambda text: f"<code>{html.escape(text, quote=False)}</code>"
+    ),
+    "plain": Style(
+        escape=lambda text: text,
+        bold=lambda text: text,
+        code=lambda text: text
+    )
+}
+
+
+def get_style(fmt: str) -> Style:
+    """
+    Get the style for a template format
+    
+    Args:
+        fmt: One of PARSE_MODES
+    
+    Returns:
+        Style
+    
+    Raises:
+        ValueError: On an unknown format
+    """
+    style = STYLES.get(fmt)
+    if style is None:
+        raise ValueError(f"Unknown message format: {fmt}. Use one of: {', '.join(STYLES)}")
+    return style
+
+
+class FragmentCache:
+    """Rendered fragments keyed on their inputs (the inputs come from small fixed sets)"""
+    
+    def __init__(self, render: Callable):
+        """
+        Initialize the cache
+        
+        Args:
+            render: Builds the fragment from the key
+        """
+        self.render = render
+        self.fragments = {}
+    
+    def __getitem__(self, key) -> str:
+        """Get the fragment for key, rendering it the first time"""
+        fragment = self.fragments.get(key)
+        if fragment is None:
+            fragment = self.fragments[key] = self.render(key)
+        return fragment
+
+
+class ForecastFragments:
+    """Profile-independent forecast fragments for one format, shared by all templates"""
+    
+    def __init__(self, fmt: str):
+        """
+        Initialize the fragment caches
+        
+        Args:
+            fmt: One of PARSE_MODES
+        """
+        style = get_style(fmt)
+        self.day_numbers = FragmentCache(lambda number: style.bold(str(number)))
+        self.score_lines = FragmentCache(
+            lambda score: (
+                f"\n• {style.escape('Độ may mắn: ')}{style.bold(f'{score}/10')} {'⭐' * min(score, 10)}"
+            )
+        )
+        self.bullets = FragmentCache(
+            lambda items: "".join(f"• {style.escape(item)}\n" for item in items)
+        )
+        self.quotes = FragmentCache(lambda text: style.escape(f'"{text}"'))
+        self.codes = FragmentCache(style.code)
+
+
+# Shared fragments per format
+_FRAGMENTS = {}
+
+
+def get_fragments(fmt: str) -> ForecastFragments:
+    """
+    Get the shared fragments for a format, creating them the first time
+    
+    Args:
+        fmt: One of PARSE_MODES
+        
+    Returns:
+        ForecastFragments
+    """
+    fragments = _FRAGMENTS.get(fmt)
+    if fragments is None:
+        fragments = _FRAGMENTS[fmt] = ForecastFragments(fmt)
+    return fragments
+
+
+class ForecastTemplate:
+    """The daily forecast message for one profile, compiled for one format"""
+    
+    def __init__(self, user_name: str, user_element: str, year_pillar: str, fmt: str = "markdown"):
+        """
+        Compile the static segments
+        
+        Args:
+            user_name: Name shown in the header
+            user_element: User's element (e.g., "Kim")
+            year_pillar: Can Chi of the birth year (e.g., "Tân Tỵ")
+            fmt: One of PARSE_MODES
+        """
+        style = get_style(fmt)
+        self.fmt = fmt
+        self.parse_mode = PARSE_MODES[fmt]
+        self.escape = style.escape
+        bold = style.bold
+        
+        self.header = (
+            f"🔮 {bold(f'BẢN TIN THIÊN CƠ CHO {user_name.upper()}')}\n"
+            f"📅 {bold('Dự báo cho ngày:')} "
+        )
+        self.energy_head = (
+            f"\n\n📊 {bold('Chỉ số năng lượng:')}\n"
+            f"• {style.escape('Thần số học ngày cá nhân: Số ')}"
+        )
+        self.do_head = f"\n\n✅ {bold('NÊN LÀM (Good Commit):')}\n"
+        self.avoid_head = f"\n❌ {bold('NÊN TRÁNH (Bad Request):')}\n"
+        self.cosmic_head = f"\n💡 {bold('LỜI NHẮN VŨ TRỤ (Daily Log):')}\n"
+        self.color_head = f"\n\n🎯 {bold('Màu may mắn:')} "
+        
+        # Per-state fragments, rendered the first time they are needed; only
+        # the mệnh line depends on the profile
+        menh_prefix = style.escape(f"Trạng thái mệnh {user_element} ({year_pillar}): ")
+        self.menh_lines = FragmentCache(lambda state: f"\n• {menh_prefix}{bold(state)}")
+        
+        fragments = get_fragments(fmt)
+        self.day_numbers = fragments.day_numbers
+        self.score_lines = fragments.score_lines
+        self.bullets = fragments.bullets
+        self.quotes = fragments.quotes
+        self.codes = fragments.codes
+    
+    def render(
+        self,
+        data_collector_result: dict,
+        metaphysical_result: dict,
+        dev_strategist_result: dict,
+        lucky_color: str
+    ) -> str:
+        """
+        Render the forecast message
+        
+        Args:
+            data_collector_result: Output from Agent 1
+            metaphysical_result: Output from Agent 2
+            dev_strategist_result: Output from Agent 3
+            lucky_color: Lucky color hex code
+        
+        Returns:
+            Message text in this template's format
+        """
+        data = data_collector_result
+        return "".join((
+            self.header,
+            self.escape(f"{data['solar_formatted']} ({data['lunar_formatted']} - {data['can_chi']})"),
+            self.energy_head,
+            self.day_numbers[data["personal_day_number"]],
+            self.score_lines[metaphysical_result["luck_score"]],
+            self.menh_lines[metaphysical_result["menh_state"]],
+            self.do_head,
+            self.bullets[tuple(dev_strategist_result["should_do"])],
+            self.avoid_head,
+            self.bullets[tuple(dev_strategist_result["should_avoid"])],
+            self.cosmic_head,
+            self.quotes[dev_strategist_result["cosmic_message"]],
+            self.color_head,
+            self.codes[lucky_color]
+        ))
+
+
+class StrategyTemplate:
+    """Agent 3's summary (should do / should avoid / cosmic message), compiled for one format"""
+    
+    def __init__(self, fmt: str = "plain"):
+        """
+        Compile the static segments
+        
+        Args:
+            fmt: One of PARSE_MODES
+        """
+        style = get_style(fmt)
+        self.fmt = fmt
+        self.parse_mode = PARSE_MODES[fmt]
+        
+        self.do_head = f"✅ {style.bold('NÊN LÀM:')}\n"
+        self.avoid_head = f"\n❌ {style.bold('NÊN TRÁNH:')}\n"
+        self.cosmic_head = f"\n💡 {style.bold('LỜI NHẮN VŨ TRỤ:')}\n  "
+        
+        self.bullets = FragmentCache(
+            lambda items: "".join(f"  • {style.escape(item)}\n" for item in items)
+        )
+        self.quotes = FragmentCache(lambda text: style.escape(f'"{text}"'))
+    
+    def render(self, dev_strategist_result: dict) -> str:
+        """
+        Render the summary
+        
+        Args:
+            dev_strategist_result: Output from Agent 3
+        
+        Returns:
+            Summary text in this template's format
+        """
+        return "".join((
+            self.do_head,
+            self.bullets[tuple(dev_strategist_result["should_do"])],
+            self.avoid_head,
+            self.bullets[tuple(dev_strategist_result["should_avoid"])],
+            self.cosmic_head,
+            self.quotes[dev_strategist_result["cosmic_message"]]
+        ))
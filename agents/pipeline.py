@@ -0,0 +1,327 @@
+"""
+Agent Pipeline: runs the 4 agents as one chain
+Supports a single date or a whole batch of dates (stage by stage)
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from config.profiles import Profile
+from core.metrics import REGISTRY
+from core.tracing import PROFILER, TRACER, span
+from agents.agent_1_data_collector import DataCollectorAgent
+from agents.agent_2_metaphysical import MetaphysicalAnalystAgent
+from agents.agent_3_dev_strategist import DevStrategistAgent
+from agents.agent_4_telegram_notifier import TelegramNotifierAgent
+from agents.forecast_engine import ForecastEngine
+
+logger = logging.getLogger(__name__)
+
+# Per-stage timings. agent2 is the state lookup (memoized Agent 2 + Agent 3 state),
+# agent3 completes the strategy for the date; a run_many() call is one batch observation.
+STAGE_SECONDS = REGISTRY.histogram(
+    "agent_stage_seconds", "Agent stage duration per call (one batch for run_many)", ["stage"]
+)
+STAGE_DATES = REGISTRY.counter("agent_stage_dates_total", "Dates processed by each agent stage", ["stage"])
+_STAGES = tuple(
+    (stage, STAGE_SECONDS.labels(stage), STAGE_DATES.labels(stage))
+    for stage in ("agent1", "agent2", "agent3", "agent4")
+)
+
+
+def _observe_stages(dates: int, marks: tuple):
+    """Record stage durations (metrics, and spans while tracing) from consecutive perf_counter() marks"""
+    for (_, seconds, processed), started, ended in zip(_STAGES, marks, marks[1:]):
+        seconds.observe(ended - started)
+        processed.inc(dates)
+    if TRACER.enabled:
+        for (stage, _, _), started, ended in zip(_STAGES, marks, marks[1:]):
+            TRACER.record(stage, started, ended, dates=dates)
+
+
+class AgentPipeline:
+    """The 4-agent chain for one user profile"""
+    
+    def __init__(self, profile: Profile):
+        """
+        Initialize all 4 agents for a profile
+        
+        Args:
+            profile: Subscriber profile (birth data and derived values)
+        """
+        self.profile = profile
+        
+        # Identifies the profile for seeding and caching
+        self.profile_key = profile.seed_key
+        
+        self.agent1 = DataCollectorAgent(
+            user_birth_day=profile.birth_day,
+            user_birth_month=profile.birth_month,
+            profile_key=self.profile_key
+        )
+        
+        self.agent2 = MetaphysicalAnalystAgent(
+            user_element=profile.element,
+            user_branch=profile.branch,
+            user_life_path=profile.life_path
+        )
+        
+        self.agent3 = DevStrategistAgent(
+            user_element=profile.element,
+            user_life_path=profile.life_path
+        )
+        self.agent4 = TelegramNotifierAgent(
+            user_name=profile.name,
+            user_element=profile.element,
+            year_pillar=profile.year_pillar
+        )
+        
+        # Agent 2 / Agent 3 results memoized per forecast state
+        self.engine = ForecastEngine(self)
+    
+    @classmethod
+    def from_settings(cls) -> "AgentPipeline":
+        """Build the pipeline for the user configured in settings"""
+        return cls(Profile.from_settings())
+    
+    def run(self, target_date: datetime) -> dict:
+        """
+        Generate the forecast for one date
+        Agent 1 -> state lookup (Agents 2 and 3, memoized) -> render (Agent 4)
+        
+        Args:
+            target_date: Date to generate forecast for
+        
+        Returns:
+            dict with the result of each agent (data, metaphysical, strategy, telegram)
+        """
+        clock = time.perf_counter
+        t0 = clock()
+        data_result = self.agent1.analyze(target_date)
+        t1 = clock()
+        meta_result, dev_state = self.engine.lookup(data_result)
+        t2 = clock()
+        dev_result = self._strategy_result(data_result, dev_state)
+        t3 = clock()
+        telegram_result = self.agent4.analyze(data_result, meta_result, dev_result)
+        _observe_stages(1, (t0, t1, t2, t3, clock()))
+        
+        return {
+            "data": data_result,
+            "metaphysical": meta_result,
+            "strategy": dev_result,
+            "telegram": telegram_result
+        }
+    
+    def run_full(self, target_date: datetime) -> dict:
+        """
+        Run all 4 agents sequentially for one date, without the state table
+        
+        Args:
+            target_date: Date to generate forecast for
+        
+        Returns:
+            Same format as run()
+        """
+        # Agent 1: Data Collection
+        logger.debug("Running Agent 1: Data Collector")
+        data_result = self.agent1.analyze(target_date)
+        
+        # Agent 2: Metaphysical Analysis
+        logger.debug("Running Agent 2: Metaphysical Analyst")
+        meta_result = self.agent2.analyze(data_result)
+        
+        # Agent 3: Dev Strategy
+        logger.debug("Running Agent 3: Dev Strategist")
+        dev_result = self.agent3.analyze(data_result, meta_result)
+        
+        # Agent 4: Telegram Formatting
+        logger.debug("Running Agent 4: Telegram Notifier")
+        telegram_result = self.agent4.analyze(data_result, meta_result, dev_result)
+        
+        return {
+            "data": data_result,
+            "metaphysical": meta_result,
+            "strategy": dev_result,
+            "telegram": telegram_result
+        }
+    
+    def _strategy_result(self, data_result: dict, dev_state: dict) -> dict:
+        """Complete a memoized Agent 3 state with the date's cosmic message"""
+        return {
+            "should_do": dev_state["should_do"],
+            "should_avoid": dev_state["should_avoid"],
+            "cosmic_message": self.agent3._generate_cosmic_message(
+                data_collector_result=data_result,
+                cosmic_messages=dev_state["cosmic_messages"]
+            ),
+            "agent": "DevStrategistAgent"
+        }
+    
+    def run_many(self, dates: Iterable[datetime]) -> List[dict]:
+        """
+        Run the 4-agent chain for a batch of dates, one stage at a time
+        
+        Args:
+            dates: Dates to generate forecasts for (list, range, generator...)
+        
+        Returns:
+            List of results in the same order and format as run()
+        """
+        dates = list(dates)
+        logger.info(f"Running agent chain for {len(dates)} dates")
+        
+        clock = time.perf_counter
+        t0 = clock()
+        data_results = self.agent1.analyze_many(dates)
+        t1 = clock()
+        states = [self.engine.lookup(data_result) for data_result in data_results]
+        meta_results = [meta_result for meta_result, _ in states]
+        t2 = clock()
+        dev_results = [
+            self._strategy_result(data_result, dev_state)
+            for data_result, (_, dev_state) in zip(data_results, states)
+        ]
+        t3 = clock()
+        telegram_results = self.agent4.analyze_many(data_results, meta_results, dev_results)
+        _observe_stages(len(dates), (t0, t1, t2, t3, clock()))
+        
+        return [
+            {
+                "data": data_result,
+                "metaphysical": meta_result,
+                "strategy": dev_result,
+                "telegram": telegram_result
+            }
+            for data_result, meta_result, dev_result, telegram_result
+            in zip(data_results, meta_results, dev_results, telegram_results)
+        ]
+    
+    def evaluate_many(self, dates: Iterable[datetime]) -> List[dict]:
+        """
+        Score a batch of dates without rendering full forecasts
+        Agent 1 in one batch, then the memoized Agent 2 state per date;
+        Agents 3 and 4 are skipped entirely.
+        
+        Args:
+            dates: Dates to evaluate
+        
+        Returns:
+            List of dicts (date, luck_score, is_hoang_dao, has_xung, can_chi, truc), in date order
+        """
+        data_results = self.agent1.analyze_many(dates)
+        
+        summaries = []
+        for data_result in data_results:
+            meta_result, _ = self.engine.lookup(data_result)
+            summaries.append({
+                "date": data_result["solar_date"],
+                "luck_score": meta_result["luck_score"],
+                "is_hoang_dao": meta_result["is_hoang_dao"],
+                "has_xung": meta_result["has_xung"],
+                "can_chi": data_result["can_chi"],
+                "truc": data_result["truc"]
+            })
+        return summaries
+
+
+# Pipelines built inside this process, keyed on Profile.forecast_key
+_PIPELINES = {}
+
+
+def get_pipeline(profile: Profile) -> AgentPipeline:
+    """
+    Get the pipeline for a profile, building it only the first time
+    Subscribers with the same birth data share one set of agents.
+    
+    Args:
+        profile: Subscriber profile
+    
+    Returns:
+        AgentPipeline
+    """
+    pipeline = _PIPELINES.get(profile.forecast_key)
+    if pipeline is None:
+        pipeline = _PIPELINES[profile.forecast_key] = AgentPipeline(profile)
+    return pipeline
+
+
+def run_chain_job(profile: Profile, dates: List[datetime]) -> List[dict]:
+    """
+    Run the chain for a batch of dates in a worker (thread or process)
+    Module-level so it can be pickled for a process pool.
+    
+    Args:
+        profile: Subscriber profile
+        dates: Dates to generate forecasts for
+    
+    Returns:
+        List of results, same format as AgentPipeline.run()
+    """
+    with span("chain_job", dates=len(dates)):
+        return PROFILER.run(_run_chain, get_pipeline(profile), dates)
+
+
+def _run_chain(pipeline: AgentPipeline, dates: List[datetime]) -> List[dict]:
+    """Body of run_chain_job (the part the chain profiler samples)"""
+    if len(dates) == 1:
+        return [pipeline.run(dates[0])]
+    return pipeline.run_many(dates)
+
+
+def run_fanout_job(profiles: List[Profile], target_date: datetime) -> Dict[tuple, str]:
+    """
+    Render one date's forecast for many profiles in a worker
+    Each distinct forecast_key is computed once, however many chats share it.
+    
+    Args:
+        profiles: Subscriber profiles
+        target_date: Date to generate forecasts for
+    
+    Returns:
+        dict of forecast_key -> formatted Telegram message
+    """
+    with span("fanout_job", profiles=len(profiles)):
+        return PROFILER.run(_run_fanout, profiles, target_date)
+
+
+def _run_fanout(profiles: List[Profile], target_date: datetime) -> Dict[tuple, str]:
+    """Body of run_fanout_job (the part the chain profiler samples)"""
+    messages = {}
+    for profile in profiles:
+        if profile.forecast_key not in messages:
+            result = get_pipeline(profile).run(target_date)
+            messages[profile.forecast_key] = result["telegram"]["message"]
+    return messages
+
+
+def run_evaluate_job(profile: Profile, dates: List[datetime]) -> List[dict]:
+    """
+    Score a batch of dates in a worker (see AgentPipeline.evaluate_many)
+    
+    Args:
+        profile: Subscriber profile
+        dates: Dates to evaluate
+    
+    Returns:
+        Day summaries, in date order
+    """
+    return get_pipeline(profile).evaluate_many(dates)
+
+
+def run_calendar_job(profile: Profile, dates: List[datetime], title: str) -> List[str]:
+    """
+    Render a calendar grid for a range of dates in a worker
+    
+    Args:
+        profile: Subscriber profile
+        dates: Consecutive dates to show
+        title: Calendar title (e.g. "THÁNG 01/2026")
+    
+    Returns:
+        Message chunks, each within Telegram's length limit
+    """
+    pipeline = get_pipeline(profile)
+    return pipeline.agent4.format_calendar(title, pipeline.evaluate_many(dates))
@@ -0,0 +1 @@
+"""Benchmarks package - throughput measurements for core and agents"""
@@ -0,0 +1,48 @@
+"""
+Benchmark: per-date agent chain vs batch pipeline
+Usage: python -m benchmarks.bench_agent_chain [days]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+
+from agents.pipeline import AgentPipeline
+
+
+def bench_per_date(pipeline: AgentPipeline, dates: list) -> float:
+    """Run the chain once per date, like the original scheduler loop"""
+    start = time.perf_counter()
+    for target_date in dates:
+        pipeline.run(target_date)
+    return time.perf_counter() - start
+
+
+def bench_batch(pipeline: AgentPipeline, dates: list) -> float:
+    """Run the whole batch through run_many()"""
+    start = time.perf_counter()
+    pipeline.run_many(dates)
+    return time.perf_counter() - start
+
+
+def main():
+    """Main benchmark function"""
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 3650
+    start_date = datetime(2025, 1, 1)
+    dates = [start_date + timedelta(days=i) for i in range(days)]
+    pipeline = AgentPipeline.from_settings()
+    
+    # Warm up
+    pipeline.run_many(dates[:100])
+    
+    per_date = bench_per_date(pipeline, dates)
+    batch = bench_batch(pipeline, dates)
+    
+    print(f"Dates: {days}")
+    print(f"Per-date loop: {days / per_date:,.0f} forecasts/s ({per_date:.3f}s)")
+    print(f"Batch:         {days / batch:,.0f} forecasts/s ({batch:.3f}s)")
+    print(f"Speedup:       {per_date / batch:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: full 4-agent chain vs state-table lookup path
+Usage: python -m benchmarks.bench_forecast_engine [days]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+
+from agents.pipeline import AgentPipeline
+
+
+def bench(func, dates: list) -> float:
+    """Call func once per date, return elapsed seconds"""
+    start = time.perf_counter()
+    for target_date in dates:
+        func(target_date)
+    return time.perf_counter() - start
+
+
+def main():
+    """Main benchmark function"""
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 3650
+    start_date = datetime(2025, 1, 1)
+    dates = [start_date + timedelta(days=i) for i in range(days)]
+    pipeline = AgentPipeline.from_settings()
+    
+    start = time.perf_counter()
+    states = pipeline.engine.precompute()
+    precompute = time.perf_counter() - start
+    
+    full = bench(pipeline.run_full, dates)
+    lookup = bench(pipeline.run, dates)
+    
+    # Agent 2 + 3 only: what the table replaces
+    data_results = pipeline.agent1.analyze_many(dates)
+    start = time.perf_counter()
+    for data_result in data_results:
+        meta_result = pipeline.agent2.analyze(data_result)
+        pipeline.agent3.analyze(data_result, meta_result)
+    agents_2_3 = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for data_result in data_results:
+        pipeline.engine.lookup(data_result)
+    table = time.perf_counter() - start
+    
+    print(f"Precompute:      {states} states in {precompute:.3f}s")
+    print(f"Full chain:      {days / full:,.0f} forecasts/s")
+    print(f"Lookup + render: {days / lookup:,.0f} forecasts/s ({full / lookup:.2f}x)")
+    print(f"Agents 2+3:      {days / agents_2_3:,.0f} days/s")
+    print(f"State lookup:    {days / table:,.0f} days/s ({agents_2_3 / table:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
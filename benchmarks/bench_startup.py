@@ -0,0 +1,114 @@
+"""
+Benchmark: cold-start import time, from `python -X importtime`
+Reports the modules on the critical path to /health (importing main) and the
+ones deferred until after the server is up, and fails when the critical path
+exceeds its budget.
+
+Usage: python -m benchmarks.bench_startup [budget_ms] [runs]
+"""
+
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Critical path (import main) budget in milliseconds
+STARTUP_BUDGET_MS = 250
+
+# Deferred imports, loaded by main.load_services() after /health is bound
+DEFERRED_MODULES = ("bot.telegram_bot", "bot.api")
+
+# Modules listed per phase
+TOP_MODULES = 12
+
+
+def import_times(code: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Run code in a fresh interpreter under -X importtime
+    
+    Args:
+        code: Python source for -c
+    
+    Returns:
+        List of (module, depth, self_us, cumulative_us), in import order
+    """
+    env = dict(os.environ)
+    env.setdefault("TELEGRAM_BOT_TOKEN", "0:benchmark")
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env, check=True
+    )
+    
+    times = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        times.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return times
+
+
+def best_of(code: str, runs: int) -> Dict[str, Tuple[int, int, int]]:
+    """
+    Fastest of several runs, per module (import time is noisy)
+    
+    Args:
+        code: Python source for -c
+        runs: Number of interpreter runs
+    
+    Returns:
+        dict of module -> (depth, self_us, cumulative_us)
+    """
+    best = {}
+    for _ in range(runs):
+        for name, depth, self_us, cumulative_us in import_times(code):
+            if name not in best or cumulative_us < best[name][2]:
+                best[name] = (depth, self_us, cumulative_us)
+    return best
+
+
+def report(title: str, times: Dict[str, Tuple[int, int, int]], roots) -> float:
+    """
+    Print the slowest top-level imports of a phase
+    
+    Args:
+        title: Phase name
+        times: Output of best_of()
+        roots: Modules the phase imports (their cumulative time is the total)
+    
+    Returns:
+        Phase total in milliseconds
+    """
+    total = sum(times[root][2] for root in roots if root in times) / 1000
+    print(f"{title}: {total:.1f} ms")
+    top_level = [(name, cumulative) for name, (depth, _, cumulative) in times.items() if depth <= 1]
+    for name, cumulative in sorted(top_level, key=lambda item: -item[1])[:TOP_MODULES]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    return total
+
+
+def main():
+    """Main benchmark function"""
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else STARTUP_BUDGET_MS
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    
+    critical = best_of("import main", runs)
+    critical_ms = report("Critical path (import main)", critical, ["main"])
+    
+    # Deferred modules, timed on top of main (shared modules are already loaded)
+    deferred = best_of(f"import main; import {', '.join(DEFERRED_MODULES)}", runs)
+    deferred = {name: value for name, value in deferred.items() if name not in critical}
+    print()
+    report("Deferred (after /health)", deferred, DEFERRED_MODULES)
+    
+    print()
+    if critical_ms > budget:
+        print(f"FAIL: critical path {critical_ms:.1f} ms exceeds the {budget:.0f} ms budget")
+        sys.exit(1)
+    print(f"OK: critical path {critical_ms:.1f} ms within the {budget:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
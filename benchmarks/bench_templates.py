@@ -0,0 +1,103 @@
+"""
+Benchmark: message rendering, f-string concatenation vs compiled templates
+Usage: python -m benchmarks.bench_templates [days] [profiles]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+
+from config.profiles import Profile
+from agents.agent_4_telegram_notifier import TelegramNotifierAgent
+from agents.message_templates import PARSE_MODES, ForecastTemplate
+from agents.pipeline import AgentPipeline
+
+
+def format_concat(agent: TelegramNotifierAgent, data: dict, meta: dict, dev: dict, lucky_color: str) -> str:
+    """The f-string / += formatting the templates replaced (Markdown only)"""
+    message = f"""🔮 *BẢN TIN THIÊN CƠ CHO {agent.user_name.upper()}*
+📅 *Dự báo cho ngày:* {data['solar_formatted']} ({data['lunar_formatted']} - {data['can_chi']})
+
+📊 *Chỉ số năng lượng:*
+• Thần số học ngày cá nhân: Số *{data['personal_day_number']}*
+• Độ may mắn: *{meta['luck_score']}/10* {"⭐" * min(meta['luck_score'], 10)}
+• Trạng thái mệnh {agent.user_element} ({agent.year_pillar}): *{meta['menh_state']}*
+
+✅ *NÊN LÀM (Good Commit):*
+"""
+    for item in dev["should_do"]:
+        message += f"• {item}\n"
+    message += f"\n❌ *NÊN TRÁNH (Bad Request):*\n"
+    for item in dev["should_avoid"]:
+        message += f"• {item}\n"
+    message += f"""
+💡 *LỜI NHẮN VŨ TRỤ (Daily Log):*
+"{dev['cosmic_message']}"
+
+🎯 *Màu may mắn:* `{lucky_color}`
+"""
+    return message.strip()
+
+
+def bench(render, results: list) -> float:
+    """Render every result once, return elapsed seconds"""
+    start = time.perf_counter()
+    for data, meta, dev in results:
+        render(data, meta, dev, "#C0C0C0")
+    return time.perf_counter() - start
+
+
+def main():
+    """Main benchmark function"""
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 3650
+    profiles = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    
+    # Agent results are computed up front: only rendering is timed
+    pipeline = AgentPipeline.from_settings()
+    start_date = datetime(2025, 1, 1)
+    results = [
+        (result["data"], result["metaphysical"], result["strategy"])
+        for result in pipeline.run_many(start_date + timedelta(days=i) for i in range(days))
+    ]
+    agent = pipeline.agent4
+    
+    print(f"Batch: {days} dates, one profile")
+    concat = bench(lambda *args: format_concat(agent, *args), results)
+    print(f"  f-string concat: {days / concat:,.0f} messages/s")
+    for fmt in PARSE_MODES:
+        template = agent.get_template(fmt)
+        compiled = bench(template.render, results)
+        print(f"  template {fmt:<10} {days / compiled:,.0f} messages/s ({concat / compiled:.2f}x)")
+    
+    # Fan-out: one date, many profiles (template compiled once per profile)
+    base = Profile.from_settings()
+    agents = [
+        TelegramNotifierAgent(f"{base.name} {i}", base.element, base.year_pillar)
+        for i in range(profiles)
+    ]
+    data, meta, dev = results[0]
+    
+    start = time.perf_counter()
+    for fanout_agent in agents:
+        format_concat(fanout_agent, data, meta, dev, "#C0C0C0")
+    concat = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    templates = [
+        ForecastTemplate(a.user_name, a.user_element, a.year_pillar) for a in agents
+    ]
+    compile_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for template in templates:
+        template.render(data, meta, dev, "#C0C0C0")
+    compiled = time.perf_counter() - start
+    
+    print(f"\nFan-out: one date, {profiles} profiles")
+    print(f"  f-string concat: {profiles / concat:,.0f} messages/s")
+    print(f"  template render: {profiles / compiled:,.0f} messages/s ({concat / compiled:.2f}x)")
+    print(f"  template compile: {compile_time * 1e6 / profiles:.1f} µs/profile (once per profile)")
+
+
+if __name__ == "__main__":
+    main()
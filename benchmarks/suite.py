@@ -0,0 +1,254 @@
+"""
+Benchmark suite: core calculations, each agent and the full chain
+Results are saved as a JSON baseline; compare flags cases that got slower than
+the baseline by more than a threshold (exit code 1), so each optimisation can
+be measured against the previous tree.
+
+Usage:
+    python -m benchmarks.suite run [output.json] [--quick] [--filter TEXT]
+    python -m benchmarks.suite compare BASELINE.json [CURRENT.json] [--threshold PCT] [--quick] [--filter TEXT]
+"""
+
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+from config.profiles import Profile
+from core.lunar_calendar import get_lunar_date
+from core.can_chi import get_can_chi_day
+from core.numerology import calculate_personal_day_number
+from agents.pipeline import AgentPipeline, run_chain_job
+
+DEFAULT_OUTPUT = "benchmarks/baseline.json"
+
+# Slowdown (percent of ns/op) reported as a regression
+DEFAULT_THRESHOLD = 10.0
+
+# Dates cycled through by the per-call cases
+SAMPLE_DAYS = 3650
+START_DATE = datetime(2025, 1, 1)
+
+
+def _dates(days: int, start: datetime = START_DATE) -> List[datetime]:
+    """days consecutive dates from start"""
+    return [start + timedelta(days=i) for i in range(days)]
+
+
+def build_cases(quick: bool = False) -> List[Tuple[str, Callable[[], None], int]]:
+    """
+    Benchmark cases
+    
+    Args:
+        quick: Smaller inputs (smoke run, not for baselines)
+    
+    Returns:
+        List of (name, func, ops): func() performs ops operations
+    """
+    profile = Profile.from_settings()
+    pipeline = AgentPipeline(profile)
+    dates = _dates(365 if quick else SAMPLE_DAYS)
+    
+    # Agent inputs are prepared up front so each case times one stage only
+    data = [pipeline.agent1.analyze(d) for d in dates]
+    meta = [pipeline.agent2.analyze(result) for result in data]
+    dev = [pipeline.agent3.analyze(d, m) for d, m in zip(data, meta)]
+    
+    def per_date(func):
+        return lambda: [func(i) for i in range(len(dates))]
+    
+    cases = [
+        ("core.get_lunar_date", per_date(lambda i: get_lunar_date(dates[i])), len(dates)),
+        ("core.get_can_chi_day", per_date(lambda i: get_can_chi_day(dates[i])), len(dates)),
+        (
+            "core.calculate_personal_day_number",
+            per_date(lambda i: calculate_personal_day_number(dates[i], profile.birth_day, profile.birth_month)),
+            len(dates)
+        ),
+        ("agent1.analyze", per_date(lambda i: pipeline.agent1.analyze(dates[i])), len(dates)),
+        ("agent2.analyze", per_date(lambda i: pipeline.agent2.analyze(data[i])), len(dates)),
+        ("agent3.analyze", per_date(lambda i: pipeline.agent3.analyze(data[i], meta[i])), len(dates)),
+        ("agent4.analyze", per_date(lambda i: pipeline.agent4.analyze(data[i], meta[i], dev[i])), len(dates)),
+        ("chain.single_full", per_date(lambda i: pipeline.run_full(dates[i])), len(dates)),
+        ("chain.single", per_date(lambda i: run_chain_job(profile, [dates[i]])), len(dates)),
+    ]
+    
+    # Whole ranges in one job, as the scheduler and exports submit them
+    for years in (1, 10) if quick else (1, 10, 100):
+        range_dates = _dates(round(years * 365.25), datetime(2000, 1, 1))
+        cases.append((
+            f"chain.range_{years}y",
+            lambda range_dates=range_dates: run_chain_job(profile, range_dates),
+            len(range_dates)
+        ))
+    return cases
+
+
+def measure(func: Callable[[], None], ops: int, min_time: float = 0.2, repeat: int = 5) -> dict:
+    """
+    Time a case: best of several repeats, GC disabled (like timeit)
+    
+    Args:
+        func: Case function
+        ops: Operations per call
+        min_time: Minimum seconds per repeat (func is called in a loop to reach it)
+        repeat: Number of repeats
+    
+    Returns:
+        dict with ns_per_op, ops_per_s, ops, loops, repeat
+    """
+    func()  # warm-up (caches, first-use setup)
+    
+    # Calls per repeat so each repeat runs for at least min_time
+    start = time.perf_counter()
+    func()
+    single = time.perf_counter() - start
+    loops = max(1, int(min_time / single) if single > 0 else 1)
+    
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter_ns()
+            for _ in range(loops):
+                func()
+            elapsed = time.perf_counter_ns() - start
+            best = elapsed if best is None else min(best, elapsed)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    
+    ns_per_op = best / (loops * ops)
+    return {
+        "ns_per_op": round(ns_per_op, 1),
+        "ops_per_s": round(1e9 / ns_per_op, 1),
+        "ops": ops,
+        "loops": loops,
+        "repeat": repeat
+    }
+
+
+def _git_commit() -> Optional[str]:
+    """Current commit hash, if available"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(quick: bool = False, name_filter: Optional[str] = None) -> dict:
+    """
+    Run every case (or those whose name contains name_filter)
+    
+    Args:
+        quick: Smaller inputs and shorter timing
+        name_filter: Substring of case names to run
+    
+    Returns:
+        dict with "meta" and "results" (case name -> measure() output)
+    """
+    results = {}
+    for name, func, ops in build_cases(quick):
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = measure(func, ops, min_time=0.05 if quick else 0.2, repeat=3 if quick else 5)
+        print(f"  {name:<36} {results[name]['ns_per_op']:>12,.0f} ns/op  {results[name]['ops_per_s']:>12,.0f} ops/s")
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick
+        },
+        "results": results
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+    Compare two suite results
+    
+    Args:
+        baseline: Earlier run_suite() output
+        current: New run_suite() output
+        threshold: Slowdown in percent reported as a regression
+    
+    Returns:
+        Names of regressed cases
+    """
+    regressions = []
+    print(f"{'case':<36} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<36} {'-':>12} {result['ns_per_op']:>12,.0f}      new")
+            continue
+        change = (result["ns_per_op"] / before["ns_per_op"] - 1) * 100
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:<36} {before['ns_per_op']:>12,.0f} {result['ns_per_op']:>12,.0f} {change:>+8.1f}%{flag}")
+    return regressions
+
+
+def _option(args: List[str], flag: str) -> Optional[str]:
+    """Value following flag in args (both removed), or None"""
+    if flag not in args:
+        return None
+    index = args.index(flag)
+    value = args[index + 1] if index + 1 < len(args) else None
+    del args[index:index + 2]
+    return value
+
+
+def main():
+    """CLI: run | compare"""
+    args = sys.argv[1:]
+    quick = "--quick" in args
+    args = [arg for arg in args if arg != "--quick"]
+    name_filter = _option(args, "--filter")
+    threshold = float(_option(args, "--threshold") or DEFAULT_THRESHOLD)
+    
+    if not args or args[0] not in ("run", "compare") or (args[0] == "compare" and len(args) < 2):
+        print(__doc__.strip().split("Usage:")[1].strip())
+        sys.exit(1)
+    
+    if args[0] == "run":
+        output = args[1] if len(args) > 1 else DEFAULT_OUTPUT
+        print(f"Running benchmark suite{' (quick)' if quick else ''}")
+        suite = run_suite(quick, name_filter)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(suite, f, indent=2)
+        print(f"Saved {len(suite['results'])} results to {output}")
+        return
+    
+    with open(args[1], encoding="utf-8") as f:
+        baseline = json.load(f)
+    if len(args) > 2:
+        with open(args[2], encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        print(f"Running benchmark suite{' (quick)' if quick else ''}")
+        current = run_suite(quick, name_filter)
+        print()
+    
+    regressions = compare(baseline, current, threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {threshold:g}%: {', '.join(regressions)}")
+        sys.exit(1)
+    print(f"\nNo regressions over {threshold:g}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""
+Read-only HTTP forecast API, mounted on the health check server's aiohttp app
+Responses are cached per (query, profile) in the scheduler's forecast cache and
+carry a strong ETag, so dashboards polling the same query get a 304.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Optional
+
+from aiohttp import web
+
+from config.settings import settings
+from config.profiles import Profile
+from core.lunar_calendar import get_vietnam_datetime
+from core.lunar_table import FIRST_ORDINAL, END_ORDINAL
+from agents.forecast_engine import ENGINE_VERSION
+from agents.export import EXPORT_FORMATS, export_chunk_job, iter_batches, iter_dates
+
+logger = logging.getLogger(__name__)
+
+# Longest range /api/range evaluates in one request (days)
+MAX_RANGE_DAYS = 366
+
+# Longest range /api/export streams in one request (days)
+MAX_EXPORT_DAYS = 200 * 366
+
+# Default /api/best-days range (days from tomorrow) and maximum number of days returned
+BEST_DAYS_RANGE = 90
+MAX_BEST_DAYS = 50
+
+
+class ForecastAPI:
+    """JSON endpoints (/api/forecast, /api/range, /api/best-days) and the streaming /api/export"""
+    
+    def __init__(self, telegram_bot):
+        """
+        Initialize the API
+        
+        Args:
+            telegram_bot: TelegramBot whose scheduler computes and caches forecasts
+        """
+        self.telegram_bot = telegram_bot
+    
+    def register_routes(self, router):
+        """
+        Mount the API endpoints
+        
+        Args:
+            router: aiohttp router (app.router, before the runner is set up) or the
+                health check server's deferred routes (after it is up)
+        """
+        router.add_get("/api/forecast", self.forecast)
+        router.add_get("/api/range", self.range)
+        router.add_get("/api/best-days", self.best_days)
+        router.add_get("/api/export", self.export)
+    
+    async def forecast(self, request: web.Request) -> web.Response:
+        """
+        GET /api/forecast?date=YYYY-MM-DD[&chat_id=...]
+        Full forecast for one date (default: tomorrow)
+        """
+        scheduler = self._scheduler()
+        profile = self._profile(request, scheduler)
+        target_date = _parse_date(request.query.get("date")) or _tomorrow()
+        
+        async def build():
+            results = await scheduler.run_agent_chain_many([target_date], profile, structured=True)
+            return _forecast_payload(results[0])
+        
+        return await self._respond(
+            request, ("forecast", target_date.date()), profile, build,
+            implicit_date="date" not in request.query
+        )
+    
+    async def range(self, request: web.Request) -> web.Response:
+        """
+        GET /api/range?from=YYYY-MM-DD&to=YYYY-MM-DD[&chat_id=...]
+        Luck score, Hoàng Đạo and Xung for every day in the range
+        """
+        scheduler = self._scheduler()
+        profile = self._profile(request, scheduler)
+        start = _parse_date(request.query.get("from"), "from")
+        end = _parse_date(request.query.get("to"), "to")
+        if start is None or end is None:
+            raise _bad_request("Both 'from' and 'to' are required")
+        if end < start:
+            raise _bad_request("'to' must not be before 'from'")
+        if (end - start).days + 1 > MAX_RANGE_DAYS:
+            raise _bad_request(f"Range is limited to {MAX_RANGE_DAYS} days")
+        
+        async def build():
+            days = await scheduler.evaluate_range(start, end, profile)
+            return {
+                "from": start.date().isoformat(),
+                "to": end.date().isoformat(),
+                "days": [_day_payload(day) for day in days]
+            }
+        
+        return await self._respond(request, ("range", start.date(), end.date()), profile, build)
+    
+    async def best_days(self, request: web.Request) -> web.Response:
+        """
+        GET /api/best-days?from=&to=&k=5&min_score=&hoang_dao=1&no_xung=1&truc=&weekday=[&chat_id=...]
+        Top-K days in the range (default: the next 90 days); weekday is 0=Monday ... 6=Sunday
+        """
+        scheduler = self._scheduler()
+        query = request.query
+        profile = self._profile(request, scheduler)
+        start = _parse_date(query.get("from"), "from") or _tomorrow()
+        # The default range stops at the end of the lunar table
+        end = _parse_date(query.get("to"), "to") or min(
+            start + timedelta(days=BEST_DAYS_RANGE - 1), datetime.fromordinal(END_ORDINAL - 1)
+        )
+        if end < start:
+            raise _bad_request("'to' must not be before 'from'")
+        
+        options = {
+            "top_k": max(1, min(_parse_int(query, "k", 5), MAX_BEST_DAYS)),
+            "min_score": _parse_int(query, "min_score", 1),
+            "hoang_dao_only": _parse_flag(query, "hoang_dao"),
+            "no_xung": _parse_flag(query, "no_xung"),
+            "truc": query.get("truc") or None,
+            "weekday": _parse_int(query, "weekday", None)
+        }
+        
+        async def build():
+            try:
+                days = await scheduler.find_best_days(start, end, profile, **options)
+            except ValueError as e:
+                raise _bad_request(str(e))
+            return {
+                "from": start.date().isoformat(),
+                "to": end.date().isoformat(),
+                "days": [_day_payload(day) for day in days]
+            }
+        
+        params = ("best-days", start.date(), end.date(), tuple(sorted(options.items())))
+        return await self._respond(request, params, profile, build, implicit_date="from" not in query)
+    
+    async def export(self, request: web.Request) -> web.StreamResponse:
+        """
+        GET /api/export?from=YYYY-MM-DD&to=YYYY-MM-DD&format=ndjson|csv[&gzip=1][&chat_id=...]
+        Streams every day's forecast as a chunked response, one batch at a time,
+        so memory stays flat however long the range is
+        """
+        scheduler = self._scheduler()
+        query = request.query
+        profile = self._profile(request, scheduler)
+        start = _parse_date(query.get("from"), "from")
+        end = _parse_date(query.get("to"), "to")
+        fmt = query.get("format", "ndjson")
+        compress = _parse_flag(query, "gzip")
+        if start is None or end is None:
+            raise _bad_request("Both 'from' and 'to' are required")
+        if end < start:
+            raise _bad_request("'to' must not be before 'from'")
+        if (end - start).days + 1 > MAX_EXPORT_DAYS:
+            raise _bad_request(f"Range is limited to {MAX_EXPORT_DAYS} days")
+        if fmt not in EXPORT_FORMATS:
+            raise _bad_request(f"Unknown format: {fmt}. Use one of: {', '.join(EXPORT_FORMATS)}")
+        
+        filename = f"forecasts_{start.strftime('%Y%m%d')}_{end.strftime('%Y%m%d')}.{fmt}"
+        content_type = "application/x-ndjson" if fmt == "ndjson" else "text/csv"
+        if compress:
+            filename += ".gz"
+            content_type = "application/gzip"
+        
+        response = web.StreamResponse(headers={
+            "Content-Type": content_type,
+            "Content-Disposition": f'attachment; filename="{filename}"'
+        })
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        
+        # wbits=31: gzip container
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+        began = time.perf_counter()
+        rows = 0
+        try:
+            for i, batch in enumerate(iter_batches(iter_dates(start, end))):
+                # Rows are computed and encoded off the event loop
+                text = await scheduler.executor.run(export_chunk_job, profile, batch, fmt, i == 0)
+                data = text.encode("utf-8")
+                if compressor:
+                    data = compressor.compress(data)
+                if data:
+                    await response.write(data)
+                rows += len(batch)
+        except ConnectionResetError:
+            logger.info(f"Export client disconnected after {rows} rows")
+            return response
+        except Exception as e:
+            # Headers are already sent: drop the connection without the terminating chunk,
+            # so the client sees an incomplete download rather than a short but valid file
+            logger.error(f"Export failed after {rows} rows: {e}", exc_info=True)
+            if request.transport is not None:
+                request.transport.close()
+            return response
+        
+        try:
+            if compressor:
+                await response.write(compressor.flush())
+            await response.write_eof()
+        except ConnectionResetError:
+            logger.info(f"Export client disconnected after {rows} rows")
+            return response
+        
+        elapsed = time.perf_counter() - began
+        logger.info(f"Exported {rows} rows ({fmt}) in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)")
+        return response
+    
+    def _scheduler(self):
+        """The running scheduler (503 while the bot is still starting)"""
+        scheduler = self.telegram_bot.scheduler
+        if scheduler is None:
+            raise web.HTTPServiceUnavailable(
+                text=json.dumps({"error": "Service is starting"}),
+                content_type="application/json"
+            )
+        return scheduler
+    
+    def _profile(self, request: web.Request, scheduler) -> Profile:
+        """
+        Profile a query is for: the .env user, or a subscriber's with chat_id=
+        
+        Args:
+            request: Incoming request (API_TOKEN in X-API-Token or ?token= for chat_id=)
+            scheduler: The running scheduler
+        
+        Returns:
+            Profile
+        
+        Raises:
+            web.HTTPForbidden: If chat_id is given without a valid token (or API_TOKEN is not set)
+        """
+        chat_id = request.query.get("chat_id")
+        if not chat_id:
+            return scheduler.default_profile
+        token = request.headers.get("X-API-Token") or request.query.get("token", "")
+        if not settings.API_TOKEN or not hmac.compare_digest(token.encode(), settings.API_TOKEN.encode()):
+            raise web.HTTPForbidden(
+                text=json.dumps({"error": "chat_id requires a valid API token"}),
+                content_type="application/json"
+            )
+        return scheduler.get_profile(chat_id)
+    
+    async def _respond(
+        self, request: web.Request, params: tuple, profile: Profile, build, implicit_date: bool = False
+    ) -> web.Response:
+        """
+        Answer a query: 304 when the client already has it, else the cached or freshly built body
+        
+        Args:
+            request: Incoming request
+            params: Normalized query parameters (endpoint first)
+            profile: Profile the query is for
+            build: Coroutine function returning the JSON-serializable payload
+            implicit_date: Whether the dates default to "tomorrow" (the answer changes at midnight)
+        
+        Returns:
+            Response
+        """
+        # The payload is fully determined by the query, the profile and the engine version
+        key = (params, profile.forecast_key, ENGINE_VERSION)
+        etag = '"' + hashlib.sha1(repr(key).encode("utf-8")).hexdigest() + '"'
+        # A subscriber's forecast must not be stored by shared caches
+        scope = "private" if request.query.get("chat_id") else "public"
+        max_age = settings.API_CACHE_MAX_AGE
+        if implicit_date:
+            # Not served from a cache past midnight (Vietnam time), when "tomorrow" moves on
+            max_age = min(max_age, _seconds_to_midnight())
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"{scope}, max-age={max_age}"
+        }
+        
+        if _etag_matches(request.headers.get("If-None-Match"), etag):
+            return web.Response(status=304, headers=headers)
+        
+        cache = self._scheduler().cache
+        cache_key = ("api",) + key
+        body = cache.get(cache_key)
+        if body is None:
+            body = json.dumps(await build(), ensure_ascii=False).encode("utf-8")
+            cache.put(cache_key, body)
+        
+        return web.Response(body=body, content_type="application/json", charset="utf-8", headers=headers)
+
+
+def _forecast_payload(result: dict) -> dict:
+    """JSON payload for one structured pipeline result"""
+    data = result["data"]
+    meta = result["metaphysical"]
+    strategy = result["strategy"]
+    telegram = result["telegram"]
+    return {
+        "date": data["solar_date"].date().isoformat(),
+        "weekday": data["weekday_vn"],
+        "lunar_date": data["lunar_formatted"],
+        "lunar_year": data["lunar_year"],
+        "can_chi": data["can_chi"],
+        "truc": data["truc"],
+        "personal_day_number": data["personal_day_number"],
+        "luck_score": meta["luck_score"],
+        "is_hoang_dao": meta["is_hoang_dao"],
+        "has_xung": meta["has_xung"],
+        "menh_state": meta["menh_state"],
+        "should_do": strategy["should_do"],
+        "should_avoid": strategy["should_avoid"],
+        "cosmic_message": strategy["cosmic_message"],
+        "lucky_color": telegram["lucky_color"],
+        "message": telegram["message"]
+    }
+
+
+def _day_payload(day: dict) -> dict:
+    """JSON payload for one day summary (range and best-days)"""
+    payload = dict(day)
+    payload["date"] = day["date"].date().isoformat()
+    return payload
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 requires for this header)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _seconds_to_midnight() -> int:
+    """Whole seconds left until the next midnight, Vietnam time"""
+    now = get_vietnam_datetime().replace(tzinfo=None)
+    return int((_tomorrow() - now).total_seconds())
+
+
+def _tomorrow() -> datetime:
+    """Tomorrow (Vietnam time) at midnight, naive"""
+    today = get_vietnam_datetime().replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+    return today + timedelta(days=1)
+
+
+def _parse_date(value: Optional[str], name: str = "date") -> Optional[datetime]:
+    """Parse a YYYY-MM-DD query parameter within the lunar table (None when absent)"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise _bad_request(f"Invalid '{name}': {value} (use YYYY-MM-DD)")
+    if not FIRST_ORDINAL <= parsed.toordinal() < END_ORDINAL:
+        raise _bad_request(
+            f"'{name}' must be between {datetime.fromordinal(FIRST_ORDINAL).date()} "
+            f"and {datetime.fromordinal(END_ORDINAL - 1).date()}"
+        )
+    return parsed
+
+
+def _parse_int(query, name: str, default):
+    """Parse an integer query parameter"""
+    value = query.get(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise _bad_request(f"Invalid '{name}': {value}")
+
+
+def _parse_flag(query, name: str) -> bool:
+    """Parse a boolean query parameter (1/true/yes)"""
+    return query.get(name, "").lower() in ("1", "true", "yes")
+
+
+def _bad_request(error: str) -> web.HTTPBadRequest:
+    """400 with a JSON error body"""
+    return web.HTTPBadRequest(text=json.dumps({"error": error}), content_type="application/json")
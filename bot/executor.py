@@ -0,0 +1,91 @@
+"""
+Execution backend for CPU-bound agent work
+Keeps the asyncio event loop (Telegram polling, health server) responsive
+"""
+
+import asyncio
+import contextvars
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("inline", "thread", "process")
+
+
+class AgentExecutor:
+    """Runs agent jobs inline, on a thread pool or on a process pool"""
+    
+    def __init__(self, mode: str = "thread", max_workers: int = 2, timeout: float = 60):
+        """
+        Initialize the executor
+        
+        Args:
+            mode: "inline" (run on the event loop), "thread" or "process"
+            max_workers: Pool size, also the maximum number of concurrent jobs
+            timeout: Per-job timeout in seconds (0 disables it)
+        
+        Raises:
+            ValueError: If mode is unknown
+        """
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode '{mode}', expected one of {EXECUTOR_MODES}")
+        
+        self.mode = mode
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout or None
+        self._pool: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    def _get_pool(self) -> Executor:
+        """Create the worker pool on first use"""
+        if self._pool is None:
+            if self.mode == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="agent-worker"
+                )
+            logger.info(f"Agent executor started: {self.mode} x{self.max_workers}")
+        return self._pool
+    
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        Run a job, waiting for a free slot first
+        
+        For "process" mode func and args must be picklable (module-level function).
+        On timeout the caller gets asyncio.TimeoutError; a job already running in a
+        worker is not interrupted, it just stops holding up the caller.
+        
+        Args:
+            func: Synchronous function to call
+            *args: Arguments for func
+        
+        Returns:
+            Whatever func returns
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        
+        async with self._semaphore:
+            if self.mode == "inline":
+                return func(*args)
+            
+            loop = asyncio.get_running_loop()
+            if self.mode == "thread":
+                # Carry the caller's context (tracing spans) into the worker thread
+                call = partial(contextvars.copy_context().run, func, *args)
+            else:
+                call = partial(func, *args)
+            future = loop.run_in_executor(self._get_pool(), call)
+            return await asyncio.wait_for(future, self.timeout)
+    
+    def shutdown(self):
+        """Stop the worker pool, dropping queued jobs"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            logger.info("Agent executor stopped")
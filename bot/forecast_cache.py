@@ -0,0 +1,88 @@
+"""
+In-memory LRU + TTL cache for rendered forecasts
+Keyed on (date, profile) so repeated commands for the same day are a dict lookup
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class ForecastCache:
+    """Least-recently-used cache whose entries also expire after a TTL"""
+    
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 6 * 3600):
+        """
+        Initialize the cache
+        
+        Args:
+            max_size: Maximum number of entries kept (oldest used are evicted)
+            ttl_seconds: Entry lifetime in seconds
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value
+        
+        Args:
+            key: Cache key
+            
+        Returns:
+            Cached value, or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def put(self, key: Hashable, value: Any):
+        """
+        Store a value, evicting the least recently used entry if full
+        
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Remove all entries (counters are kept)"""
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def stats(self) -> dict:
+        """
+        Get cache statistics
+        
+        Returns:
+            dict with size, max_size, hits, misses and hit_ratio
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,159 @@
+"""
+Event-loop lag monitor and slow-callback detector
+Telegram polling, APScheduler, the aiohttp server and any synchronous agent
+code share one asyncio loop; anything that blocks it delays all of them.
+
+A monitor task sleeps for a fixed interval and measures how late it wakes up
+(scheduling lag). A watchdog thread checks the task's heartbeat; when the
+loop has not come back for longer than the slow-callback threshold it
+captures the loop thread's stack, i.e. the callback that is blocking it.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import List, Optional
+
+from core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LAG_SECONDS = REGISTRY.histogram(
+    "event_loop_lag_seconds", "Event loop scheduling lag",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+).labels()
+SLOW_CALLBACKS = REGISTRY.counter(
+    "event_loop_slow_callbacks_total", "Times the loop was blocked past the slow-callback threshold"
+).labels()
+
+# Frames kept per slow-callback stack
+STACK_LIMIT = 30
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class LoopMonitor:
+    """Measures event-loop lag and records what blocks the loop"""
+    
+    def __init__(self, interval: float = 0.1, slow_threshold: float = 0.25, window: int = 600):
+        """
+        Initialize the monitor
+        
+        Args:
+            interval: Seconds between lag measurements
+            slow_threshold: Blocking time (seconds) reported as a slow callback
+            window: Lag samples kept for the p50/p99 figures
+        """
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.lags = deque(maxlen=window)
+        self.slow_callbacks = deque(maxlen=20)
+        self.max_lag = 0.0
+        
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop_thread = None
+        self._beat = time.monotonic()
+        # Stack captured by the watchdog during the stall that started at _stall_beat
+        self._stall_beat = None
+        self._stall_stack = None
+    
+    def start(self):
+        """Start measuring (call from the running loop)"""
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._measure())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        REGISTRY.register_collector("loop_monitor", self.collect_metrics)
+        logger.info(
+            f"Event loop monitor started (every {self.interval * 1000:.0f}ms, "
+            f"slow callback >= {self.slow_threshold * 1000:.0f}ms)"
+        )
+    
+    async def stop(self):
+        """Stop measuring"""
+        self._stopping.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+    
+    async def _measure(self):
+        """Sleep for interval, record how late the wake-up was"""
+        loop = asyncio.get_running_loop()
+        while True:
+            beat = self._beat
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - expected, 0.0)
+            self._beat = time.monotonic()
+            
+            self.lags.append(lag)
+            LAG_SECONDS.observe(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+            if lag >= self.slow_threshold:
+                self._record_slow(lag, self._stall_stack if self._stall_beat == beat else None)
+    
+    def _watch(self):
+        """Watchdog thread: capture the loop thread's stack while it is blocked"""
+        check = max(self.slow_threshold / 2, 0.01)
+        while not self._stopping.wait(check):
+            beat = self._beat
+            if self._stall_beat == beat or time.monotonic() - beat < self.interval + self.slow_threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                self._stall_stack = traceback.format_stack(frame, limit=STACK_LIMIT)
+                self._stall_beat = beat
+    
+    def _record_slow(self, lag: float, stack: Optional[List[str]]):
+        """Keep and log a slow callback"""
+        SLOW_CALLBACKS.inc()
+        self.slow_callbacks.append({
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "blocked_ms": round(lag * 1000, 1),
+            "stack": [line.rstrip() for line in stack] if stack else None
+        })
+        where = stack[-1].strip().splitlines()[0] if stack else "unknown (no stack captured)"
+        logger.warning(f"Event loop blocked for {lag * 1000:.0f}ms at {where}")
+    
+    def summary(self) -> dict:
+        """
+        Lag figures over the recent window (for /health)
+        
+        Returns:
+            dict with lag_p50_ms, lag_p99_ms, lag_max_ms, samples and slow_callbacks
+        """
+        lags = sorted(self.lags)
+        return {
+            "lag_p50_ms": round(_percentile(lags, 0.5) * 1000, 2),
+            "lag_p99_ms": round(_percentile(lags, 0.99) * 1000, 2),
+            "lag_max_ms": round(self.max_lag * 1000, 2),
+            "samples": len(lags),
+            "slow_callbacks": int(SLOW_CALLBACKS.value)
+        }
+    
+    def collect_metrics(self):
+        """Scrape-time p50/p99 over the recent window"""
+        lags = sorted(self.lags)
+        return [
+            ("event_loop_lag_p50_seconds", "gauge", "Event loop lag p50 over the recent window", (),
+             [((), _percentile(lags, 0.5))]),
+            ("event_loop_lag_p99_seconds", "gauge", "Event loop lag p99 over the recent window", (),
+             [((), _percentile(lags, 0.99))]),
+        ]
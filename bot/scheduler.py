@@ -3,21 +3,43 @@ Scheduler for daily automatic forecast sending
 Uses APScheduler to trigger at 8 PM Vietnam time
 """
 
+import asyncio
+import functools
+import time
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 import pytz
 import logging
 from datetime import datetime, timedelta
+from typing import Iterable, List, Union
 
 from config.settings import settings
 from core.lunar_calendar import get_vietnam_datetime
-from agents.agent_1_data_collector import DataCollectorAgent
-from agents.agent_2_metaphysical import MetaphysicalAnalystAgent
-from agents.agent_3_dev_strategist import DevStrategistAgent
-from agents.agent_4_telegram_notifier import TelegramNotifierAgent
+from config.profiles import Profile, SubscriberRegistry
+from agents.pipeline import (
+    run_calendar_job, run_chain_job, run_evaluate_job, run_fanout_job
+)
+from agents.best_days import find_best_days_job
+from bot.executor import AgentExecutor
+from bot.forecast_cache import ForecastCache
+from bot.store import ForecastStore
+from core.metrics import REGISTRY
+from core.tracing import span
 
 logger = logging.getLogger(__name__)
 
+# run_agent_chain latency, by where the message came from
+CHAIN_SECONDS = REGISTRY.histogram(
+    "forecast_chain_seconds", "run_agent_chain duration by source (window, cache, store, computed)", ["source"]
+)
+_CHAIN_SOURCES = {source: CHAIN_SECONDS.labels(source) for source in ("window", "cache", "store", "computed")}
+
+# Delay between a job's scheduled time and its submission, and job failures
+JOB_LAG_SECONDS = REGISTRY.histogram("scheduler_job_lag_seconds", "Scheduled job start delay", ["job"])
+JOB_EVENTS = REGISTRY.counter("scheduler_job_events_total", "Scheduled job errors and misfires", ["job", "event"])
+
 
 class ForecastScheduler:
     """Scheduler for automatic daily forecasts"""
@@ -33,20 +55,32 @@ class ForecastScheduler:
         self.scheduler = AsyncIOScheduler()
         self.timezone = pytz.timezone(settings.TIMEZONE)
         
-        # Initialize agents
-        self.agent1 = DataCollectorAgent(
-            user_birth_day=settings.USER_BIRTH_DAY,
-            user_birth_month=settings.USER_BIRTH_MONTH
+        # Subscribers; the .env user is the default profile for commands
+        self.registry = SubscriberRegistry.load()
+        self.default_profile = Profile.from_settings()
+        
+        # Agents are built on first use (the window refresh warms them in the background)
+        
+        # Agent work runs off the event loop
+        self.executor = AgentExecutor(
+            mode=settings.AGENT_EXECUTOR,
+            max_workers=settings.AGENT_MAX_WORKERS,
+            timeout=settings.AGENT_JOB_TIMEOUT
         )
         
-        self.agent2 = MetaphysicalAnalystAgent(
-            user_element=settings.USER_ELEMENT,
-            user_branch=settings.USER_BRANCH,
-            user_life_path=settings.get_life_path_number()
+        # Rendered forecasts keyed on (date, profile)
+        self.cache = ForecastCache(
+            max_size=settings.FORECAST_CACHE_SIZE,
+            ttl_seconds=settings.FORECAST_CACHE_TTL
         )
         
-        self.agent3 = DevStrategistAgent()
-        self.agent4 = TelegramNotifierAgent()
+        # Rendered forecasts and the delivery log, kept across restarts
+        self.store = ForecastStore(settings.FORECAST_DB_FILE, batch_size=settings.STORE_BATCH_SIZE)
+        
+        # Precomputed forecasts (default profile) for the next PRECOMPUTE_DAYS days, keyed on "YYYY-MM-DD"
+        self.forecast_window = {}
+        self._precompute_task = None
+        self._catch_up_task = None
     
     def start(self):
         """Start the scheduler"""
@@ -65,65 +99,348 @@ class ForecastScheduler:
             replace_existing=True
         )
         
+        # Roll the precomputed window forward just after midnight
+        self.scheduler.add_job(
+            self.refresh_forecast_window,
+            trigger=CronTrigger(hour=0, minute=1, timezone=self.timezone),
+            id='refresh_forecast_window',
+            name='Refresh Precomputed Forecasts',
+            replace_existing=True
+        )
+        
+        # Commit buffered store writes regularly (on the loop, like every other store access)
+        self.scheduler.add_job(
+            self._flush_store,
+            trigger=IntervalTrigger(seconds=settings.STORE_FLUSH_SECONDS),
+            id='flush_store',
+            name='Flush Forecast Store',
+            replace_existing=True
+        )
+        
+        self.scheduler.add_listener(self._on_job_event, EVENT_JOB_SUBMITTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED)
+        REGISTRY.register_collector("scheduler", self.collect_metrics)
+        
         self.scheduler.start()
+        
+        # Fill the window in the background so startup is not delayed
+        self._precompute_task = asyncio.create_task(self.refresh_forecast_window())
+        
+        # Started (or woken up) after today's bulletin time: deliver to whoever missed it;
+        # chats that already received it are skipped via the delivery log
+        now = get_vietnam_datetime()
+        if now.hour >= settings.SCHEDULE_HOUR:
+            logger.info("Started after the bulletin time, catching up on today's bulletin")
+            self._catch_up_task = asyncio.create_task(self.send_daily_forecast())
+        
         logger.info(f"Scheduler started. Daily forecast will be sent at {settings.SCHEDULE_HOUR}:00 {settings.TIMEZONE}")
     
     def stop(self):
-        """Stop the scheduler"""
+        """
+        Stop the scheduler
+        The store stays open so deliveries still queued are recorded; call
+        close() once the send queue has drained.
+        """
+        for task in (self._precompute_task, self._catch_up_task):
+            if task and not task.done():
+                task.cancel()
         self.scheduler.shutdown()
+        self.executor.shutdown()
         logger.info("Scheduler stopped")
     
-    async def send_daily_forecast(self):
+    def close(self):
+        """Commit pending store writes and close the store (after stop())"""
+        self.store.close()
+    
+    async def _flush_store(self):
+        """Scheduled job: commit buffered store writes"""
+        self.store.flush()
+    
+    def _on_job_event(self, event):
+        """APScheduler listener: job start lag, errors and misfires"""
+        if event.code == EVENT_JOB_SUBMITTED:
+            scheduled = event.scheduled_run_times[0]
+            lag = (datetime.now(scheduled.tzinfo) - scheduled).total_seconds()
+            JOB_LAG_SECONDS.labels(event.job_id).observe(max(lag, 0.0))
+        elif event.code == EVENT_JOB_ERROR:
+            JOB_EVENTS.labels(event.job_id, "error").inc()
+        else:
+            JOB_EVENTS.labels(event.job_id, "missed").inc()
+    
+    def collect_metrics(self):
         """
-        Generate and send daily forecast for TOMORROW
-        Called automatically by the scheduler
+        Scrape-time metrics from state the scheduler already keeps
+        
+        Returns:
+            Metric entries for MetricsRegistry.register_collector
+        """
+        cache = self.cache.stats()
+        send_queue = getattr(self.telegram_bot, "send_queue", None)
+        entries = [
+            ("forecast_cache_hits_total", "counter", "Forecast cache hits", (), [((), cache["hits"])]),
+            ("forecast_cache_misses_total", "counter", "Forecast cache misses", (), [((), cache["misses"])]),
+            ("forecast_cache_hit_ratio", "gauge", "Forecast cache hit ratio", (), [((), cache["hit_ratio"])]),
+            ("forecast_cache_entries", "gauge", "Forecast cache size", (), [((), cache["size"])]),
+            ("forecast_window_days", "gauge", "Precomputed forecast days", (), [((), len(self.forecast_window))]),
+        ]
+        if send_queue is not None:
+            stats = send_queue.stats()
+            entries += [
+                ("telegram_send_queue_depth", "gauge", "Messages waiting to be sent", (), [((), stats["depth"])]),
+                ("telegram_messages_total", "counter", "Messages by final outcome", ("outcome",),
+                 [(("sent",), stats["sent"]), (("failed",), stats["failed"])]),
+                ("telegram_send_retries_total", "counter", "Send retries", (), [((), stats["retries"])]),
+            ]
+        return entries
+    
+    async def refresh_forecast_window(self):
+        """
+        Precompute forecasts for today and the next PRECOMPUTE_DAYS - 1 days
+        Drops days that have passed and computes the missing ones as one batch
+        on the agent executor, so commands stay responsive meanwhile.
         """
         try:
-            # Get tomorrow's date
-            now = get_vietnam_datetime()
-            tomorrow = now + timedelta(days=1)
+            today = get_vietnam_datetime()
+            days = [today + timedelta(days=offset) for offset in range(settings.PRECOMPUTE_DAYS)]
+            wanted = {day.strftime("%Y-%m-%d"): day for day in days}
             
-            logger.info(f"Generating forecast for {tomorrow.strftime('%d/%m/%Y')}")
+            for key in list(self.forecast_window):
+                if key not in wanted:
+                    del self.forecast_window[key]
             
-            # Run the 4-agent chain
-            message = await self.run_agent_chain(tomorrow)
+            missing = [key for key in wanted if key not in self.forecast_window]
             
-            # Send to Telegram
-            await self.telegram_bot.send_message_to_user(message)
+            # Rendered before a restart: no need to compute again
+            stored = self.store.get_forecasts(self.default_profile.forecast_key, missing)
+            self.forecast_window.update(stored)
+            missing = [key for key in missing if key not in stored]
             
-            logger.info("Daily forecast sent successfully")
+            if missing:
+                results = await self.executor.run(
+                    run_chain_job,
+                    self.default_profile,
+                    [wanted[key] for key in missing]
+                )
+                for key, result in zip(missing, results):
+                    message = result["telegram"]["message"]
+                    self.forecast_window[key] = message
+                    self.store.put_forecast(self.default_profile.forecast_key, key, message)
+                self.store.flush()
             
+            logger.info(
+                f"Forecast window ready: {len(self.forecast_window)} days "
+                f"({len(stored)} from store, {len(missing)} computed)"
+            )
+        
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logger.error(f"Error sending daily forecast: {e}", exc_info=True)
-            # Optionally send error notification to user
-            await self.telegram_bot.send_message_to_user(
-                f"❌ Lỗi khi tạo bản tin: {str(e)}"
+            logger.error(f"Error precomputing forecasts: {e}", exc_info=True)
+    
+    async def send_daily_forecast(self):
+        """
+        Generate and send daily forecast for TOMORROW to every subscriber
+        Called automatically by the scheduler
+        """
+        # Get tomorrow's date
+        now = get_vietnam_datetime()
+        tomorrow = now + timedelta(days=1)
+        date_key = tomorrow.strftime("%Y-%m-%d")
+        
+        # Skip chats that already got this bulletin (e.g. before a restart)
+        delivered = self.store.delivered_chats(date_key)
+        profiles = [profile for profile in self.registry if profile.chat_id not in delivered]
+        if not profiles:
+            logger.info(f"Forecast for {tomorrow.strftime('%d/%m/%Y')} already delivered to every subscriber")
+            return
+        
+        logger.info(
+            f"Generating forecast for {tomorrow.strftime('%d/%m/%Y')} ({len(profiles)} subscribers, "
+            f"{len(delivered)} already delivered)"
+        )
+        
+        try:
+            # Each distinct profile is rendered once, in a single executor job
+            messages = await self.executor.run(run_fanout_job, profiles, tomorrow)
+        except Exception as e:
+            logger.error(f"Error generating daily forecast: {e}", exc_info=True)
+            return
+        
+        # Queue everything; the send queue applies rate limits and retries.
+        # Each outcome is committed as soon as it is known, so a restart or a
+        # crash mid-run does not resend to chats that already got it.
+        deliveries = []
+        for profile in profiles:
+            delivery = await self.telegram_bot.send_message_to_user(
+                messages[profile.forecast_key],
+                chat_id=profile.chat_id
             )
+            delivery.add_done_callback(functools.partial(self._record_delivery, profile.chat_id, date_key))
+            deliveries.append(delivery)
+        
+        # asyncio.wait (unlike gather) leaves the deliveries alone if this task is cancelled
+        await asyncio.wait(deliveries)
+        self.store.flush()
+        
+        sent = sum(1 for delivery in deliveries if not delivery.cancelled() and delivery.result())
+        logger.info(f"Daily forecast sent to {sent}/{len(profiles)} subscribers")
+    
+    def _record_delivery(self, chat_id: str, date_key: str, delivery: asyncio.Future):
+        """Done callback of a bulletin delivery: log its outcome"""
+        if delivery.cancelled():
+            return
+        try:
+            self.store.record_delivery(chat_id, date_key, bool(delivery.result()))
+        except Exception as e:
+            # The outcome stays buffered; the next delivery or the flush job commits it
+            logger.error(f"Error logging delivery to {chat_id}: {e}", exc_info=True)
+    
+    def get_profile(self, chat_id) -> Profile:
+        """
+        Get the profile for a chat, falling back to the default profile
+        
+        Args:
+            chat_id: Telegram chat id
+        
+        Returns:
+            Profile
+        """
+        return self.registry.get(chat_id) or self.default_profile
     
-    async def run_agent_chain(self, target_date: datetime) -> str:
+    async def run_agent_chain(self, target_date: datetime, profile: Profile = None) -> str:
         """
         Run the 4-agent chain sequentially
         
         Args:
             target_date: Date to generate forecast for
-            
+            profile: Subscriber profile (defaults to the .env user)
+        
         Returns:
             Formatted Telegram message
         """
-        # Agent 1: Data Collection
-        logger.info("Running Agent 1: Data Collector")
-        data_result = self.agent1.analyze(target_date)
+        started = time.perf_counter()
+        with span("run_agent_chain", date=target_date.strftime("%Y-%m-%d")) as chain_span:
+            message, source = await self._get_forecast(target_date, profile or self.default_profile)
+            chain_span.set_attribute("source", source)
+        _CHAIN_SOURCES[source].observe(time.perf_counter() - started)
+        return message
+    
+    async def _get_forecast(self, target_date: datetime, profile: Profile) -> tuple:
+        """
+        Look the forecast up (window, cache, store) or compute it
         
-        # Agent 2: Metaphysical Analysis
-        logger.info("Running Agent 2: Metaphysical Analyst")
-        meta_result = self.agent2.analyze(data_result)
+        Returns:
+            (message, source)
+        """
+        date_key = target_date.strftime("%Y-%m-%d")
+        
+        # Served from the precomputed window without any computation
+        if profile.forecast_key == self.default_profile.forecast_key:
+            message = self.forecast_window.get(date_key)
+            if message is not None:
+                return message, "window"
+        
+        cache_key = (date_key, profile.forecast_key)
+        message = self.cache.get(cache_key)
+        if message is not None:
+            return message, "cache"
+        
+        source = "store"
+        message = self.store.get_forecast(profile.forecast_key, date_key)
+        if message is None:
+            logger.info(f"Running agent chain for {target_date.strftime('%d/%m/%Y')}")
+            results = await self.executor.run(run_chain_job, profile, [target_date])
+            message = results[0]["telegram"]["message"]
+            self.store.put_forecast(profile.forecast_key, date_key, message)
+            source = "computed"
+        self.cache.put(cache_key, message)
+        return message, source
+    
+    async def run_agent_chain_many(
+        self,
+        dates: Iterable[datetime],
+        profile: Profile = None,
+        structured: bool = False
+    ) -> Union[List[str], List[dict]]:
+        """
+        Run the 4-agent chain for a batch of dates, one stage at a time
         
-        # Agent 3: Dev Strategy
-        logger.info("Running Agent 3: Dev Strategist")
-        dev_result = self.agent3.analyze(data_result, meta_result)
+        Args:
+            dates: Dates to generate forecasts for
+            profile: Subscriber profile (defaults to the .env user)
+            structured: Return every agent's result instead of only the message
         
-        # Agent 4: Telegram Formatting
-        logger.info("Running Agent 4: Telegram Notifier")
-        telegram_result = self.agent4.analyze(data_result, meta_result, dev_result)
+        Returns:
+            List of formatted Telegram messages (or structured results), in date order
+        """
+        results = await self.executor.run(
+            run_chain_job, profile or self.default_profile, list(dates)
+        )
         
-        return telegram_result["message"]
+        if structured:
+            return results
+        return [result["telegram"]["message"] for result in results]
+    
+    async def evaluate_range(self, start: datetime, end: datetime, profile: Profile = None) -> List[dict]:
+        """
+        Score every day in a range in one batched evaluation
+        
+        Args:
+            start: First date (inclusive)
+            end: Last date (inclusive)
+            profile: Subscriber profile (defaults to the .env user)
+        
+        Returns:
+            Day summaries (date, luck_score, is_hoang_dao, has_xung, can_chi, truc), in date order
+        """
+        dates = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        return await self.executor.run(
+            run_evaluate_job, profile or self.default_profile, dates
+        )
+    
+    async def run_calendar(
+        self,
+        start: datetime,
+        days: int,
+        title: str,
+        profile: Profile = None
+    ) -> List[str]:
+        """
+        Render a calendar grid for consecutive days in one batched evaluation
+        
+        Args:
+            start: First date
+            days: Number of days
+            title: Calendar title
+            profile: Subscriber profile (defaults to the .env user)
+        
+        Returns:
+            Message chunks, each within Telegram's length limit
+        """
+        dates = [start + timedelta(days=i) for i in range(days)]
+        return await self.executor.run(
+            run_calendar_job, profile or self.default_profile, dates, title
+        )
+    
+    async def find_best_days(
+        self,
+        start: datetime,
+        end: datetime,
+        profile: Profile = None,
+        **options
+    ) -> List[dict]:
+        """
+        Find the top-K days in a date range
+        
+        Args:
+            start: First date (inclusive)
+            end: Last date (inclusive)
+            profile: Subscriber profile (defaults to the .env user)
+            **options: Filters for BestDayIndex.query (top_k, min_score,
+                hoang_dao_only, no_xung, truc, weekday)
+        
+        Returns:
+            List of day dicts, best first
+        """
+        return await self.executor.run(
+            find_best_days_job, profile or self.default_profile, start, end, options
+        )
@@ -0,0 +1,308 @@
+"""
+Rate-limited outbound message queue for the Telegram Bot API
+Keeps the bot under Telegram's global and per-chat flood limits
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from telegram.constants import ParseMode
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TelegramError
+
+from core.metrics import REGISTRY
+from core.tracing import span
+
+logger = logging.getLogger(__name__)
+
+SEND_SECONDS = REGISTRY.histogram("telegram_send_seconds", "Bot API send_message call duration", ["outcome"])
+SEND_ERRORS = REGISTRY.counter("telegram_send_errors_total", "Bot API send_message errors", ["error"])
+SEND_DELIVERY_SECONDS = REGISTRY.histogram(
+    "telegram_delivery_seconds", "Time from queueing to delivery (rate limits and retries included)"
+).labels()
+_SEND_OK = SEND_SECONDS.labels("ok")
+_SEND_FAILED = SEND_SECONDS.labels("error")
+_ERROR_RETRY_AFTER = SEND_ERRORS.labels("retry_after")
+_ERROR_REJECTED = SEND_ERRORS.labels("rejected")
+_ERROR_NETWORK = SEND_ERRORS.labels("network")
+
+# Per-chat buckets kept before the refilled (idle) ones are dropped
+CHAT_BUCKET_SWEEP = 1024
+
+
+class TokenBucket:
+    """Token bucket: `rate` tokens per second, bursts up to `capacity`"""
+    
+    def __init__(self, rate: float, capacity: float = 1):
+        """
+        Initialize the bucket (starts full)
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+    
+    def is_full(self) -> bool:
+        """Whether the bucket has refilled to capacity (it then holds no rate-limit state)"""
+        return self.tokens + (time.monotonic() - self.updated_at) * self.rate >= self.capacity
+    
+    def pause(self, seconds: float):
+        """Empty the bucket and block it for `seconds` (e.g. after a 429)"""
+        self.tokens = -seconds * self.rate
+        self.updated_at = time.monotonic()
+    
+    async def acquire(self):
+        """Wait until a token is available, then take it"""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class SendQueue:
+    """asyncio queue of outbound messages served by N rate-limited workers"""
+    
+    def __init__(
+        self,
+        bot,
+        workers: int = 4,
+        global_rate: float = 25,
+        per_chat_rate: float = 1,
+        max_retries: int = 5,
+        backoff_base: float = 1.0
+    ):
+        """
+        Initialize the send queue
+        
+        Args:
+            bot: telegram.Bot used for send_message
+            workers: Number of concurrent sender tasks
+            global_rate: Messages per second across all chats
+            per_chat_rate: Messages per second to a single chat
+            max_retries: Attempts after the first one before giving up
+            backoff_base: First retry delay in seconds (doubles each retry)
+        """
+        self.bot = bot
+        self.worker_count = max(1, workers)
+        self.per_chat_rate = per_chat_rate
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        
+        self.global_bucket = TokenBucket(global_rate, capacity=global_rate)
+        self.chat_buckets: Dict[str, TokenBucket] = {}
+        self._sweep_at = CHAT_BUCKET_SWEEP
+        # Chats a worker is serving -> their messages queued behind the current one.
+        # Keeps per-chat order without parking a second worker on the same chat.
+        self.chat_backlogs: Dict[str, Deque[tuple]] = {}
+        
+        self.queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        
+        # Delivery statistics
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.latency_total = 0.0  # enqueue -> delivered, seconds
+        self.latency_max = 0.0
+        self.api_time_total = 0.0  # time inside send_message, seconds
+    
+    def start(self):
+        """Start the worker tasks (requires a running event loop)"""
+        self.queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"send-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        logger.info(f"Send queue started with {self.worker_count} workers")
+    
+    async def stop(self, timeout: float = 30):
+        """
+        Drain pending messages, then stop the workers
+        
+        Args:
+            timeout: Seconds to wait for the queue to drain before dropping the rest
+        """
+        if self.queue is None:
+            return
+        
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Send queue not drained, dropping {self.queue.qsize()} messages")
+        
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info("Send queue stopped")
+    
+    def submit(self, chat_id, text: str, parse_mode: str = ParseMode.MARKDOWN) -> asyncio.Future:
+        """
+        Queue a message for delivery
+        
+        Args:
+            chat_id: Target chat
+            text: Message text
+            parse_mode: Telegram parse mode
+        
+        Returns:
+            Future resolving to True once delivered, False if it finally failed
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((str(chat_id), text, parse_mode, time.monotonic(), future))
+        return future
+    
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        """Get (or create) the token bucket for a chat"""
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self.chat_buckets) >= self._sweep_at:
+                self._drop_idle_buckets()
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.per_chat_rate)
+        return bucket
+    
+    def _drop_idle_buckets(self):
+        """Forget the buckets that have refilled (a new bucket starts full, so no state is lost)"""
+        self.chat_buckets = {
+            chat_id: bucket for chat_id, bucket in self.chat_buckets.items()
+            if chat_id in self.chat_backlogs or not bucket.is_full()
+        }
+        # What is left was used within the last second or so; sweep again once that doubles
+        self._sweep_at = max(CHAT_BUCKET_SWEEP, 2 * len(self.chat_buckets))
+    
+    async def _worker(self):
+        """Take messages off the queue and deliver them"""
+        while True:
+            item = await self.queue.get()
+            chat_id = item[0]
+            backlog = self.chat_backlogs.get(chat_id)
+            if backlog is not None:
+                # Another worker is sending to this chat; it picks this message up next
+                backlog.append(item)
+                continue
+            
+            backlog = self.chat_backlogs[chat_id] = deque([item])
+            try:
+                while backlog:
+                    await self._process(*backlog.popleft())
+            finally:
+                del self.chat_backlogs[chat_id]
+                # Cancelled mid-chat: resolve whatever was still waiting behind
+                while backlog:
+                    future = backlog.popleft()[4]
+                    if not future.done():
+                        future.set_result(False)
+                    self.queue.task_done()
+    
+    async def _process(self, chat_id: str, text: str, parse_mode: str, queued_at: float, future: asyncio.Future):
+        """Deliver one queued message and resolve its future"""
+        try:
+            try:
+                delivered = await self._deliver(chat_id, text, parse_mode)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.set_result(False)
+                raise
+            except Exception:
+                # Never let one message kill the worker or leave its future pending
+                logger.exception(f"Unexpected error sending to {chat_id}")
+                delivered = False
+            
+            if delivered:
+                latency = time.monotonic() - queued_at
+                self.sent += 1
+                self.latency_total += latency
+                self.latency_max = max(self.latency_max, latency)
+                SEND_DELIVERY_SECONDS.observe(latency)
+            else:
+                self.failed += 1
+            if not future.done():
+                future.set_result(delivered)
+        finally:
+            self.queue.task_done()
+    
+    async def _deliver(self, chat_id: str, text: str, parse_mode: str) -> bool:
+        """
+        Send one message, honouring rate limits and retrying transient errors
+        
+        Returns:
+            True if delivered, False if given up
+        """
+        chat_bucket = self._chat_bucket(chat_id)
+        
+        for attempt in range(self.max_retries + 1):
+            await chat_bucket.acquire()
+            await self.global_bucket.acquire()
+            
+            started = time.monotonic()
+            try:
+                with span("telegram.send_message", chat_id=chat_id, attempt=attempt + 1, length=len(text)):
+                    await self.bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+                elapsed = time.monotonic() - started
+                self.api_time_total += elapsed
+                _SEND_OK.observe(elapsed)
+                return True
+            
+            except RetryAfter as e:
+                # 429: Telegram tells us exactly how long to wait
+                _SEND_FAILED.observe(time.monotonic() - started)
+                _ERROR_RETRY_AFTER.inc()
+                logger.warning(f"Flood limit for chat {chat_id}, retry after {e.retry_after}s")
+                chat_bucket.pause(e.retry_after)
+                self.global_bucket.pause(e.retry_after)
+            
+            except (BadRequest, Forbidden) as e:
+                # Bad message or bot blocked: retrying will not help
+                _SEND_FAILED.observe(time.monotonic() - started)
+                _ERROR_REJECTED.inc()
+                logger.error(f"Message to {chat_id} rejected: {e}")
+                return False
+            
+            except NetworkError as e:
+                _SEND_FAILED.observe(time.monotonic() - started)
+                _ERROR_NETWORK.inc()
+                logger.warning(f"Error sending to {chat_id} (attempt {attempt + 1}): {e}")
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self.backoff_base * (2 ** attempt))
+            
+            except TelegramError as e:
+                # Anything else from the Bot API (chat migrated, conflict, bad token): not retried
+                _SEND_FAILED.observe(time.monotonic() - started)
+                _ERROR_REJECTED.inc()
+                logger.error(f"Message to {chat_id} failed: {e}")
+                return False
+            
+            if attempt < self.max_retries:
+                self.retries += 1
+        
+        logger.error(f"Giving up on message to {chat_id} after {self.max_retries + 1} attempts")
+        return False
+    
+    def stats(self) -> dict:
+        """
+        Get queue statistics
+        
+        Returns:
+            dict with depth, sent, failed, retries and latency figures (seconds)
+        """
+        return {
+            "depth": self.queue.qsize() if self.queue else 0,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retries": self.retries,
+            "latency_avg": self.latency_total / self.sent if self.sent else 0.0,
+            "latency_max": self.latency_max,
+            "api_time_avg": self.api_time_total / self.sent if self.sent else 0.0
+        }
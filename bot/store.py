@@ -0,0 +1,352 @@
+"""
+Persistent store: rendered forecasts and the delivery log in SQLite (WAL mode)
+Survives restarts, so warm forecasts are not recomputed and the daily bulletin
+is not sent twice to the same chat for the same date.
+
+Forecast writes are buffered and committed in batches; reads see pending writes.
+Delivery outcomes are committed as they are recorded: a lost row would mean
+the bulletin is sent to that chat again after a crash. All access goes through one lock, so the store can be shared with worker threads.
+
+Admin:
+    python -m bot.store summary [YYYY-MM-DD]
+    python -m bot.store deliveries YYYY-MM-DD
+    python -m bot.store forecasts YYYY-MM-DD YYYY-MM-DD
+"""
+
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from agents.forecast_engine import ENGINE_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Delivery kinds and statuses
+DAILY_BULLETIN = "daily"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS forecasts (
+    date TEXT NOT NULL,
+    profile_key TEXT NOT NULL,
+    engine_version INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (profile_key, engine_version, date)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS deliveries (
+    chat_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (chat_id, date, kind)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS deliveries_by_date ON deliveries (date, kind, status);
+"""
+
+
+def profile_key(forecast_key: tuple) -> str:
+    """Text key for a Profile.forecast_key"""
+    return "|".join(str(value) for value in forecast_key)
+
+
+class ForecastStore:
+    """SQLite-backed forecasts and delivery log"""
+    
+    def __init__(self, path: str, batch_size: int = 100):
+        """
+        Open (and create) the database
+        
+        Args:
+            path: Database file (":memory:" for a throwaway store)
+            batch_size: Buffered writes that trigger a commit
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        
+        # Buffered writes: (date, profile_key) -> message and (chat_id, date, kind) -> status
+        self._pending_forecasts: Dict[tuple, str] = {}
+        self._pending_deliveries: Dict[tuple, str] = {}
+        
+        # Guards the pending writes and the connection (reentrant: writes may flush)
+        self._lock = threading.RLock()
+    
+    def get_forecasts(self, forecast_key: tuple, dates: Iterable[str]) -> Dict[str, str]:
+        """
+        Stored messages for a profile
+        
+        Args:
+            forecast_key: Profile.forecast_key
+            dates: "YYYY-MM-DD" keys
+        
+        Returns:
+            dict of date -> message, for the dates that are stored
+        """
+        key = profile_key(forecast_key)
+        found = {}
+        missing = []
+        with self._lock:
+            for date in dates:
+                message = self._pending_forecasts.get((date, key))
+                if message is not None:
+                    found[date] = message
+                else:
+                    missing.append(date)
+            
+            # SQLite limits bound parameters per statement
+            for i in range(0, len(missing), 500):
+                batch = missing[i:i + 500]
+                cursor = self.connection.execute(
+                    "SELECT date, message FROM forecasts "
+                    f"WHERE profile_key = ? AND engine_version = ? AND date IN ({','.join('?' * len(batch))})",
+                    [key, ENGINE_VERSION, *batch]
+                )
+                found.update(cursor.fetchall())
+        return found
+    
+    def get_forecast(self, forecast_key: tuple, date: str) -> Optional[str]:
+        """
+        Stored message for one date
+        
+        Args:
+            forecast_key: Profile.forecast_key
+            date: "YYYY-MM-DD"
+        
+        Returns:
+            Message, or None if not stored
+        """
+        return self.get_forecasts(forecast_key, [date]).get(date)
+    
+    def put_forecast(self, forecast_key: tuple, date: str, message: str):
+        """
+        Record a rendered forecast (buffered)
+        
+        Args:
+            forecast_key: Profile.forecast_key
+            date: "YYYY-MM-DD"
+            message: Rendered message
+        """
+        with self._lock:
+            self._pending_forecasts[(date, profile_key(forecast_key))] = message
+            self._maybe_flush()
+    
+    def forecasts_between(self, forecast_key: tuple, start: str, end: str) -> List[tuple]:
+        """
+        Stored forecasts for a profile in a date range (uses the primary key)
+        
+        Args:
+            forecast_key: Profile.forecast_key
+            start: First "YYYY-MM-DD" (inclusive)
+            end: Last "YYYY-MM-DD" (inclusive)
+        
+        Returns:
+            List of (date, message), in date order
+        """
+        with self._lock:
+            self.flush()
+            return self.connection.execute(
+                "SELECT date, message FROM forecasts "
+                "WHERE profile_key = ? AND engine_version = ? AND date BETWEEN ? AND ? ORDER BY date",
+                (profile_key(forecast_key), ENGINE_VERSION, start, end)
+            ).fetchall()
+    
+    def delivered_chats(self, date: str, kind: str = DAILY_BULLETIN) -> Set[str]:
+        """
+        Chats that already received a message
+        
+        Args:
+            date: Forecast date "YYYY-MM-DD"
+            kind: Delivery kind
+        
+        Returns:
+            Set of chat ids
+        """
+        with self._lock:
+            chats = {
+                chat_id for (chat_id, pending_date, pending_kind), status in self._pending_deliveries.items()
+                if pending_date == date and pending_kind == kind and status == STATUS_SENT
+            }
+            cursor = self.connection.execute(
+                "SELECT chat_id FROM deliveries WHERE date = ? AND kind = ? AND status = ?",
+                (date, kind, STATUS_SENT)
+            )
+            chats.update(chat_id for (chat_id,) in cursor)
+        return chats
+    
+    def record_delivery(self, chat_id, date: str, delivered: bool, kind: str = DAILY_BULLETIN):
+        """
+        Record a delivery outcome and commit it (kept buffered if the commit fails)
+        
+        Args:
+            chat_id: Telegram chat id
+            date: Forecast date "YYYY-MM-DD"
+            delivered: Whether the message was delivered
+            kind: Delivery kind
+        """
+        key = (str(chat_id), date, kind)
+        with self._lock:
+            # Once sent, a later failure (e.g. a retry of the same bulletin) does not undo it
+            if self._pending_deliveries.get(key) != STATUS_SENT:
+                self._pending_deliveries[key] = STATUS_SENT if delivered else STATUS_FAILED
+            self.flush_deliveries()
+    
+    def deliveries(self, date: str, kind: str = DAILY_BULLETIN) -> List[tuple]:
+        """
+        Delivery log for a date (uses deliveries_by_date)
+        
+        Args:
+            date: Forecast date "YYYY-MM-DD"
+            kind: Delivery kind
+        
+        Returns:
+            List of (chat_id, status, attempts, updated_at)
+        """
+        with self._lock:
+            self.flush()
+            return self.connection.execute(
+                "SELECT chat_id, status, attempts, updated_at FROM deliveries "
+                "WHERE date = ? AND kind = ? ORDER BY chat_id",
+                (date, kind)
+            ).fetchall()
+    
+    def delivery_summary(self, date: str, kind: str = DAILY_BULLETIN) -> Dict[str, int]:
+        """
+        Delivery counts per status for a date
+        
+        Args:
+            date: Forecast date "YYYY-MM-DD"
+            kind: Delivery kind
+        
+        Returns:
+            dict of status -> count
+        """
+        with self._lock:
+            self.flush()
+            return dict(self.connection.execute(
+                "SELECT status, COUNT(*) FROM deliveries WHERE date = ? AND kind = ? GROUP BY status",
+                (date, kind)
+            ).fetchall())
+    
+    def stats(self) -> dict:
+        """Row counts: forecasts and deliveries"""
+        with self._lock:
+            self.flush()
+            forecasts, = self.connection.execute("SELECT COUNT(*) FROM forecasts").fetchone()
+            deliveries, = self.connection.execute("SELECT COUNT(*) FROM deliveries").fetchone()
+        return {"forecasts": forecasts, "deliveries": deliveries}
+    
+    def flush(self):
+        """Commit buffered writes in one transaction"""
+        self._commit(forecasts=True)
+    
+    def flush_deliveries(self):
+        """Commit buffered delivery outcomes only (forecasts stay batched)"""
+        self._commit(forecasts=False)
+    
+    def _commit(self, forecasts: bool):
+        """
+        Commit the buffered deliveries, and the buffered forecasts if asked
+        
+        Args:
+            forecasts: Whether to commit the buffered forecasts too
+        """
+        with self._lock:
+            if not self._pending_deliveries and not (forecasts and self._pending_forecasts):
+                return
+            
+            # Take the buffers as a whole; they are put back if the commit fails
+            pending_forecasts = {}
+            if forecasts:
+                pending_forecasts, self._pending_forecasts = self._pending_forecasts, {}
+            pending_deliveries, self._pending_deliveries = self._pending_deliveries, {}
+            
+            now = time.time()
+            forecasts = [
+                (date, key, ENGINE_VERSION, message, now)
+                for (date, key), message in pending_forecasts.items()
+            ]
+            deliveries = [
+                (chat_id, date, kind, status, now)
+                for (chat_id, date, kind), status in pending_deliveries.items()
+            ]
+            try:
+                with self.connection:
+                    self.connection.executemany(
+                        "INSERT OR REPLACE INTO forecasts (date, profile_key, engine_version, message, created_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        forecasts
+                    )
+                    # A chat that was sent once stays sent; attempts counts every outcome
+                    self.connection.executemany(
+                        "INSERT INTO deliveries (chat_id, date, kind, status, attempts, updated_at) "
+                        "VALUES (?, ?, ?, ?, 1, ?) "
+                        "ON CONFLICT (chat_id, date, kind) DO UPDATE SET "
+                        "status = CASE WHEN deliveries.status = 'sent' THEN 'sent' ELSE excluded.status END, "
+                        "attempts = deliveries.attempts + 1, updated_at = excluded.updated_at",
+                        deliveries
+                    )
+            except Exception:
+                self._pending_forecasts.update(pending_forecasts)
+                self._pending_deliveries = pending_deliveries
+                raise
+    
+    def _maybe_flush(self):
+        """Commit once enough writes are buffered"""
+        if len(self._pending_forecasts) + len(self._pending_deliveries) >= self.batch_size:
+            self.flush()
+    
+    def close(self):
+        """Commit pending writes and close the database"""
+        with self._lock:
+            self.flush()
+            self.connection.close()
+
+
+def main():
+    """CLI: python -m bot.store summary [date] | deliveries DATE | forecasts FROM TO"""
+    from config.profiles import Profile
+    from config.settings import settings
+    
+    args = sys.argv[1:]
+    if not args or args[0] not in ("summary", "deliveries", "forecasts"):
+        print(
+            "Usage: python -m bot.store summary [YYYY-MM-DD] | deliveries YYYY-MM-DD "
+            "| forecasts YYYY-MM-DD YYYY-MM-DD"
+        )
+        sys.exit(1)
+    
+    store = ForecastStore(settings.FORECAST_DB_FILE)
+    try:
+        if args[0] == "summary":
+            print(f"{settings.FORECAST_DB_FILE}: {store.stats()}")
+            if len(args) > 1:
+                print(f"Daily bulletin {args[1]}: {store.delivery_summary(args[1])}")
+        elif args[0] == "deliveries":
+            for chat_id, status, attempts, updated_at in store.deliveries(args[1]):
+                print(f"{chat_id}\t{status}\t{attempts}\t{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(updated_at))}")
+        else:
+            for date, message in store.forecasts_between(Profile.from_settings().forecast_key, args[1], args[2]):
+                print(f"=== {date}\n{message}\n")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
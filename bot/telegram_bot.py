@@ -3,8 +3,13 @@ Telegram Bot for Thiên Cơ Đại Tướng Quân
 Handles commands and message sending
 """
 
+import asyncio
+import calendar
+import hmac
 import logging
+import time
 from datetime import datetime, timedelta
+from aiohttp import web
 from telegram import Update
 from telegram.ext import Application, CommandHandler, ContextTypes
 from telegram.constants import ParseMode
@@ -12,9 +17,49 @@ from telegram.constants import ParseMode
 from config.settings import settings
 from core.lunar_calendar import parse_date_string, get_vietnam_datetime
 from bot.scheduler import ForecastScheduler
+from bot.send_queue import SendQueue
+from core.metrics import REGISTRY
+from core.tracing import span
 
 logger = logging.getLogger(__name__)
 
+COMMAND_SECONDS = REGISTRY.histogram("bot_command_seconds", "Command handler duration", ["command"])
+COMMAND_ERRORS = REGISTRY.counter("bot_command_errors_total", "Command handlers that raised", ["command"])
+
+# /chonngay: default range (days) and maximum number of days listed
+BEST_DAYS_RANGE = 90
+MAX_BEST_DAYS = 20
+
+
+def _timed_command(command: str, handler):
+    """
+    Wrap a command handler with latency and error metrics and a tracing span
+    (the count of a command is its bot_command_seconds _count)
+    
+    Args:
+        command: Command name (metric label)
+        handler: Async handler (update, context)
+    
+    Returns:
+        Wrapped async handler
+    """
+    seconds = COMMAND_SECONDS.labels(command)
+    errors = COMMAND_ERRORS.labels(command)
+    span_name = f"command.{command}"
+    
+    async def timed(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        started = time.perf_counter()
+        try:
+            with span(span_name):
+                return await handler(update, context)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            seconds.observe(time.perf_counter() - started)
+    
+    return timed
+
 
 class TelegramBot:
     """Telegram Bot for Feng Shui forecasts"""
@@ -31,12 +76,27 @@ class TelegramBot:
             .build()
         )
         self.scheduler = None
+        self.send_queue = SendQueue(
+            self.application.bot,
+            workers=settings.SEND_WORKERS,
+            global_rate=settings.SEND_GLOBAL_RATE,
+            per_chat_rate=settings.SEND_PER_CHAT_RATE,
+            max_retries=settings.SEND_MAX_RETRIES
+        )
+        self.use_webhook = bool(settings.TELEGRAM_WEBHOOK_URL)
         
         # Register command handlers
-        self.application.add_handler(CommandHandler("start", self.cmd_start))
-        self.application.add_handler(CommandHandler("help", self.cmd_help))
-        self.application.add_handler(CommandHandler("dubao", self.cmd_dubao))
-        self.application.add_handler(CommandHandler("ngaymai", self.cmd_ngaymai))
+        commands = {
+            "start": self.cmd_start,
+            "help": self.cmd_help,
+            "dubao": self.cmd_dubao,
+            "ngaymai": self.cmd_ngaymai,
+            "chonngay": self.cmd_chonngay,
+            "thang": self.cmd_thang,
+            "tuan": self.cmd_tuan
+        }
+        for command, handler in commands.items():
+            self.application.add_handler(CommandHandler(command, _timed_command(command, handler)))
     
     async def cmd_start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
@@ -51,6 +111,14 @@ Hệ thống AI chuyên về Phong Thủy Bát Tự và Thần Số Học, phụ
 
 • `/ngaymai` - Xem dự báo cho ngày mai
 
+• `/thang MM/YYYY` - Lịch may mắn cả tháng
+  Ví dụ: `/thang 02/2026`
+
+• `/tuan` - Lịch may mắn tuần này
+
+• `/chonngay` - Chọn ngày tốt nhất trong 90 ngày tới
+  Ví dụ: `/chonngay 01/02/2026 30/06/2026 k=3 hoangdao`
+
 • `/help` - Xem hướng dẫn
 
 📅 *Tự động:*
@@ -76,7 +144,16 @@ Ví dụ: `/dubao 15/01/2026`
 *2️⃣ Xem dự báo cho ngày mai:*
 `/ngaymai`
 
-*3️⃣ Hiểu bản tin:*
+*3️⃣ Xem lịch tháng / tuần:*
+`/thang MM/YYYY` (mặc định tháng này)
+`/tuan [DD/MM/YYYY]` (tuần chứa ngày đó, mặc định tuần này)
+
+*4️⃣ Chọn ngày tốt:*
+`/chonngay [từ DD/MM/YYYY] [đến DD/MM/YYYY] [tùy chọn]`
+Tùy chọn: `k=5` (số ngày), `min=7` (điểm tối thiểu), `hoangdao`, `khongxung`, `truc=Thành`, `thu=2..7` hoặc `thu=cn`
+Ví dụ: `/chonngay 01/02/2026 30/06/2026 k=3 hoangdao khongxung`
+
+*5️⃣ Hiểu bản tin:*
 • *Độ may mắn (1-10):* Chỉ số tổng hợp từ Bát Tự và Thần số học
 • *Trạng thái mệnh:* Vượng/Tướng/Hưu/Tù/Tử dựa trên mùa
 • *NÊN LÀM:* Những việc có lợi theo phong thủy
@@ -119,12 +196,13 @@ Ví dụ: `/dubao 15/01/2026`
             processing_msg = await update.message.reply_text("🔮 Đang tính toán năng lượng vũ trụ...")
             
             # Generate forecast
-            message = await self.scheduler.run_agent_chain(target_date)
+            profile = self.scheduler.get_profile(update.effective_chat.id)
+            message = await self.scheduler.run_agent_chain(target_date, profile)
             
             # Delete processing message and send result
             await processing_msg.delete()
             await update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN)
-            
+        
         except ValueError as e:
             await update.message.reply_text(
                 f"❌ Lỗi: {str(e)}\n"
@@ -148,53 +226,278 @@ Ví dụ: `/dubao 15/01/2026`
             processing_msg = await update.message.reply_text("🔮 Đang dự báo cho ngày mai...")
             
             # Generate forecast
-            message = await self.scheduler.run_agent_chain(tomorrow)
+            profile = self.scheduler.get_profile(update.effective_chat.id)
+            message = await self.scheduler.run_agent_chain(tomorrow, profile)
             
             # Delete processing message and send result
             await processing_msg.delete()
             await update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN)
-            
+        
         except Exception as e:
             logger.error(f"Error in /ngaymai command: {e}", exc_info=True)
             await update.message.reply_text(
                 f"❌ Có lỗi xảy ra: {str(e)}"
             )
     
-    async def send_message_to_user(self, message: str):
+    async def cmd_thang(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handle /thang command - calendar grid for a month
+        Usage: /thang [MM/YYYY]
         """
-        Send a message to the configured user
+        try:
+            if context.args:
+                try:
+                    month_start = datetime.strptime(context.args[0], "%m/%Y")
+                except ValueError:
+                    raise ValueError(f"Tháng không hợp lệ: {context.args[0]}")
+            else:
+                month_start = get_vietnam_datetime().replace(
+                    tzinfo=None, day=1, hour=0, minute=0, second=0, microsecond=0
+                )
+            
+            days = calendar.monthrange(month_start.year, month_start.month)[1]
+            await self._send_calendar(
+                update, month_start, days, f"THÁNG {month_start.strftime('%m/%Y')}"
+            )
         
-        Args:
-            message: Message text (Markdown formatted)
+        except ValueError as e:
+            await update.message.reply_text(
+                f"❌ Lỗi: {str(e)}\n"
+                "Vui lòng dùng định dạng: `/thang MM/YYYY`",
+                parse_mode=ParseMode.MARKDOWN
+            )
+        except Exception as e:
+            logger.error(f"Error in /thang command: {e}", exc_info=True)
+            await update.message.reply_text(
+                f"❌ Có lỗi xảy ra: {str(e)}"
+            )
+    
+    async def cmd_tuan(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handle /tuan command - calendar grid for a week (Monday to Sunday)
+        Usage: /tuan [DD/MM/YYYY]
         """
         try:
-            await self.application.bot.send_message(
-                chat_id=settings.TELEGRAM_CHAT_ID,
-                text=message,
+            if context.args:
+                target_date = parse_date_string(context.args[0])
+            else:
+                target_date = get_vietnam_datetime().replace(
+                    tzinfo=None, hour=0, minute=0, second=0, microsecond=0
+                )
+            
+            week_start = target_date - timedelta(days=target_date.weekday())
+            week_end = week_start + timedelta(days=6)
+            await self._send_calendar(
+                update, week_start, 7,
+                f"TUẦN {week_start.strftime('%d/%m')} - {week_end.strftime('%d/%m/%Y')}"
+            )
+        
+        except ValueError as e:
+            await update.message.reply_text(
+                f"❌ Lỗi: {str(e)}\n"
+                "Vui lòng dùng định dạng: `/tuan DD/MM/YYYY`",
                 parse_mode=ParseMode.MARKDOWN
             )
-            logger.info("Message sent to user successfully")
         except Exception as e:
-            logger.error(f"Error sending message to user: {e}", exc_info=True)
-            raise
+            logger.error(f"Error in /tuan command: {e}", exc_info=True)
+            await update.message.reply_text(
+                f"❌ Có lỗi xảy ra: {str(e)}"
+            )
+    
+    async def _send_calendar(self, update: Update, start: datetime, days: int, title: str):
+        """
+        Compute a calendar in one batch and queue it, chunk by chunk
+        All chunks are queued at once (the send queue keeps them in order per
+        chat), without waiting for delivery so the handler returns immediately.
+        """
+        chat_id = update.effective_chat.id
+        profile = self.scheduler.get_profile(chat_id)
+        chunks = await self.scheduler.run_calendar(start, days, title, profile)
+        
+        for chunk in chunks:
+            await self.send_message_to_user(chunk, chat_id)
+    
+    async def cmd_chonngay(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """
+        Handle /chonngay command - best days in a range
+        Usage: /chonngay [DD/MM/YYYY] [DD/MM/YYYY] [k=5] [min=7] [hoangdao] [khongxung] [truc=Thành] [thu=2..7|cn]
+        """
+        try:
+            start, end, options = self._parse_chonngay_args(context.args or [])
+            
+            profile = self.scheduler.get_profile(update.effective_chat.id)
+            days = await self.scheduler.find_best_days(start, end, profile, **options)
+            
+            header = (
+                f"🗓️ *NGÀY TỐT TỪ {start.strftime('%d/%m/%Y')} ĐẾN {end.strftime('%d/%m/%Y')}*\n"
+            )
+            if not days:
+                await update.message.reply_text(
+                    header + "\nKhông có ngày nào khớp điều kiện. Thử nới lỏng bộ lọc nhé!",
+                    parse_mode=ParseMode.MARKDOWN
+                )
+                return
+            
+            lines = [header]
+            for day in days:
+                tags = ["Hoàng Đạo" if day["is_hoang_dao"] else "Hắc Đạo"]
+                if day["has_xung"]:
+                    tags.append("⚠️ xung tuổi")
+                lines.append(
+                    f"• *{day['date'].strftime('%d/%m/%Y')}* "
+                    f"({self._weekday_label(day['date'])}) - "
+                    f"{day['luck_score']}/10\n"
+                    f"  {day['can_chi']} · Trực {day['truc']} · {', '.join(tags)}"
+                )
+            
+            await update.message.reply_text("\n".join(lines), parse_mode=ParseMode.MARKDOWN)
+        
+        except ValueError as e:
+            await update.message.reply_text(
+                f"❌ Lỗi: {str(e)}\n"
+                "Cách dùng: `/chonngay [DD/MM/YYYY] [DD/MM/YYYY] [k=5] [min=7] [hoangdao] [khongxung] [truc=Thành] [thu=2]`",
+                parse_mode=ParseMode.MARKDOWN
+            )
+        except Exception as e:
+            logger.error(f"Error in /chonngay command: {e}", exc_info=True)
+            await update.message.reply_text(
+                f"❌ Có lỗi xảy ra: {str(e)}"
+            )
+    
+    @staticmethod
+    def _weekday_label(target_date: datetime) -> str:
+        """Short Vietnamese weekday label (T2-T7, CN)"""
+        weekday = target_date.weekday()
+        return "CN" if weekday == 6 else f"T{weekday + 2}"
+    
+    def _parse_chonngay_args(self, args: list) -> tuple:
+        """
+        Parse /chonngay arguments
+        
+        Args:
+            args: Command arguments
+        
+        Returns:
+            (start, end, options for BestDayIndex.query)
+        
+        Raises:
+            ValueError: On an invalid argument
+        """
+        dates = []
+        options = {"top_k": 5}
+        for arg in args:
+            key, _, value = arg.partition("=")
+            key = key.lower()
+            if "/" in arg:
+                dates.append(parse_date_string(arg))
+            elif key == "k":
+                options["top_k"] = max(1, min(int(value), MAX_BEST_DAYS))
+            elif key == "min":
+                options["min_score"] = int(value)
+            elif key == "hoangdao":
+                options["hoang_dao_only"] = True
+            elif key == "khongxung":
+                options["no_xung"] = True
+            elif key == "truc":
+                options["truc"] = value.capitalize()
+            elif key == "thu":
+                if value.lower() == "cn":
+                    options["weekday"] = 6
+                elif value in ("2", "3", "4", "5", "6", "7"):
+                    options["weekday"] = int(value) - 2
+                else:
+                    raise ValueError(f"Thứ không hợp lệ: {value} (dùng 2-7 hoặc cn)")
+            else:
+                raise ValueError(f"Tùy chọn không hợp lệ: {arg}")
+        
+        if len(dates) > 2:
+            raise ValueError("Chỉ nhận tối đa 2 ngày (từ ngày, đến ngày)")
+        
+        # Default: the next BEST_DAYS_RANGE days starting tomorrow
+        tomorrow = get_vietnam_datetime().replace(tzinfo=None) + timedelta(days=1)
+        start = dates[0] if dates else tomorrow.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = dates[1] if len(dates) > 1 else start + timedelta(days=BEST_DAYS_RANGE - 1)
+        if end < start:
+            raise ValueError("Ngày kết thúc phải sau ngày bắt đầu")
+        
+        return start, end, options
+    
+    async def send_message_to_user(self, message: str, chat_id: str = None) -> asyncio.Future:
+        """
+        Queue a message for a user (rate limited, retried on errors)
+        
+        Args:
+            message: Message text (Markdown formatted)
+            chat_id: Target chat (defaults to the configured TELEGRAM_CHAT_ID)
+        
+        Returns:
+            Future resolving to True once delivered, False if delivery failed
+        """
+        return self.send_queue.submit(chat_id or settings.TELEGRAM_CHAT_ID, message)
+    
+    def register_webhook_route(self, router):
+        """
+        Mount the Telegram webhook endpoint
+        
+        Args:
+            router: aiohttp router (app.router, before the runner is set up) or the
+                health check server's deferred routes (after it is up)
+        """
+        router.add_post(settings.TELEGRAM_WEBHOOK_PATH, self.handle_webhook)
+    
+    async def handle_webhook(self, request: web.Request) -> web.Response:
+        """
+        Receive an update from Telegram and hand it to the Application
+        
+        Args:
+            request: POST request from Telegram
+        
+        Returns:
+            200 once queued, 403 on a bad secret token, 400 on a bad body
+        """
+        secret = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+        if not hmac.compare_digest(secret, settings.TELEGRAM_WEBHOOK_SECRET):
+            logger.warning("Rejected webhook call with invalid secret token")
+            return web.Response(status=403)
+        
+        try:
+            update = Update.de_json(await request.json(), self.application.bot)
+        except Exception as e:
+            logger.warning(f"Invalid webhook payload: {e}")
+            return web.Response(status=400)
+        
+        await self.application.update_queue.put(update)
+        return web.Response()
     
     async def start(self):
         """Start the bot"""
-        # Initialize and start the scheduler
         self.scheduler = ForecastScheduler(self)
-        self.scheduler.start()
         
-        # Initialize the application
+        # Initialize the application and the send queue first: the scheduler's
+        # catch-up run may queue the bulletin as soon as it starts
         await self.application.initialize()
         await self.application.start()
+        self.send_queue.start()
         
-        # Start polling (compatible with v21)
-        await self.application.updater.start_polling(
-            allowed_updates=Update.ALL_TYPES,
-            drop_pending_updates=True
-        )
+        self.scheduler.start()
         
-        logger.info("Telegram bot started successfully")
+        if self.use_webhook:
+            # Updates arrive on the health check server (see handle_webhook)
+            await self.application.bot.set_webhook(
+                url=settings.TELEGRAM_WEBHOOK_URL.rstrip("/") + settings.TELEGRAM_WEBHOOK_PATH,
+                allowed_updates=Update.ALL_TYPES,
+                drop_pending_updates=False,  # updates sent while restarting are still answered
+                secret_token=settings.TELEGRAM_WEBHOOK_SECRET
+            )
+        else:
+            # Start polling (compatible with v21)
+            await self.application.updater.start_polling(
+                allowed_updates=Update.ALL_TYPES,
+                drop_pending_updates=True
+            )
+        
+        mode = "webhook" if self.use_webhook else "polling"
+        logger.info(f"Telegram bot started successfully ({mode})")
     
     async def stop(self):
         """Stop the bot"""
@@ -205,6 +508,12 @@ Ví dụ: `/dubao 15/01/2026`
         if self.application.updater and self.application.updater.running:
             await self.application.updater.stop()
         
+        # Deliver what is still queued before the Bot API client closes,
+        # then close the store the deliveries are logged in
+        await self.send_queue.stop()
+        if self.scheduler:
+            self.scheduler.close()
+        
         await self.application.stop()
         await self.application.shutdown()
         
@@ -0,0 +1,185 @@
+"""
+Subscriber profiles and registry
+Each profile is immutable and hashable; derived values are computed once
+"""
+
+import json
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Profile:
+    """One subscriber: who receives the forecast and whose birth data it uses"""
+    
+    chat_id: str
+    name: str
+    birth_day: int
+    birth_month: int
+    birth_year: int
+    element: str = ""  # defaults to the element of the birth year's Can
+    branch: str = ""   # defaults to the birth year's Chi
+    
+    # Derived once in __post_init__
+    life_path: int = field(init=False, compare=False)
+    year_pillar: str = field(init=False, compare=False)
+    element_index: int = field(init=False, compare=False)
+    branch_index: int = field(init=False, compare=False)
+    
+    def __post_init__(self):
+        """Fill defaults and derived values"""
+        from core.can_chi import get_can_chi_year
+        from core.enums import CHI_INDEX, ELEMENT_INDEX
+        from core.numerology import calculate_life_path_number
+        
+        year = get_can_chi_year(self.birth_year)
+        
+        # Frozen dataclass: assign through object.__setattr__
+        if not self.element:
+            object.__setattr__(self, "element", year["element"])
+        if not self.branch:
+            object.__setattr__(self, "branch", year["chi"])
+        
+        if self.element not in ELEMENT_INDEX:
+            raise ValueError(f"Unknown element '{self.element}' for chat {self.chat_id}")
+        if self.branch not in CHI_INDEX:
+            raise ValueError(f"Unknown branch '{self.branch}' for chat {self.chat_id}")
+        
+        object.__setattr__(self, "life_path", calculate_life_path_number(
+            self.birth_day, self.birth_month, self.birth_year
+        ))
+        object.__setattr__(self, "year_pillar", year["can_chi"])
+        object.__setattr__(self, "element_index", ELEMENT_INDEX[self.element])
+        object.__setattr__(self, "branch_index", CHI_INDEX[self.branch])
+    
+    @property
+    def forecast_key(self) -> tuple:
+        """Everything the forecast depends on (not who receives it)"""
+        return (
+            self.name, self.birth_day, self.birth_month, self.birth_year,
+            self.element, self.branch
+        )
+    
+    @property
+    def seed_key(self) -> tuple:
+        """Birth data mixed into the forecast seed"""
+        return (self.birth_day, self.birth_month, self.element, self.branch, self.life_path)
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "Profile":
+        """
+        Build a profile from a JSON object / database row
+        
+        Args:
+            data: dict with chat_id, name, birth_day, birth_month, birth_year
+                and optional element, branch
+                
+        Returns:
+            Profile
+        """
+        return cls(
+            chat_id=str(data["chat_id"]),
+            name=data.get("name") or "",
+            birth_day=int(data["birth_day"]),
+            birth_month=int(data["birth_month"]),
+            birth_year=int(data["birth_year"]),
+            element=data.get("element") or "",
+            branch=data.get("branch") or ""
+        )
+    
+    @classmethod
+    def from_settings(cls) -> "Profile":
+        """The single user configured in .env"""
+        return cls(
+            chat_id=str(settings.TELEGRAM_CHAT_ID or ""),
+            name=settings.USER_NAME,
+            birth_day=settings.USER_BIRTH_DAY,
+            birth_month=settings.USER_BIRTH_MONTH,
+            birth_year=settings.USER_BIRTH_YEAR,
+            element=settings.USER_ELEMENT,
+            branch=settings.USER_BRANCH
+        )
+
+
+class SubscriberRegistry:
+    """All subscribers, keyed on chat_id"""
+    
+    def __init__(self, profiles: List[Profile]):
+        """
+        Initialize the registry
+        
+        Args:
+            profiles: Subscriber profiles (later duplicates of a chat_id win)
+        """
+        self._profiles: Dict[str, Profile] = {profile.chat_id: profile for profile in profiles}
+    
+    @classmethod
+    def load(cls, path: str = None) -> "SubscriberRegistry":
+        """
+        Load subscribers from a JSON file or SQLite database
+        Falls back to the single user from settings if the file does not exist.
+        
+        JSON: a list of objects with chat_id, name, birth_day, birth_month,
+        birth_year and optional element, branch.
+        SQLite (.db/.sqlite/.sqlite3): a `subscribers` table with the same columns.
+        
+        Args:
+            path: File path (defaults to settings.SUBSCRIBERS_FILE)
+            
+        Returns:
+            SubscriberRegistry
+        """
+        path = path or settings.SUBSCRIBERS_FILE
+        
+        if not path or not os.path.exists(path):
+            profile = Profile.from_settings()
+            return cls([profile] if profile.chat_id else [])
+        
+        if path.endswith((".db", ".sqlite", ".sqlite3")):
+            rows = cls._read_sqlite(path)
+        else:
+            with open(path, encoding="utf-8") as f:
+                rows = json.load(f)
+        
+        registry = cls([Profile.from_dict(row) for row in rows])
+        logger.info(f"Loaded {len(registry)} subscribers from {path}")
+        return registry
+    
+    @staticmethod
+    def _read_sqlite(path: str) -> List[dict]:
+        """Read subscriber rows from a SQLite database"""
+        connection = sqlite3.connect(path)
+        try:
+            connection.row_factory = sqlite3.Row
+            cursor = connection.execute(
+                "SELECT chat_id, name, birth_day, birth_month, birth_year, element, branch "
+                "FROM subscribers"
+            )
+            return [dict(row) for row in cursor]
+        finally:
+            connection.close()
+    
+    def get(self, chat_id) -> Optional[Profile]:
+        """
+        Get a subscriber's profile
+        
+        Args:
+            chat_id: Telegram chat id (int or str)
+            
+        Returns:
+            Profile, or None if not subscribed
+        """
+        return self._profiles.get(str(chat_id))
+    
+    def __iter__(self) -> Iterator[Profile]:
+        return iter(self._profiles.values())
+    
+    def __len__(self) -> int:
+        return len(self._profiles)
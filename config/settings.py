@@ -14,17 +14,75 @@ class Settings:
     TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
     TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
     
+    # Webhook mode (served on the health check server). Leave URL empty to use polling
+    TELEGRAM_WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL", "")  # e.g. https://your-app.onrender.com
+    TELEGRAM_WEBHOOK_PATH = os.getenv("TELEGRAM_WEBHOOK_PATH", "/telegram/webhook")
+    TELEGRAM_WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET", "")
+    
     # User Profile (Nguyễn Hùng Mạnh)
+    USER_NAME = os.getenv("USER_NAME", "Nguyễn Hùng Mạnh")
     USER_BIRTH_DAY = int(os.getenv("USER_BIRTH_DAY", 14))
     USER_BIRTH_MONTH = int(os.getenv("USER_BIRTH_MONTH", 4))
     USER_BIRTH_YEAR = int(os.getenv("USER_BIRTH_YEAR", 2001))
     USER_ELEMENT = os.getenv("USER_ELEMENT", "Kim")
     USER_BRANCH = os.getenv("USER_BRANCH", "Tỵ")
     
+    # Subscribers (JSON or SQLite). If the file is missing, only the user above is served
+    SUBSCRIBERS_FILE = os.getenv("SUBSCRIBERS_FILE", "subscribers.json")
+    
     # Schedule Configuration
     SCHEDULE_HOUR = int(os.getenv("SCHEDULE_HOUR", 20))  # 8 PM
     TIMEZONE = os.getenv("TIMEZONE", "Asia/Ho_Chi_Minh")
     
+    # Precomputed almanac (build with: python -m core.almanac build)
+    ALMANAC_FILE = os.getenv("ALMANAC_FILE", "data/almanac.bin")
+    
+    # Forecast cache
+    FORECAST_CACHE_SIZE = int(os.getenv("FORECAST_CACHE_SIZE", 1024))
+    FORECAST_CACHE_TTL = int(os.getenv("FORECAST_CACHE_TTL", 6 * 3600))  # seconds
+    
+    # Persistent forecasts + delivery log (SQLite, WAL mode); writes are committed in batches
+    FORECAST_DB_FILE = os.getenv("FORECAST_DB_FILE", "data/forecasts.db")
+    STORE_BATCH_SIZE = int(os.getenv("STORE_BATCH_SIZE", 100))
+    STORE_FLUSH_SECONDS = int(os.getenv("STORE_FLUSH_SECONDS", 5))
+    
+    # Tracing spans (JSON lines, empty = off) and sampled cProfile of chain jobs (0 = off)
+    TRACE_FILE = os.getenv("TRACE_FILE", "")
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+    PROFILE_OUTPUT = os.getenv("PROFILE_OUTPUT", "data/chain-profile")
+    PROFILE_DUMP_EVERY = int(os.getenv("PROFILE_DUMP_EVERY", 20))
+    
+    # /debug/* endpoints are enabled only when this token is set (sent as X-Debug-Token or ?token=)
+    DEBUG_TOKEN = os.getenv("DEBUG_TOKEN", "")
+    
+    # Event-loop lag monitor: measurement interval, slow-callback threshold (ms), samples kept for p50/p99
+    LOOP_LAG_INTERVAL_MS = int(os.getenv("LOOP_LAG_INTERVAL_MS", 100))
+    LOOP_SLOW_CALLBACK_MS = int(os.getenv("LOOP_SLOW_CALLBACK_MS", 250))
+    LOOP_LAG_WINDOW = int(os.getenv("LOOP_LAG_WINDOW", 600))
+    
+    # /debug/profile sampling profiler: default rate (Hz) and longest run (seconds)
+    PROFILE_SAMPLE_HZ = float(os.getenv("PROFILE_SAMPLE_HZ", 100))
+    PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", 120))
+    
+    # HTTP API (/api/*): Cache-Control max-age in seconds
+    API_CACHE_MAX_AGE = int(os.getenv("API_CACHE_MAX_AGE", 3600))
+    # chat_id= lookups on /api/* are allowed only with this token (sent as X-API-Token or ?token=)
+    API_TOKEN = os.getenv("API_TOKEN", "")
+    
+    # Rolling window of precomputed forecasts (today + next N-1 days)
+    PRECOMPUTE_DAYS = int(os.getenv("PRECOMPUTE_DAYS", 30))
+    
+    # Where agent work runs: inline, thread or process
+    AGENT_EXECUTOR = os.getenv("AGENT_EXECUTOR", "thread")
+    AGENT_MAX_WORKERS = int(os.getenv("AGENT_MAX_WORKERS", 2))
+    AGENT_JOB_TIMEOUT = float(os.getenv("AGENT_JOB_TIMEOUT", 60))  # seconds, 0 = no timeout
+    
+    # Outbound send queue (Telegram allows ~30 msg/s overall, ~1 msg/s per chat)
+    SEND_WORKERS = int(os.getenv("SEND_WORKERS", 4))
+    SEND_GLOBAL_RATE = float(os.getenv("SEND_GLOBAL_RATE", 25))  # messages per second
+    SEND_PER_CHAT_RATE = float(os.getenv("SEND_PER_CHAT_RATE", 1))  # messages per second
+    SEND_MAX_RETRIES = int(os.getenv("SEND_MAX_RETRIES", 5))
+    
     # Health Check Server (for Render.com)
     PORT = int(os.getenv("PORT", 8080))
     
@@ -53,6 +111,9 @@ class Settings:
         if not cls.TELEGRAM_CHAT_ID:
             raise ValueError("TELEGRAM_CHAT_ID is required in .env file")
         
+        if cls.TELEGRAM_WEBHOOK_URL and not cls.TELEGRAM_WEBHOOK_SECRET:
+            raise ValueError("TELEGRAM_WEBHOOK_SECRET is required when TELEGRAM_WEBHOOK_URL is set")
+        
         return True
 
 
@@ -0,0 +1,298 @@
+"""
+Binary almanac: one fixed-width record per day for 1900-2100
+Holds everything Agent 1 derives that does not depend on the user, so a
+date lookup is a pointer offset into a memory-mapped file shared by all
+worker processes.
+
+Build it once (e.g. in the deploy build step):
+    python -m core.almanac build [path]
+"""
+
+import mmap
+import os
+import struct
+import sys
+from datetime import date, datetime
+from typing import Optional
+
+from .can_chi import (
+    REFERENCE_DATE, REFERENCE_CAN_INDEX, REFERENCE_CHI_INDEX, get_truc_index, get_can_chi_many, TRUC_IS_HOANG_DAO
+)
+from .lunar_calendar import get_season_index
+from .lunar_table import FIRST_ORDINAL, END_ORDINAL, FIRST_YEAR, MONTH_STARTS, MONTH_KEYS, solar_ordinal_to_lunar
+
+MAGIC = b"TCAL"
+VERSION = 1
+
+# Header: magic, version, record size, first day ordinal, record count
+HEADER = struct.Struct("<4sHHII")
+
+# Record: lunar year offset (from 1900), lunar month, lunar day, flags,
+#         can index, chi index, trực index, season index
+RECORD = struct.Struct("<BBBBBBBB")
+
+FLAG_LEAP_MONTH = 0x01
+FLAG_HOANG_DAO = 0x02
+
+# NumPy dtype matching RECORD, for zero-copy bulk access
+NUMPY_FIELDS = [
+    ("lunar_year_offset", "u1"), ("lunar_month", "u1"), ("lunar_day", "u1"), ("flags", "u1"),
+    ("can", "u1"), ("chi", "u1"), ("truc", "u1"), ("season", "u1")
+]
+
+
+def encode_day(ordinal: int) -> bytes:
+    """
+    Compute the almanac record for one day
+    
+    Args:
+        ordinal: Proleptic Gregorian ordinal (date.toordinal())
+        
+    Returns:
+        Packed RECORD bytes
+    """
+    lunar_year, lunar_month, lunar_day, is_leap_month = solar_ordinal_to_lunar(ordinal)
+    days_diff = ordinal - REFERENCE_DATE.toordinal()
+    can_index = (REFERENCE_CAN_INDEX + days_diff) % 10
+    chi_index = (REFERENCE_CHI_INDEX + days_diff) % 12
+    truc_index = get_truc_index(lunar_month, chi_index)
+    
+    flags = 0
+    if is_leap_month:
+        flags |= FLAG_LEAP_MONTH
+    if TRUC_IS_HOANG_DAO[truc_index]:
+        flags |= FLAG_HOANG_DAO
+    
+    return RECORD.pack(
+        lunar_year - FIRST_YEAR, lunar_month, lunar_day, flags,
+        can_index, chi_index, truc_index, get_season_index(lunar_month)
+    )
+
+
+def encode_days(first_ordinal: int, end_ordinal: int) -> bytes:
+    """
+    Compute the almanac records for a range of days at once (same bytes as encode_day per day)
+    
+    Args:
+        first_ordinal: First day (inclusive)
+        end_ordinal: Last day (exclusive)
+        
+    Returns:
+        Packed RECORD bytes, one record per day
+        
+    Raises:
+        ValueError: If the range is outside the lunar table
+    """
+    import numpy as np
+    
+    if not FIRST_ORDINAL <= first_ordinal <= end_ordinal <= END_ORDINAL:
+        raise ValueError(
+            f"Range out of [{date.fromordinal(FIRST_ORDINAL)}, {date.fromordinal(END_ORDINAL)})"
+        )
+    
+    ordinals = np.arange(first_ordinal, end_ordinal, dtype=np.int64)
+    month_starts = np.asarray(MONTH_STARTS, dtype=np.int64)
+    month_keys = np.asarray(MONTH_KEYS, dtype=np.int64)
+    month_index = np.searchsorted(month_starts, ordinals, side="right") - 1
+    keys = month_keys[month_index]
+    lunar_month = (keys >> 1) & 0xF
+    
+    can_chi = get_can_chi_many(ordinals - REFERENCE_DATE.toordinal())
+    truc = (lunar_month + can_chi["chi"] + 1) % 12
+    seasons = np.array([0] + [get_season_index(month) for month in range(1, 13)], dtype=np.uint8)
+    hoang_dao = np.array(TRUC_IS_HOANG_DAO, dtype=np.uint8)
+    
+    records = np.empty(len(ordinals), dtype=np.dtype(NUMPY_FIELDS))
+    records["lunar_year_offset"] = keys >> 5
+    records["lunar_month"] = lunar_month
+    records["lunar_day"] = ordinals - month_starts[month_index] + 1
+    records["flags"] = (keys & 1) * FLAG_LEAP_MONTH | hoang_dao[truc] * FLAG_HOANG_DAO
+    records["can"] = can_chi["can"]
+    records["chi"] = can_chi["chi"]
+    records["truc"] = truc
+    records["season"] = seasons[lunar_month]
+    return records.tobytes()
+
+
+def build_almanac(path: str, first_ordinal: int = FIRST_ORDINAL, end_ordinal: int = END_ORDINAL) -> int:
+    """
+    Write the almanac file (atomically, via a temporary file)
+    
+    Args:
+        path: Output file path
+        first_ordinal: First day (inclusive)
+        end_ordinal: Last day (exclusive)
+        
+    Returns:
+        Number of records written
+    """
+    count = end_ordinal - first_ordinal
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, first_ordinal, count))
+        f.write(encode_days(first_ordinal, end_ordinal))
+    os.replace(temp_path, path)
+    return count
+
+
+class Almanac:
+    """Read-only, memory-mapped view of an almanac file"""
+    
+    def __init__(self, path: str):
+        """
+        Open and map the almanac file
+        
+        Args:
+            path: Almanac file path
+            
+        Raises:
+            ValueError: If the file is not a valid almanac
+        """
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        
+        magic, version, record_size, first_ordinal, count = HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} almanac file")
+        if len(self._view) < HEADER.size + count * record_size:
+            self.close()
+            raise ValueError(f"{path} is truncated")
+        
+        self.path = path
+        self.first_ordinal = first_ordinal
+        self.end_ordinal = first_ordinal + count
+        self.count = count
+    
+    def __contains__(self, day) -> bool:
+        return self.first_ordinal <= day.toordinal() < self.end_ordinal
+    
+    def record(self, ordinal: int) -> tuple:
+        """
+        Decode one day's record
+        
+        Args:
+            ordinal: Proleptic Gregorian ordinal
+            
+        Returns:
+            (lunar_year, lunar_month, lunar_day, is_leap_month,
+             can_index, chi_index, truc_index, season_index, is_hoang_dao)
+            
+        Raises:
+            ValueError: If the date is outside the almanac
+        """
+        index = ordinal - self.first_ordinal
+        if not 0 <= index < self.count:
+            raise ValueError(f"Date {date.fromordinal(ordinal)} is outside the almanac")
+        
+        year_offset, month, day, flags, can, chi, truc, season = RECORD.unpack_from(
+            self._view, HEADER.size + index * RECORD.size
+        )
+        return (
+            FIRST_YEAR + year_offset, month, day, bool(flags & FLAG_LEAP_MONTH),
+            can, chi, truc, season, bool(flags & FLAG_HOANG_DAO)
+        )
+    
+    def lookup(self, day) -> tuple:
+        """
+        Decode the record for a date (see record())
+        
+        Args:
+            day: date or datetime
+        """
+        return self.record(day.toordinal())
+    
+    def as_numpy(self):
+        """
+        All records as a NumPy structured array (zero-copy over the mapping)
+        Index i is the day with ordinal first_ordinal + i.
+        """
+        import numpy as np
+        
+        return np.frombuffer(
+            self._view, dtype=np.dtype(NUMPY_FIELDS), count=self.count, offset=HEADER.size
+        )
+    
+    def close(self):
+        """Release the mapping"""
+        self._view.release()
+        self._mmap.close()
+
+
+# Process-wide almanac, opened on first use (None if the file is missing)
+_almanac = None
+_almanac_loaded = False
+
+# (first_ordinal, records) for get_day_records(), built on first use
+_day_records = None
+
+
+def get_almanac(path: str = None) -> Optional[Almanac]:
+    """
+    Get the shared almanac, opening it the first time
+    
+    Args:
+        path: Almanac file (defaults to settings.ALMANAC_FILE)
+        
+    Returns:
+        Almanac, or None if no valid file exists (callers compute instead)
+    """
+    global _almanac, _almanac_loaded
+    if not _almanac_loaded:
+        if path is None:
+            from config.settings import settings
+            path = settings.ALMANAC_FILE
+        try:
+            _almanac = Almanac(path) if path and os.path.exists(path) else None
+        except ValueError:
+            _almanac = None
+        _almanac_loaded = True
+    return _almanac
+
+
+def get_day_records():
+    """
+    All almanac records as a NumPy structured array (fields: NUMPY_FIELDS)
+    Zero-copy from the mapped file when it exists, otherwise built in memory once.
+    
+    Returns:
+        (first_ordinal, records) - records[i] is the day with ordinal first_ordinal + i
+    """
+    global _day_records
+    if _day_records is None:
+        almanac = get_almanac()
+        if almanac is not None:
+            _day_records = (almanac.first_ordinal, almanac.as_numpy())
+        else:
+            import numpy as np
+            
+            data = encode_days(FIRST_ORDINAL, END_ORDINAL)
+            _day_records = (FIRST_ORDINAL, np.frombuffer(data, dtype=np.dtype(NUMPY_FIELDS)))
+    return _day_records
+
+
+def main():
+    """CLI: python -m core.almanac build [path]"""
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        print("Usage: python -m core.almanac build [path]")
+        sys.exit(1)
+    
+    if len(sys.argv) > 2:
+        path = sys.argv[2]
+    else:
+        from config.settings import settings
+        path = settings.ALMANAC_FILE
+    
+    start = datetime.now()
+    count = build_almanac(path)
+    elapsed = (datetime.now() - start).total_seconds()
+    print(f"Wrote {count} days to {path} ({os.path.getsize(path)} bytes) in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
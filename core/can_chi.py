@@ -4,7 +4,12 @@ Implements the 60-year sexagenary cycle used in Vietnamese astrology
 """
 
 from datetime import datetime
-from .constants import THIEN_CAN, DIA_CHI, CAN_TO_ELEMENT, CHI_TO_ELEMENT, CHI_TO_ANIMAL, TRUC_12
+from .constants import (
+    THIEN_CAN, DIA_CHI, CAN_TO_ELEMENT, CHI_TO_ELEMENT, CHI_TO_ANIMAL, TRUC_12, NGU_HANH,
+    XUNG_PAIRS, HOP_PAIRS, TAM_HOP, NGU_HANH_SINH, NGU_HANH_KHAC,
+    HOANG_DAO, SEASONS, ELEMENT_STATES, ELEMENT_STATE_BY_SEASON
+)
+from .enums import Relation, CHI_INDEX, ELEMENT_INDEX
 
 
 # Reference date with known Can Chi
@@ -13,6 +18,79 @@ REFERENCE_DATE = datetime(1900, 1, 1)
 REFERENCE_CAN_INDEX = 6  # Canh (index in THIEN_CAN)
 REFERENCE_CHI_INDEX = 0  # Tý (index in DIA_CHI)
 
+# Element index (into NGU_HANH) for each Can / Chi index
+CAN_ELEMENT_INDEX = [NGU_HANH.index(CAN_TO_ELEMENT[can]) for can in THIEN_CAN]
+CHI_ELEMENT_INDEX = [NGU_HANH.index(CHI_TO_ELEMENT[chi]) for chi in DIA_CHI]
+
+
+def _build_chi_matrix(groups) -> tuple:
+    """Build a symmetric 12x12 bool matrix from groups of Chi names"""
+    matrix = [[False] * 12 for _ in range(12)]
+    for group in groups:
+        for chi1 in group:
+            for chi2 in group:
+                if chi1 != chi2:
+                    matrix[CHI_INDEX[chi1]][CHI_INDEX[chi2]] = True
+    return tuple(tuple(row) for row in matrix)
+
+
+def _element_relation(element1: str, element2: str) -> Relation:
+    """Relation of element1 towards element2 from the Sinh/Khắc cycles"""
+    if element1 == element2:
+        return Relation.SAME
+    if NGU_HANH_SINH.get(element1) == element2:
+        return Relation.SINH
+    if NGU_HANH_SINH.get(element2) == element1:
+        return Relation.DUOC_SINH
+    if NGU_HANH_KHAC.get(element1) == element2:
+        return Relation.KHAC
+    if NGU_HANH_KHAC.get(element2) == element1:
+        return Relation.BI_KHAC
+    return Relation.NEUTRAL
+
+
+# Chi x Chi relation matrices: XUNG_MATRIX[chi1][chi2] -> bool
+XUNG_MATRIX = _build_chi_matrix(XUNG_PAIRS)
+HOP_MATRIX = _build_chi_matrix(HOP_PAIRS)
+TAM_HOP_MATRIX = _build_chi_matrix(TAM_HOP)
+
+# Element x Element relation matrix: ELEMENT_RELATION[element1][element2] -> Relation
+ELEMENT_RELATION = tuple(
+    tuple(_element_relation(element1, element2) for element2 in NGU_HANH)
+    for element1 in NGU_HANH
+)
+
+# Season x Element -> index into ELEMENT_STATES
+SEASON_ELEMENT_STATE = tuple(
+    tuple(ELEMENT_STATES.index(ELEMENT_STATE_BY_SEASON[season][element]) for element in NGU_HANH)
+    for season in SEASONS
+)
+
+# Trực index -> True if Hoàng Đạo
+TRUC_IS_HOANG_DAO = tuple(truc in HOANG_DAO for truc in TRUC_12)
+
+
+def _chi_pair(chi1: str, chi2: str, matrix: tuple) -> bool:
+    """Look up two Chi names in a Chi x Chi matrix (False for unknown names)"""
+    index1 = CHI_INDEX.get(chi1)
+    index2 = CHI_INDEX.get(chi2)
+    if index1 is None or index2 is None:
+        return False
+    return matrix[index1][index2]
+
+
+def get_day_number(date: datetime) -> int:
+    """
+    Get the number of days between REFERENCE_DATE and a date
+    
+    Args:
+        date: datetime or date object
+        
+    Returns:
+        Day number (0 for 01/01/1900)
+    """
+    return date.toordinal() - REFERENCE_DATE.toordinal()
+
 
 def get_can_chi_day(date: datetime) -> dict:
     """
@@ -49,10 +127,57 @@ def get_can_chi_day(date: datetime) -> dict:
         "element_can": CAN_TO_ELEMENT[can],
         "element_chi": CHI_TO_ELEMENT[chi],
         "animal": CHI_TO_ANIMAL[chi],
+        "can_index": can_index,
         "chi_index": chi_index
     }
 
 
+def get_can_chi_many(day_numbers) -> dict:
+    """
+    Vectorized Can Chi calculation for many days at once
+    
+    Args:
+        day_numbers: Sequence or NumPy array of day numbers (see get_day_number)
+        
+    Returns:
+        dict of int8 NumPy arrays: can, chi, element_can, element_chi, animal
+        (indices into THIEN_CAN, DIA_CHI, NGU_HANH and DIA_CHI respectively)
+    """
+    import numpy as np
+    
+    days = np.asarray(day_numbers, dtype=np.int64)
+    can_index = ((REFERENCE_CAN_INDEX + days) % 10).astype(np.int8)
+    chi_index = ((REFERENCE_CHI_INDEX + days) % 12).astype(np.int8)
+    
+    return {
+        "can": can_index,
+        "chi": chi_index,
+        "element_can": np.asarray(CAN_ELEMENT_INDEX, dtype=np.int8)[can_index],
+        "element_chi": np.asarray(CHI_ELEMENT_INDEX, dtype=np.int8)[chi_index],
+        # Animals follow Chi one-to-one
+        "animal": chi_index
+    }
+
+
+def get_can_chi_range(start: datetime, end: datetime) -> dict:
+    """
+    Vectorized Can Chi calculation for every day in [start, end]
+    
+    Args:
+        start: First date (inclusive)
+        end: Last date (inclusive)
+        
+    Returns:
+        Same arrays as get_can_chi_many(), plus day_number
+    """
+    import numpy as np
+    
+    day_numbers = np.arange(get_day_number(start), get_day_number(end) + 1, dtype=np.int64)
+    result = get_can_chi_many(day_numbers)
+    result["day_number"] = day_numbers
+    return result
+
+
 def get_truc(lunar_month: int, day_chi_index: int) -> str:
     """
     Calculate Trực (12 Duty Gods) for a given day
@@ -64,10 +189,23 @@ def get_truc(lunar_month: int, day_chi_index: int) -> str:
     Returns:
         Trực name (one of 12 TRUC_12)
     """
+    return TRUC_12[get_truc_index(lunar_month, day_chi_index)]
+
+
+def get_truc_index(lunar_month: int, day_chi_index: int) -> int:
+    """
+    Calculate Trực index (into TRUC_12) for a given day
+    
+    Args:
+        lunar_month: Lunar month (1-12)
+        day_chi_index: Index of the day's Chi (0-11)
+        
+    Returns:
+        Trực index (0-11)
+    """
     # Formula: Trực index = (lunar_month + day_chi_index - 1) % 12
     # Adjusted for Vietnamese system
-    truc_index = (lunar_month + day_chi_index + 1) % 12
-    return TRUC_12[truc_index]
+    return (lunar_month + day_chi_index + 1) % 12
 
 
 def get_can_chi_year(year: int) -> dict:
@@ -110,12 +248,7 @@ def check_xung(chi1: str, chi2: str) -> bool:
     Returns:
         True if they clash, False otherwise
     """
-    from .constants import XUNG_PAIRS
-    
-    for pair in XUNG_PAIRS:
-        if (chi1 == pair[0] and chi2 == pair[1]) or (chi1 == pair[1] and chi2 == pair[0]):
-            return True
-    return False
+    return _chi_pair(chi1, chi2, XUNG_MATRIX)
 
 
 def check_hop(chi1: str, chi2: str) -> bool:
@@ -129,12 +262,46 @@ def check_hop(chi1: str, chi2: str) -> bool:
     Returns:
         True if they harmonize, False otherwise
     """
-    from .constants import HOP_PAIRS
+    return _chi_pair(chi1, chi2, HOP_MATRIX)
+
+
+def check_tam_hop(chi1: str, chi2: str) -> bool:
+    """
+    Check if two Chi (Earthly Branches) belong to the same Tam Hợp group
+    
+    Args:
+        chi1: First Chi
+        chi2: Second Chi
+        
+    Returns:
+        True if they are in the same Tam Hợp group, False otherwise
+    """
+    return _chi_pair(chi1, chi2, TAM_HOP_MATRIX)
+
+
+def describe_element_relationship(relation: Relation, element1: str, element2: str) -> str:
+    """
+    Render the description for an element relationship
     
-    for pair in HOP_PAIRS:
-        if (chi1 == pair[0] and chi2 == pair[1]) or (chi1 == pair[1] and chi2 == pair[0]):
-            return True
-    return False
+    Args:
+        relation: Value from ELEMENT_RELATION
+        element1: First element name
+        element2: Second element name
+        
+    Returns:
+        Vietnamese description string
+    """
+    if relation == Relation.SAME:
+        return f"{element1} đồng hành {element2}"
+    if relation == Relation.SINH:
+        return f"{element1} sinh {element2} (tốt)"
+    if relation == Relation.DUOC_SINH:
+        return f"{element2} sinh {element1} (tốt)"
+    if relation == Relation.KHAC:
+        return f"{element1} khắc {element2} (xấu)"
+    if relation == Relation.BI_KHAC:
+        return f"{element2} khắc {element1} (xấu)"
+    return f"{element1} và {element2} không tương tác mạnh"
 
 
 def check_element_relationship(element1: str, element2: str) -> dict:
@@ -148,43 +315,14 @@ def check_element_relationship(element1: str, element2: str) -> dict:
     Returns:
         dict with relationship type and description
     """
-    from .constants import NGU_HANH_SINH, NGU_HANH_KHAC
-    
-    if element1 == element2:
-        return {
-            "type": "same",
-            "description": f"{element1} đồng hành {element2}"
-        }
-    
-    # Check if element1 generates element2
-    if NGU_HANH_SINH.get(element1) == element2:
-        return {
-            "type": "sinh",
-            "description": f"{element1} sinh {element2} (tốt)"
-        }
-    
-    # Check if element2 generates element1
-    if NGU_HANH_SINH.get(element2) == element1:
-        return {
-            "type": "duoc_sinh",
-            "description": f"{element2} sinh {element1} (tốt)"
-        }
-    
-    # Check if element1 controls element2
-    if NGU_HANH_KHAC.get(element1) == element2:
-        return {
-            "type": "khac",
-            "description": f"{element1} khắc {element2} (xấu)"
-        }
-    
-    # Check if element2 controls element1
-    if NGU_HANH_KHAC.get(element2) == element1:
-        return {
-            "type": "bi_khac",
-            "description": f"{element2} khắc {element1} (xấu)"
-        }
-    
+    index1 = ELEMENT_INDEX.get(element1)
+    index2 = ELEMENT_INDEX.get(element2)
+    if index1 is None or index2 is None:
+        # Not one of NGU_HANH: fall back to the Sinh/Khắc cycles (same/neutral)
+        relation = _element_relation(element1, element2)
+    else:
+        relation = ELEMENT_RELATION[index1][index2]
     return {
-        "type": "neutral",
-        "description": f"{element1} và {element2} không tương tác mạnh"
+        "type": relation.key,
+        "description": describe_element_relationship(relation, element1, element2)
     }
@@ -9,6 +9,9 @@ THIEN_CAN = ["Giáp", "Ất", "Bính", "Đinh", "Mậu", "Kỷ", "Canh", "Tân",
 # Địa Chi (Earthly Branches) - 12 branches
 DIA_CHI = ["Tý", "Sửu", "Dần", "Mão", "Thìn", "Tỵ", "Ngọ", "Mùi", "Thân", "Dậu", "Tuất", "Hợi"]
 
+# Ngũ Hành (Five Elements) in generation order (Mộc → Hỏa → Thổ → Kim → Thủy)
+NGU_HANH = ["Mộc", "Hỏa", "Thổ", "Kim", "Thủy"]
+
 # Mapping Thiên Can to Elements
 CAN_TO_ELEMENT = {
     "Giáp": "Mộc", "Ất": "Mộc",
@@ -85,6 +88,12 @@ TRUC_12 = [
     "Phá", "Nguy", "Thành", "Thu", "Khai", "Bế"
 ]
 
+# Seasons in lunar order (3 months each)
+SEASONS = ["Xuân", "Hạ", "Thu", "Đông"]
+
+# Element states from strongest to weakest
+ELEMENT_STATES = ["Vượng", "Tướng", "Hưu", "Tù", "Tử"]
+
 # Hoàng Đạo (Auspicious) and Hắc Đạo (Inauspicious) days
 HOANG_DAO = ["Kiến", "Trừ", "Mãn", "Bình", "Định", "Thành"]
 HAC_DAO = ["Chấp", "Phá", "Nguy", "Thu", "Khai", "Bế"]
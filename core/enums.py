@@ -0,0 +1,129 @@
+"""
+Integer-coded enums for Can, Chi, Ngũ Hành, Trực and seasons
+Values are indices into the matching lists in core.constants,
+so strings are only looked up when rendering (see .label)
+"""
+
+from enum import IntEnum
+
+from .constants import THIEN_CAN, DIA_CHI, NGU_HANH, TRUC_12, SEASONS, ELEMENT_STATES
+
+
+class Can(IntEnum):
+    """Thiên Can (Heavenly Stems)"""
+    GIAP = 0
+    AT = 1
+    BINH = 2
+    DINH = 3
+    MAU = 4
+    KY = 5
+    CANH = 6
+    TAN = 7
+    NHAM = 8
+    QUY = 9
+
+    @property
+    def label(self) -> str:
+        return THIEN_CAN[self]
+
+
+class Chi(IntEnum):
+    """Địa Chi (Earthly Branches)"""
+    TY = 0
+    SUU = 1
+    DAN = 2
+    MAO = 3
+    THIN = 4
+    TI = 5
+    NGO = 6
+    MUI = 7
+    THAN = 8
+    DAU = 9
+    TUAT = 10
+    HOI = 11
+
+    @property
+    def label(self) -> str:
+        return DIA_CHI[self]
+
+
+class Element(IntEnum):
+    """Ngũ Hành (Five Elements), in generation order"""
+    MOC = 0
+    HOA = 1
+    THO = 2
+    KIM = 3
+    THUY = 4
+
+    @property
+    def label(self) -> str:
+        return NGU_HANH[self]
+
+
+class Truc(IntEnum):
+    """12 Trực (Duty Gods)"""
+    KIEN = 0
+    TRU = 1
+    MAN = 2
+    BINH = 3
+    DINH = 4
+    CHAP = 5
+    PHA = 6
+    NGUY = 7
+    THANH = 8
+    THU = 9
+    KHAI = 10
+    BE = 11
+
+    @property
+    def label(self) -> str:
+        return TRUC_12[self]
+
+
+class Season(IntEnum):
+    """Seasons of the lunar year"""
+    XUAN = 0
+    HA = 1
+    THU = 2
+    DONG = 3
+
+    @property
+    def label(self) -> str:
+        return SEASONS[self]
+
+
+class ElementState(IntEnum):
+    """Element strength by season (Vượng → Tử)"""
+    VUONG = 0
+    TUONG = 1
+    HUU = 2
+    TU_IMPRISONED = 3
+    TU_DEAD = 4
+
+    @property
+    def label(self) -> str:
+        return ELEMENT_STATES[self]
+
+
+class Relation(IntEnum):
+    """Relationship of element1 towards element2"""
+    SAME = 0
+    SINH = 1
+    DUOC_SINH = 2
+    KHAC = 3
+    BI_KHAC = 4
+    NEUTRAL = 5
+
+    @property
+    def key(self) -> str:
+        """Legacy string type used in analysis dicts"""
+        return self.name.lower()
+
+
+# Index lookups from the Vietnamese names
+CAN_INDEX = {name: index for index, name in enumerate(THIEN_CAN)}
+CHI_INDEX = {name: index for index, name in enumerate(DIA_CHI)}
+ELEMENT_INDEX = {name: index for index, name in enumerate(NGU_HANH)}
+TRUC_INDEX = {name: index for index, name in enumerate(TRUC_12)}
+SEASON_INDEX = {name: index for index, name in enumerate(SEASONS)}
+STATE_INDEX = {name: index for index, name in enumerate(ELEMENT_STATES)}
@@ -1,12 +1,13 @@
 """
 Lunar Calendar utilities for converting between Solar and Lunar dates
-Using LunarDate library for accurate conversion
+Uses the precomputed month table in core.lunar_table (same data as LunarDate)
 """
 
 from datetime import datetime
-from lunardate import LunarDate
 import pytz
 
+from .lunar_table import solar_ordinal_to_lunar, lunar_to_solar_ordinal
+
 
 def get_lunar_date(solar_date: datetime) -> dict:
     """
@@ -18,20 +19,43 @@ def get_lunar_date(solar_date: datetime) -> dict:
     Returns:
         dict with lunar_day, lunar_month, lunar_year, is_leap_month
     """
-    lunar = LunarDate.fromSolarDate(
-        solar_date.year,
-        solar_date.month,
-        solar_date.day
+    lunar_year, lunar_month, lunar_day, is_leap_month = solar_ordinal_to_lunar(
+        solar_date.toordinal()
     )
     
     return {
-        "lunar_day": lunar.day,
-        "lunar_month": lunar.month,
-        "lunar_year": lunar.year,
-        "is_leap_month": lunar.isLeapMonth
+        "lunar_day": lunar_day,
+        "lunar_month": lunar_month,
+        "lunar_year": lunar_year,
+        "is_leap_month": is_leap_month
     }
 
 
+def get_solar_date(
+    lunar_year: int,
+    lunar_month: int,
+    lunar_day: int,
+    is_leap_month: bool = False
+) -> datetime:
+    """
+    Convert lunar date back to solar (Gregorian) date
+    
+    Args:
+        lunar_year: Lunar year
+        lunar_month: Lunar month (1-12)
+        lunar_day: Lunar day (1-30)
+        is_leap_month: True for the leap (nhuận) month
+        
+    Returns:
+        datetime object (midnight) in solar calendar
+        
+    Raises:
+        ValueError: If the lunar date does not exist
+    """
+    ordinal = lunar_to_solar_ordinal(lunar_year, lunar_month, lunar_day, is_leap_month)
+    return datetime.fromordinal(ordinal)
+
+
 def format_lunar_date(lunar_info: dict) -> str:
     """
     Format lunar date to Vietnamese string
@@ -69,6 +93,19 @@ def get_season_from_lunar_month(lunar_month: int) -> str:
         return "Đông"
 
 
+def get_season_index(lunar_month: int) -> int:
+    """
+    Get season index (into SEASONS) based on lunar month
+    
+    Args:
+        lunar_month: Lunar month (1-12)
+        
+    Returns:
+        0=Xuân, 1=Hạ, 2=Thu, 3=Đông
+    """
+    return (lunar_month - 1) // 3
+
+
 def get_vietnam_datetime() -> datetime:
     """
     Get current datetime in Vietnam timezone
@@ -0,0 +1,167 @@
+"""
+Precomputed lunar month table for fast Solar <-> Lunar conversion
+Covers lunar years 1900-2099 (solar 31/01/1900 - 08/02/2100)
+"""
+
+from array import array
+from bisect import bisect_right
+from datetime import date
+
+# Year encoding (same as the lunar project used by LunarDate):
+#   bits 0-3  : leap month (0 = no leap month)
+#   bits 4-15 : month lengths, bit (16 - m) set = month m has 30 days
+#   bit 16    : leap month has 30 days
+YEAR_INFOS = array("l", [
+    0x04bd8, 0x04ae0, 0x0a570, 0x054d5, 0x0d260,  # 1900-1904
+    0x0d950, 0x16554, 0x056a0, 0x09ad0, 0x055d2,  # 1905-1909
+    0x04ae0, 0x0a5b6, 0x0a4d0, 0x0d250, 0x1d255,  # 1910-1914
+    0x0b540, 0x0d6a0, 0x0ada2, 0x095b0, 0x14977,  # 1915-1919
+    0x04970, 0x0a4b0, 0x0b4b5, 0x06a50, 0x06d40,  # 1920-1924
+    0x1ab54, 0x02b60, 0x09570, 0x052f2, 0x04970,  # 1925-1929
+    0x06566, 0x0d4a0, 0x0ea50, 0x06e95, 0x05ad0,  # 1930-1934
+    0x02b60, 0x186e3, 0x092e0, 0x1c8d7, 0x0c950,  # 1935-1939
+    0x0d4a0, 0x1d8a6, 0x0b550, 0x056a0, 0x1a5b4,  # 1940-1944
+    0x025d0, 0x092d0, 0x0d2b2, 0x0a950, 0x0b557,  # 1945-1949
+    0x06ca0, 0x0b550, 0x15355, 0x04da0, 0x0a5d0,  # 1950-1954
+    0x14573, 0x052b0, 0x0a9a8, 0x0e950, 0x06aa0,  # 1955-1959
+    0x0aea6, 0x0ab50, 0x04b60, 0x0aae4, 0x0a570,  # 1960-1964
+    0x05260, 0x0f263, 0x0d950, 0x05b57, 0x056a0,  # 1965-1969
+    0x096d0, 0x04dd5, 0x04ad0, 0x0a4d0, 0x0d4d4,  # 1970-1974
+    0x0d250, 0x0d558, 0x0b540, 0x0b5a0, 0x195a6,  # 1975-1979
+    0x095b0, 0x049b0, 0x0a974, 0x0a4b0, 0x0b27a,  # 1980-1984
+    0x06a50, 0x06d40, 0x0af46, 0x0ab60, 0x09570,  # 1985-1989
+    0x04af5, 0x04970, 0x064b0, 0x074a3, 0x0ea50,  # 1990-1994
+    0x06b58, 0x05ac0, 0x0ab60, 0x096d5, 0x092e0,  # 1995-1999
+    0x0c960, 0x0d954, 0x0d4a0, 0x0da50, 0x07552,  # 2000-2004
+    0x056a0, 0x0abb7, 0x025d0, 0x092d0, 0x0cab5,  # 2005-2009
+    0x0a950, 0x0b4a0, 0x0baa4, 0x0ad50, 0x055d9,  # 2010-2014
+    0x04ba0, 0x0a5b0, 0x15176, 0x052b0, 0x0a930,  # 2015-2019
+    0x07954, 0x06aa0, 0x0ad50, 0x05b52, 0x04b60,  # 2020-2024
+    0x0a6e6, 0x0a4e0, 0x0d260, 0x0ea65, 0x0d530,  # 2025-2029
+    0x05aa0, 0x076a3, 0x096d0, 0x04afb, 0x04ad0,  # 2030-2034
+    0x0a4d0, 0x1d0b6, 0x0d250, 0x0d520, 0x0dd45,  # 2035-2039
+    0x0b5a0, 0x056d0, 0x055b2, 0x049b0, 0x0a577,  # 2040-2044
+    0x0a4b0, 0x0aa50, 0x1b255, 0x06d20, 0x0ada0,  # 2045-2049
+    0x14b63, 0x09370, 0x049f8, 0x04970, 0x064b0,  # 2050-2054
+    0x168a6, 0x0ea50, 0x06aa0, 0x1a6c4, 0x0aae0,  # 2055-2059
+    0x092e0, 0x0d2e3, 0x0c960, 0x0d557, 0x0d4a0,  # 2060-2064
+    0x0da50, 0x05d55, 0x056a0, 0x0a6d0, 0x055d4,  # 2065-2069
+    0x052d0, 0x0a9b8, 0x0a950, 0x0b4a0, 0x0b6a6,  # 2070-2074
+    0x0ad50, 0x055a0, 0x0aba4, 0x0a5b0, 0x052b0,  # 2075-2079
+    0x0b273, 0x06930, 0x07337, 0x06aa0, 0x0ad50,  # 2080-2084
+    0x14b55, 0x04b60, 0x0a570, 0x054e4, 0x0d160,  # 2085-2089
+    0x0e968, 0x0d520, 0x0daa0, 0x16aa6, 0x056d0,  # 2090-2094
+    0x04ae0, 0x0a9d4, 0x0a2d0, 0x0d150, 0x0f252,  # 2095-2099
+])
+
+FIRST_YEAR = 1900
+LAST_YEAR = FIRST_YEAR + len(YEAR_INFOS) - 1
+
+# Lunar 01/01/1900 fell on solar 31/01/1900
+_START_ORDINAL = date(1900, 1, 31).toordinal()
+
+
+def _build_tables():
+    """
+    Expand YEAR_INFOS into flat per-month arrays
+
+    Returns:
+        (month_starts, month_keys, year_first_month)
+        month_starts: ordinal of day 1 for every lunar month, plus an end sentinel
+        month_keys: packed (year offset << 5 | month << 1 | leap) per month
+        year_first_month: index into month_starts of each year's first month
+    """
+    month_starts = array("l")
+    month_keys = array("H")
+    year_first_month = array("H")
+    ordinal = _START_ORDINAL
+
+    for year_offset, info in enumerate(YEAR_INFOS):
+        year_first_month.append(len(month_keys))
+        leap_month = info & 0xF
+
+        for month in range(1, 13):
+            month_starts.append(ordinal)
+            month_keys.append((year_offset << 5) | (month << 1))
+            ordinal += 30 if (info >> (16 - month)) & 1 else 29
+
+            if month == leap_month:
+                month_starts.append(ordinal)
+                month_keys.append((year_offset << 5) | (month << 1) | 1)
+                ordinal += 30 if (info >> 16) & 1 else 29
+
+    year_first_month.append(len(month_keys))
+    month_starts.append(ordinal)
+    return month_starts, month_keys, year_first_month
+
+
+MONTH_STARTS, MONTH_KEYS, YEAR_FIRST_MONTH = _build_tables()
+
+FIRST_ORDINAL = MONTH_STARTS[0]
+END_ORDINAL = MONTH_STARTS[-1]  # exclusive
+
+
+def solar_ordinal_to_lunar(ordinal: int) -> tuple:
+    """
+    Convert a proleptic Gregorian ordinal to a lunar date
+
+    Args:
+        ordinal: Value of date.toordinal()
+
+    Returns:
+        (lunar_year, lunar_month, lunar_day, is_leap_month)
+
+    Raises:
+        ValueError: If the date is outside the table
+    """
+    if not FIRST_ORDINAL <= ordinal < END_ORDINAL:
+        raise ValueError(
+            f"Date out of range [{date.fromordinal(FIRST_ORDINAL)}, "
+            f"{date.fromordinal(END_ORDINAL)})"
+        )
+
+    index = bisect_right(MONTH_STARTS, ordinal) - 1
+    key = MONTH_KEYS[index]
+    return (
+        FIRST_YEAR + (key >> 5),
+        (key >> 1) & 0xF,
+        ordinal - MONTH_STARTS[index] + 1,
+        bool(key & 1)
+    )
+
+
+def lunar_to_solar_ordinal(
+    lunar_year: int,
+    lunar_month: int,
+    lunar_day: int,
+    is_leap_month: bool = False
+) -> int:
+    """
+    Convert a lunar date to a proleptic Gregorian ordinal
+
+    Args:
+        lunar_year: Lunar year (1900-2099)
+        lunar_month: Lunar month (1-12)
+        lunar_day: Lunar day (1-30)
+        is_leap_month: True for the leap (nhuận) month
+
+    Returns:
+        Ordinal usable with date.fromordinal()
+
+    Raises:
+        ValueError: If the lunar date does not exist
+    """
+    if not FIRST_YEAR <= lunar_year <= LAST_YEAR:
+        raise ValueError(f"Lunar year out of range [{FIRST_YEAR}, {LAST_YEAR}]")
+
+    key = ((lunar_year - FIRST_YEAR) << 5) | (lunar_month << 1) | int(bool(is_leap_month))
+    year_offset = lunar_year - FIRST_YEAR
+
+    # At most 13 months per year, so a linear scan is constant time
+    for index in range(YEAR_FIRST_MONTH[year_offset], YEAR_FIRST_MONTH[year_offset + 1]):
+        if MONTH_KEYS[index] == key:
+            if not 1 <= lunar_day <= MONTH_STARTS[index + 1] - MONTH_STARTS[index]:
+                raise ValueError("Lunar day out of range")
+            return MONTH_STARTS[index] + lunar_day - 1
+
+    raise ValueError("Lunar month out of range")
@@ -0,0 +1,260 @@
+"""
+In-process metrics in the Prometheus text exposition format
+Cheap enough for the hot path: a metric is a few plain attributes updated
+without locks (an increment can rarely be lost between threads, which is
+acceptable for monitoring), and label lookups are done once by the caller,
+which keeps the bound child around.
+
+Usage:
+    COMMANDS = REGISTRY.counter("bot_commands_total", "Commands handled", ["command"])
+    DUBAO = COMMANDS.labels("dubao")   # once, at import / setup time
+    DUBAO.inc()                        # per call
+"""
+
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Latency buckets (seconds): sub-millisecond agent stages up to slow Bot API calls
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Counter:
+    """Monotonic counter"""
+    
+    __slots__ = ("value",)
+    
+    def __init__(self):
+        self.value = 0
+    
+    def inc(self, amount: float = 1):
+        """Add amount (default 1)"""
+        self.value += amount
+
+
+class Gauge:
+    """Value that can go up and down"""
+    
+    __slots__ = ("value",)
+    
+    def __init__(self):
+        self.value = 0
+    
+    def set(self, value: float):
+        """Set the current value"""
+        self.value = value
+    
+    def inc(self, amount: float = 1):
+        """Add amount (default 1)"""
+        self.value += amount
+
+
+class Histogram:
+    """Bucketed distribution of observed values"""
+    
+    __slots__ = ("buckets", "counts", "sum")
+    
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # One slot per bucket plus +Inf; cumulated when rendered
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+    
+    def observe(self, value: float):
+        """Record one value"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+    
+    @property
+    def count(self) -> int:
+        """Number of observed values"""
+        return sum(self.counts)
+    
+    def quantile(self, q: float) -> float:
+        """
+        Approximate quantile (upper bound of the bucket it falls in)
+        
+        Args:
+            q: Quantile in [0, 1]
+        
+        Returns:
+            Bucket upper bound (inf past the last bucket, 0.0 when empty)
+        """
+        total = self.count
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+_KINDS = {"counter": Counter, "gauge": Gauge, "histogram": Histogram}
+
+
+class MetricFamily:
+    """A named metric and its children, one per label value combination"""
+    
+    def __init__(self, name: str, help_text: str, kind: str, labelnames: Sequence[str] = (), buckets=None):
+        """
+        Initialize the family
+        
+        Args:
+            name: Metric name
+            help_text: HELP line
+            kind: "counter", "gauge" or "histogram"
+            labelnames: Label names, in order
+            buckets: Histogram bucket upper bounds (default DEFAULT_BUCKETS)
+        """
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets or DEFAULT_BUCKETS)
+        self._children: Dict[tuple, object] = {}
+    
+    def labels(self, *values):
+        """
+        Child metric for label values (created on first use; keep it, do not call per event)
+        
+        Args:
+            *values: One value per label name
+        
+        Returns:
+            Counter, Gauge or Histogram
+        
+        Raises:
+            ValueError: If the number of values does not match the label names
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            values = tuple(str(value) for value in values)
+            child = self._children.get(values)
+            if child is None:
+                child = Histogram(self.buckets) if self.kind == "histogram" else _KINDS[self.kind]()
+                self._children[values] = child
+        return child
+    
+    def children(self) -> List[Tuple[tuple, object]]:
+        """(label values, metric) pairs"""
+        return list(self._children.items())
+
+
+# A collector returns (name, kind, help, labelnames, [(label values, value), ...]) entries,
+# computed at scrape time (for stats that already live elsewhere, e.g. cache counters)
+Collector = Callable[[], Iterable[Tuple[str, str, str, Sequence[str], List[Tuple[tuple, float]]]]]
+
+
+class MetricsRegistry:
+    """Metric families and scrape-time collectors"""
+    
+    def __init__(self):
+        """Initialize an empty registry"""
+        self._families: Dict[str, MetricFamily] = {}
+        self._collectors: Dict[str, Collector] = {}
+    
+    def _family(self, name: str, help_text: str, kind: str, labelnames, buckets=None) -> MetricFamily:
+        """Get or create a family (the same name always returns the same family)"""
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = MetricFamily(name, help_text, kind, labelnames, buckets)
+        elif family.kind != kind:
+            raise ValueError(f"Metric {name} already registered as a {family.kind}")
+        return family
+    
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        """Get or create a counter family"""
+        return self._family(name, help_text, "counter", labelnames)
+    
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> MetricFamily:
+        """Get or create a gauge family"""
+        return self._family(name, help_text, "gauge", labelnames)
+    
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets=None) -> MetricFamily:
+        """Get or create a histogram family"""
+        return self._family(name, help_text, "histogram", labelnames, buckets)
+    
+    def register_collector(self, key: str, collector: Collector):
+        """
+        Add (or replace) a scrape-time collector
+        
+        Args:
+            key: Collector name (registering the same key again replaces it)
+            collector: Function returning metric entries, see Collector
+        """
+        self._collectors[key] = collector
+    
+    def render(self) -> str:
+        """
+        All metrics in the Prometheus text format
+        
+        Returns:
+            Exposition text
+        """
+        lines = []
+        for family in list(self._families.values()):
+            lines.append(f"# HELP {family.name} {family.help_text}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, metric in family.children():
+                if family.kind == "histogram":
+                    _render_histogram(lines, family.name, family.labelnames, values, metric)
+                else:
+                    labels = _format_labels(family.labelnames, values)
+                    lines.append(f"{family.name}{labels} {_format_value(metric.value)}")
+        
+        for collector in list(self._collectors.values()):
+            for name, kind, help_text, labelnames, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for values, value in samples:
+                    lines.append(f"{name}{_format_labels(labelnames, values)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    """Escape a label value"""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence) -> str:
+    """{name="value",...} or "" without labels"""
+    if not labelnames:
+        return ""
+    pairs = ",".join(f'{name}="{_escape_label(value)}"' for name, value in zip(labelnames, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    """Sample value (integers without a decimal point)"""
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+def _render_histogram(lines: List[str], name: str, labelnames, values, histogram: Histogram):
+    """Append the _bucket, _sum and _count lines of one histogram"""
+    counts = list(histogram.counts)  # snapshot: writers do not lock
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + (float("inf"),), counts):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else repr(float(bound))
+        labels = _format_labels(tuple(labelnames) + ("le",), tuple(values) + (le,))
+        lines.append(f"{name}_bucket{labels} {cumulative}")
+    labels = _format_labels(labelnames, values)
+    lines.append(f"{name}_sum{labels} {_format_value(histogram.sum)}")
+    lines.append(f"{name}_count{labels} {cumulative}")
+
+
+# Process-wide registry (agent stages observed in "process" executor workers stay in those workers)
+REGISTRY = MetricsRegistry()
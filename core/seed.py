@@ -0,0 +1,47 @@
+"""
+Deterministic seeds so the same forecast is produced every time
+Uses CRC32 instead of hash(), which is randomized per process
+"""
+
+import zlib
+
+# Knuth's multiplicative hashing constant (2^32 / golden ratio)
+_GOLDEN = 0x9E3779B1
+
+# CRC32 of each salt string, computed on first use
+_SALT_SEEDS = {}
+
+
+def stable_seed(*parts) -> int:
+    """
+    Build a seed that is stable across runs and processes
+    
+    Args:
+        *parts: Values identifying the forecast (date, profile fields...)
+        
+    Returns:
+        Unsigned 32-bit seed
+    """
+    key = "|".join(str(part) for part in parts)
+    return zlib.crc32(key.encode("utf-8"))
+
+
+def seeded_choice(seed: int, salt: str, options: list):
+    """
+    Pick an option deterministically from a seed
+    
+    Args:
+        seed: Value from stable_seed()
+        salt: Distinguishes independent choices made from the same seed
+        options: Non-empty list to choose from
+        
+    Returns:
+        One element of options
+    """
+    salt_seed = _SALT_SEEDS.get(salt)
+    if salt_seed is None:
+        salt_seed = _SALT_SEEDS[salt] = stable_seed(salt)
+    
+    # Mix seed and salt, then use the well-distributed high bits
+    mixed = ((seed ^ salt_seed) * _GOLDEN) & 0xFFFFFFFF
+    return options[(mixed >> 16) % len(options)]
@@ -0,0 +1,368 @@
+"""
+Lightweight tracing spans and sampled profiling of the agent chain
+
+Spans record a monotonic duration plus attributes and nest through a
+contextvar (commands -> run_agent_chain -> agent stages, Bot API calls).
+Finished spans are appended to a JSON-lines trace file in batches. With no
+trace file configured, span() returns a shared no-op and costs one check.
+
+The chain profiler runs a sampled fraction of chain jobs under cProfile and
+aggregates their stats, dumped every PROFILE_DUMP_EVERY profiled jobs.
+
+Both are configured from settings (TRACE_FILE, PROFILE_SAMPLE_RATE, ...) and
+can be switched at runtime with configure() (see /debug/tracing).
+
+Usage:
+    python -m core.tracing summary TRACE.jsonl
+    python -m core.tracing stats PROFILE.prof [lines]
+"""
+
+import atexit
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from itertools import count
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Buffered spans are written once this many are pending or this old
+FLUSH_SPANS = 256
+FLUSH_SECONDS = 5.0
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_span_ids = count(1)
+
+
+class Span:
+    """One timed operation"""
+    
+    __slots__ = (
+        "tracer", "name", "trace_id", "span_id", "parent_id",
+        "start_time", "start_ns", "duration_ns", "attributes", "error", "_token"
+    )
+    
+    def __init__(self, tracer: "Tracer", name: str, attributes: dict):
+        parent = _current_span.get()
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(8).hex()
+        self.span_id = next(_span_ids)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.error = None
+        self.start_time = 0.0
+        self.start_ns = 0
+        self.duration_ns = 0
+        self._token = None
+    
+    def set_attribute(self, key: str, value):
+        """Add or replace an attribute"""
+        self.attributes[key] = value
+    
+    def __enter__(self) -> "Span":
+        self.start_time = time.time()
+        self._token = _current_span.set(self)
+        self.start_ns = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        self.duration_ns = time.perf_counter_ns() - self.start_ns
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        self.tracer.finish(self)
+        return False
+    
+    def to_dict(self) -> dict:
+        """JSON-serializable record"""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start_time, 6),
+            "duration_ms": round(self.duration_ns / 1e6, 4),
+            "attributes": self.attributes,
+            "error": self.error,
+            "pid": os.getpid()
+        }
+
+
+class _NoopSpan:
+    """Returned by span() while tracing is off"""
+    
+    __slots__ = ()
+    
+    def set_attribute(self, key: str, value):
+        pass
+    
+    def __enter__(self) -> "_NoopSpan":
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Creates spans and writes finished ones to a JSON-lines file"""
+    
+    def __init__(self):
+        """Initialize a disabled tracer"""
+        self.path = ""
+        self.enabled = False
+        self.spans_written = 0
+        self._pending: List[Span] = []
+        self._last_flush = time.monotonic()
+        # Spans are finished on the loop and on executor threads (reentrant: finish may flush)
+        self._lock = threading.RLock()
+    
+    def configure(self, path: str):
+        """
+        Enable tracing to a file, or disable it
+        
+        Args:
+            path: JSON-lines output file ("" disables tracing)
+        """
+        self.flush()
+        self.path = path or ""
+        if self.path:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.enabled = bool(self.path)
+        logger.info(f"Tracing {'to ' + self.path if self.enabled else 'disabled'}")
+    
+    def span(self, name: str, **attributes):
+        """
+        Context manager timing a block
+        
+        Args:
+            name: Span name (e.g. "agent1", "telegram.send_message")
+            **attributes: Span attributes (JSON-serializable)
+        
+        Returns:
+            Span, or a no-op while tracing is disabled
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attributes)
+    
+    def record(self, name: str, start: float, end: float, **attributes):
+        """
+        Record an already timed block as a child of the current span
+        
+        Args:
+            name: Span name
+            start: time.perf_counter() at the start
+            end: time.perf_counter() at the end
+            **attributes: Span attributes
+        """
+        if not self.enabled:
+            return
+        span = Span(self, name, attributes)
+        span.start_time = time.time() - (time.perf_counter() - start)
+        span.duration_ns = int((end - start) * 1e9)
+        self.finish(span)
+    
+    def current(self) -> Optional[Span]:
+        """Innermost open span in this context"""
+        return _current_span.get()
+    
+    def finish(self, span: Span):
+        """Queue a finished span, writing the batch when it is big or old enough"""
+        with self._lock:
+            self._pending.append(span)
+            if len(self._pending) >= FLUSH_SPANS or time.monotonic() - self._last_flush >= FLUSH_SECONDS:
+                self.flush()
+    
+    def flush(self):
+        """Write pending spans to the trace file"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+            if not pending or not self.path:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    for span in pending:
+                        f.write(json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n")
+                self.spans_written += len(pending)
+            except OSError as e:
+                logger.error(f"Could not write trace file {self.path}: {e}")
+    
+    def status(self) -> dict:
+        """Current configuration and counters"""
+        return {
+            "enabled": self.enabled,
+            "path": self.path,
+            "spans_written": self.spans_written,
+            "spans_pending": len(self._pending)
+        }
+
+
+class ChainProfiler:
+    """Runs a sampled fraction of jobs under cProfile and aggregates the stats"""
+    
+    def __init__(self):
+        """Initialize a disabled profiler"""
+        self.rate = 0.0
+        self.output = ""
+        self.dump_every = 20
+        self.profiled = 0
+        self._stats = None
+        self._stats_lock = threading.Lock()
+        # cProfile profiles one job at a time; concurrent jobs run unprofiled
+        self._busy = threading.Lock()
+    
+    def configure(self, rate: float, output: str = None, dump_every: int = None):
+        """
+        Set the sampling rate (and optionally where and how often stats are dumped)
+        
+        Args:
+            rate: Fraction of jobs to profile, 0 disables
+            output: Stats path prefix; files are "<output>-<pid>.prof"
+            dump_every: Dump the aggregate after this many profiled jobs
+        """
+        previous = self.rate
+        self.rate = min(max(rate, 0.0), 1.0)
+        if output is not None:
+            self.output = output
+        if dump_every is not None:
+            self.dump_every = max(1, dump_every)
+        if self.rate or previous:
+            logger.info(f"Chain profiling {'at ' + format(self.rate, '.2%') if self.rate else 'disabled'}")
+    
+    def run(self, func: Callable, *args):
+        """
+        Call func(*args), under cProfile for a sampled fraction of calls
+        
+        Returns:
+            Whatever func returns
+        """
+        if not self.rate or random.random() >= self.rate or not self._busy.acquire(blocking=False):
+            return func(*args)
+        
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args)
+        finally:
+            self._busy.release()
+            self._add(profiler)
+    
+    def _add(self, profiler):
+        """Merge one job's stats into the aggregate"""
+        import pstats
+        with self._stats_lock:
+            profiler.create_stats()
+            if self._stats is None:
+                self._stats = pstats.Stats(profiler)
+            else:
+                self._stats.add(profiler)
+            self.profiled += 1
+            dump = self.profiled % self.dump_every == 0
+        if dump:
+            self.dump()
+    
+    def path(self) -> str:
+        """Stats file for this process"""
+        return f"{self.output}-{os.getpid()}.prof"
+    
+    def dump(self) -> Optional[str]:
+        """
+        Write the aggregated stats (pstats format)
+        
+        Returns:
+            File path, or None if nothing was profiled yet
+        """
+        with self._stats_lock:
+            if self._stats is None or not self.output:
+                return None
+            path = self.path()
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._stats.dump_stats(path)
+        logger.info(f"Chain profile ({self.profiled} jobs) written to {path}")
+        return path
+    
+    def status(self) -> dict:
+        """Current configuration and counters"""
+        return {
+            "rate": self.rate,
+            "profiled": self.profiled,
+            "dump_every": self.dump_every,
+            "path": self.path() if self.output else ""
+        }
+
+
+TRACER = Tracer()
+PROFILER = ChainProfiler()
+
+
+def span(name: str, **attributes):
+    """TRACER.span() shortcut"""
+    if not TRACER.enabled:
+        return NOOP_SPAN
+    return Span(TRACER, name, attributes)
+
+
+def configure_from_settings():
+    """Apply TRACE_FILE and PROFILE_* settings (also run in process-pool workers on import)"""
+    from config.settings import settings
+    if settings.TRACE_FILE:
+        TRACER.configure(settings.TRACE_FILE)
+    PROFILER.configure(settings.PROFILE_SAMPLE_RATE, settings.PROFILE_OUTPUT, settings.PROFILE_DUMP_EVERY)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main():
+    """CLI: summary TRACE.jsonl | stats PROFILE.prof [lines]"""
+    args = sys.argv[1:]
+    if len(args) < 2 or args[0] not in ("summary", "stats"):
+        print("Usage: python -m core.tracing summary TRACE.jsonl | stats PROFILE.prof [lines]")
+        sys.exit(1)
+    
+    if args[0] == "stats":
+        import pstats
+        stats = pstats.Stats(args[1])
+        stats.sort_stats("cumulative").print_stats(int(args[2]) if len(args) > 2 else 30)
+        return
+    
+    durations = {}
+    errors = {}
+    with open(args[1], encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            durations.setdefault(record["name"], []).append(record["duration_ms"])
+            if record.get("error"):
+                errors[record["name"]] = errors.get(record["name"], 0) + 1
+    
+    print(f"{'span':<32} {'count':>8} {'errors':>7} {'p50 ms':>10} {'p99 ms':>10} {'total ms':>12}")
+    for name, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+        values.sort()
+        print(
+            f"{name:<32} {len(values):>8} {errors.get(name, 0):>7} {_percentile(values, 0.5):>10.3f} "
+            f"{_percentile(values, 0.99):>10.3f} {sum(values):>12.1f}"
+        )
+
+
+configure_from_settings()
+atexit.register(TRACER.flush)
+atexit.register(PROFILER.dump)
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,23 @@
 """
 Main entry point for Thiên Cơ Đại Tướng Quân
 Starts the Telegram bot, scheduler, and health check server
+
+The health check server is bound first; telegram, apscheduler and the agents
+are imported afterwards off the event loop, so /health answers right away on
+a cold start (e.g. a Render free-tier wake).
 """
 
 import asyncio
+import hmac
 import logging
 import signal
+import time
 from aiohttp import web
 
 from config.settings import settings
-from bot.telegram_bot import TelegramBot
+from bot.loop_monitor import LoopMonitor
+from core.metrics import CONTENT_TYPE, REGISTRY
+from core.tracing import PROFILER, TRACER
 
 # Configure logging
 logging.basicConfig(
@@ -19,25 +27,188 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def load_services():
+    """
+    Import the bot and API modules (the slow part of startup)
+    
+    Returns:
+        (TelegramBot, ForecastAPI) classes
+    """
+    from bot.telegram_bot import TelegramBot
+    from bot.api import ForecastAPI
+    return TelegramBot, ForecastAPI
+
+
+def check_debug_token(request):
+    """
+    Guard for /debug/* endpoints: off unless DEBUG_TOKEN is set
+    
+    Args:
+        request: aiohttp request (token in X-Debug-Token or ?token=)
+    
+    Raises:
+        web.HTTPNotFound: If DEBUG_TOKEN is not configured
+        web.HTTPForbidden: If the token is missing or wrong
+    """
+    if not settings.DEBUG_TOKEN:
+        raise web.HTTPNotFound()
+    token = request.headers.get("X-Debug-Token") or request.query.get("token", "")
+    if not hmac.compare_digest(token.encode(), settings.DEBUG_TOKEN.encode()):
+        raise web.HTTPForbidden()
+
+
+class DeferredRoutes:
+    """Routes added after the server is up (aiohttp freezes app.router on start)"""
+    
+    def __init__(self):
+        """Initialize the route table"""
+        self._handlers = {}
+    
+    def add_get(self, path: str, handler):
+        """Route GET (and HEAD) requests for path to handler"""
+        self._handlers[("GET", path)] = handler
+    
+    def add_post(self, path: str, handler):
+        """Route POST requests for path to handler"""
+        self._handlers[("POST", path)] = handler
+    
+    def resolve(self, method: str, path: str):
+        """Handler for a request, or None"""
+        if method == "HEAD":
+            method = "GET"
+        return self._handlers.get((method, path))
+
+
 class HealthCheckServer:
     """Simple HTTP server for health checks (required for Render.com)"""
     
-    def __init__(self, port: int):
+    def __init__(self, port: int, loop_monitor: LoopMonitor = None):
         """Initialize health check server"""
         self.port = port
+        self.loop_monitor = loop_monitor
         self.app = web.Application()
         self.app.router.add_get('/health', self.health_check)
         self.app.router.add_get('/', self.root)
+        self.app.router.add_get('/metrics', self.metrics)
+        self.app.router.add_get('/debug/tracing', self.debug_tracing)
+        self.app.router.add_get('/debug/profile', self.debug_profile)
+        self.app.router.add_get('/debug/loop', self.debug_loop)
+        
+        # Webhook and /api/* are mounted here once the bot has loaded
+        self.routes = DeferredRoutes()
+        self.app.router.add_route('*', '/{tail:.*}', self.dispatch)
+        
         self.runner = None
+        self._profiling = False
+        self.ready = False
+        self.started_at = time.monotonic()
+        self.startup_seconds = None
+    
+    def mark_ready(self):
+        """Record that every service is up"""
+        self.ready = True
+        self.startup_seconds = round(time.monotonic() - self.started_at, 3)
     
     async def health_check(self, request):
-        """Health check endpoint"""
+        """Health check endpoint (200 while starting, so the platform does not restart us)"""
         return web.json_response({
-            "status": "healthy",
+            "status": "healthy" if self.ready else "starting",
             "service": "Thiên Cơ Đại Tướng Quân",
-            "version": "1.0.0"
+            "version": "1.0.0",
+            "startup_seconds": self.startup_seconds,
+            "event_loop": self.loop_monitor.summary() if self.loop_monitor else None
+        })
+    
+    async def metrics(self, request):
+        """Prometheus metrics endpoint"""
+        return web.Response(body=REGISTRY.render().encode("utf-8"), headers={"Content-Type": CONTENT_TYPE})
+    
+    async def debug_tracing(self, request):
+        """
+        GET /debug/tracing[?trace=PATH|off][&profile_rate=0.05][&dump=1]
+        Show or switch tracing and chain profiling without a redeploy
+        """
+        check_debug_token(request)
+        query = request.query
+        try:
+            if "trace" in query:
+                TRACER.configure("" if query["trace"] in ("", "0", "off") else query["trace"])
+            if "profile_rate" in query:
+                PROFILER.configure(float(query["profile_rate"]))
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        
+        dumped = PROFILER.dump() if query.get("dump") == "1" else None
+        TRACER.flush()
+        return web.json_response({
+            "tracing": TRACER.status(),
+            "profiling": PROFILER.status(),
+            "dumped": dumped
+        })
+    
+    async def debug_profile(self, request):
+        """
+        GET /debug/profile?seconds=N[&rate=HZ][&thread=NAME][&idle=0]
+        Sample every thread's stack for N seconds; returns folded stacks for flamegraph tools
+        """
+        check_debug_token(request)
+        from core.sampling import SamplingProfiler
+        
+        try:
+            seconds = float(request.query.get("seconds", 10))
+            rate = float(request.query.get("rate", settings.PROFILE_SAMPLE_HZ))
+        except ValueError:
+            return web.json_response({"error": "seconds and rate must be numbers"}, status=400)
+        if not 0 < seconds <= settings.PROFILE_MAX_SECONDS or not 0 < rate <= 1000:
+            return web.json_response(
+                {"error": f"seconds must be in (0, {settings.PROFILE_MAX_SECONDS}], rate in (0, 1000]"},
+                status=400
+            )
+        if self._profiling:
+            return web.json_response({"error": "a profile is already running"}, status=409)
+        
+        profiler = SamplingProfiler(
+            rate_hz=rate,
+            thread_filter=request.query.get("thread") or None,
+            include_idle=request.query.get("idle") != "0"
+        )
+        self._profiling = True
+        try:
+            # The sampler runs in its own thread; the loop (MainThread) stays free and gets sampled
+            await asyncio.to_thread(profiler.run, seconds)
+        finally:
+            self._profiling = False
+        
+        logger.info(f"Sampled {profiler.samples} stacks over {seconds}s (overhead {profiler.overhead():.1%})")
+        return web.Response(
+            text=profiler.folded(),
+            headers={
+                "X-Profile-Samples": str(profiler.samples),
+                "X-Profile-Overhead": f"{profiler.overhead():.4f}"
+            }
+        )
+    
+    async def debug_loop(self, request):
+        """GET /debug/loop: lag figures and recent slow callbacks with their stacks"""
+        check_debug_token(request)
+        if self.loop_monitor is None:
+            raise web.HTTPNotFound()
+        return web.json_response({
+            **self.loop_monitor.summary(),
+            "slow_callbacks_recent": list(self.loop_monitor.slow_callbacks)
         })
     
+    async def dispatch(self, request):
+        """Deferred routes; 503 while the bot is still loading (Telegram retries webhooks)"""
+        handler = self.routes.resolve(request.method, request.path)
+        if handler is not None:
+            return await handler(request)
+        if not self.ready:
+            return web.json_response(
+                {"error": "starting"}, status=503, headers={"Retry-After": "5"}
+            )
+        raise web.HTTPNotFound()
+    
     async def root(self, request):
         """Root endpoint"""
         return web.Response(text="🔮 Thiên Cơ Đại Tướng Quân is running!")
@@ -64,6 +235,7 @@ class Application:
         """Initialize the application"""
         self.telegram_bot = None
         self.health_server = None
+        self.loop_monitor = None
         self.running = False
     
     async def start(self):
@@ -73,24 +245,41 @@ class Application:
             settings.validate()
             logger.info("Configuration validated successfully")
             
-            # Start health check server
-            self.health_server = HealthCheckServer(settings.PORT)
+            # Watch the event loop from the start (startup blocking shows up too)
+            self.loop_monitor = LoopMonitor(
+                interval=settings.LOOP_LAG_INTERVAL_MS / 1000,
+                slow_threshold=settings.LOOP_SLOW_CALLBACK_MS / 1000,
+                window=settings.LOOP_LAG_WINDOW
+            )
+            self.loop_monitor.start()
+            
+            # Start health check server first: it only needs aiohttp
+            self.health_server = HealthCheckServer(settings.PORT, self.loop_monitor)
             await self.health_server.start()
             
+            # Heavy imports run in a thread so /health keeps answering meanwhile
+            TelegramBot, ForecastAPI = await asyncio.to_thread(load_services)
+            
+            # Create Telegram bot and mount its routes on the running server
+            self.telegram_bot = TelegramBot()
+            if self.telegram_bot.use_webhook:
+                self.telegram_bot.register_webhook_route(self.health_server.routes)
+            ForecastAPI(self.telegram_bot).register_routes(self.health_server.routes)
+            
             # Start Telegram bot
             logger.info("Starting Telegram bot...")
-            self.telegram_bot = TelegramBot()
             await self.telegram_bot.start()
             
             self.running = True
-            logger.info("✅ All services started successfully!")
+            self.health_server.mark_ready()
+            logger.info(f"✅ All services started successfully in {self.health_server.startup_seconds}s!")
             logger.info(f"📅 Daily forecasts will be sent at {settings.SCHEDULE_HOUR}:00 {settings.TIMEZONE}")
             logger.info("🤖 Bot is ready to receive commands")
             
             # Keep running
             while self.running:
                 await asyncio.sleep(1)
-                
+        
         except Exception as e:
             logger.error(f"Error starting application: {e}", exc_info=True)
             await self.stop()
@@ -107,6 +296,12 @@ class Application:
         if self.health_server:
             await self.health_server.stop()
         
+        if self.loop_monitor:
+            await self.loop_monitor.stop()
+        
+        TRACER.flush()
+        PROFILER.dump()
+        
         logger.info("✅ Shutdown complete")
     
     def handle_signal(self, sig):
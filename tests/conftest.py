@@ -0,0 +1,55 @@
+"""Shared pytest setup: repo root on sys.path and a throwaway environment"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Settings are read at import time, so the environment is set before any repo import
+_TMP = tempfile.mkdtemp(prefix="forecast-tests-")
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "1:test")
+os.environ.setdefault("TELEGRAM_CHAT_ID", "1")
+os.environ["FORECAST_DB_FILE"] = os.path.join(_TMP, "forecasts.db")
+os.environ["SUBSCRIBERS_FILE"] = os.path.join(_TMP, "subscribers.json")
+os.environ["ALMANAC_FILE"] = os.path.join(_TMP, "almanac.bin")
+os.environ["TRACE_FILE"] = ""
+os.environ["PROFILE_SAMPLE_RATE"] = "0"
+os.environ["AGENT_EXECUTOR"] = "inline"
+
+
+class FakeTelegramBot:
+    """Stands in for bot.telegram_bot.TelegramBot: records messages, delivers them at once"""
+    
+    def __init__(self, deliver: bool = True):
+        self.deliver = deliver
+        self.sent = []
+    
+    async def send_message_to_user(self, message: str, chat_id: str = None) -> asyncio.Future:
+        self.sent.append((chat_id, message))
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(self.deliver)
+        return future
+
+
+@pytest.fixture
+def fake_bot():
+    return FakeTelegramBot()
+
+
+@pytest.fixture
+def scheduler(tmp_path, monkeypatch, fake_bot):
+    """ForecastScheduler (not started) with its own store and no subscribers file"""
+    from config.settings import settings
+    from bot.scheduler import ForecastScheduler
+    
+    monkeypatch.setattr(settings, "FORECAST_DB_FILE", str(tmp_path / "forecasts.db"))
+    monkeypatch.setattr(settings, "PRECOMPUTE_DAYS", 3)
+    scheduler = ForecastScheduler(fake_bot)
+    yield scheduler
+    scheduler.executor.shutdown()
+    scheduler.store.close()
@@ -0,0 +1,10 @@
+"""Helpers shared by the test modules"""
+
+
+def strip_timestamps(value):
+    """Copy of an agent result without the per-call "timestamp" fields"""
+    if isinstance(value, dict):
+        return {key: strip_timestamps(item) for key, item in value.items() if key != "timestamp"}
+    if isinstance(value, list):
+        return [strip_timestamps(item) for item in value]
+    return value
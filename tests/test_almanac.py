@@ -0,0 +1,70 @@
+"""Binary almanac (core.almanac)"""
+
+from datetime import date, datetime
+
+import pytest
+
+from core.almanac import HEADER, RECORD, Almanac, build_almanac, encode_day, encode_days
+from core.can_chi import get_can_chi_day, get_truc_index
+from core.lunar_calendar import get_lunar_date
+from core.lunar_table import END_ORDINAL, FIRST_ORDINAL
+
+
+def test_encode_days_matches_encode_day():
+    expected = b"".join(encode_day(ordinal) for ordinal in range(FIRST_ORDINAL, END_ORDINAL))
+    assert encode_days(FIRST_ORDINAL, END_ORDINAL) == expected
+
+
+def test_encode_days_partial_range():
+    first = FIRST_ORDINAL + 4000
+    assert encode_days(first, first + 31) == b"".join(encode_day(ordinal) for ordinal in range(first, first + 31))
+    assert encode_days(first, first) == b""
+
+
+@pytest.fixture(scope="module")
+def almanac(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("almanac") / "almanac.bin")
+    assert build_almanac(path) == END_ORDINAL - FIRST_ORDINAL
+    almanac = Almanac(path)
+    yield almanac
+    almanac.close()
+
+
+def test_file_layout(almanac):
+    with open(almanac.path, "rb") as f:
+        assert len(f.read()) == HEADER.size + almanac.count * RECORD.size
+    assert almanac.first_ordinal == FIRST_ORDINAL and almanac.end_ordinal == END_ORDINAL
+
+
+def test_records_match_direct_calculation(almanac):
+    for ordinal in range(FIRST_ORDINAL, END_ORDINAL, 211):
+        day = datetime.fromordinal(ordinal)
+        lunar = get_lunar_date(day)
+        can_chi = get_can_chi_day(day)
+        record = almanac.lookup(day)
+        assert record[:4] == (lunar["lunar_year"], lunar["lunar_month"], lunar["lunar_day"], lunar["is_leap_month"])
+        assert record[4:7] == (
+            can_chi["can_index"], can_chi["chi_index"], get_truc_index(lunar["lunar_month"], can_chi["chi_index"])
+        )
+
+
+def test_numpy_view(almanac):
+    records = almanac.as_numpy()
+    index = date(2024, 2, 10).toordinal() - almanac.first_ordinal
+    assert (int(records["lunar_month"][index]), int(records["lunar_day"][index])) == (1, 1)  # Tết Giáp Thìn
+
+
+def test_outside_and_invalid_files(almanac, tmp_path):
+    assert date(1899, 1, 1) not in almanac
+    with pytest.raises(ValueError):
+        almanac.record(END_ORDINAL)
+    
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(b"nope" + bytes(64))
+    with pytest.raises(ValueError):
+        Almanac(str(bad))
+    
+    truncated = tmp_path / "truncated.bin"
+    truncated.write_bytes(open(almanac.path, "rb").read()[:1000])
+    with pytest.raises(ValueError):
+        Almanac(str(truncated))
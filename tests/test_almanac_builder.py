@@ -0,0 +1,112 @@
+"""Parallel offline almanac builder (agents.almanac_builder)"""
+
+import json
+import os
+from datetime import date, datetime
+
+import pytest
+
+from agents.almanac_builder import (
+    PROFILE_FLAG_HOANG_DAO, PROFILE_FLAG_HOP, PROFILE_FLAG_XUNG, PROFILE_VERSION,
+    ProfileAlmanac, build, build_chunk, year_chunks
+)
+from agents.pipeline import AgentPipeline
+from config.profiles import Profile
+from core.almanac import build_almanac
+from core.constants import ELEMENT_STATES
+from core.lunar_table import END_ORDINAL, FIRST_ORDINAL
+
+PROFILES = [
+    Profile.from_settings(),
+    Profile(chat_id="42", name="Lan", birth_day=3, birth_month=9, birth_year=1995),
+    # Same table as the one above: stored once
+    Profile(chat_id="43", name="Minh", birth_day=3, birth_month=9, birth_year=1995)
+]
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_year_chunks_are_clipped_to_the_lunar_table():
+    chunks = year_chunks(1890, 1915, 10)
+    # 1890-1899 is before the table and dropped
+    assert [(start, end) for start, end, _, _ in chunks] == [(1900, 1909), (1910, 1915)]
+    assert chunks[0][2] == FIRST_ORDINAL
+    assert chunks[1][2:] == (date(1910, 1, 1).toordinal(), date(1916, 1, 1).toordinal())
+    assert year_chunks(2095, 2200, 10)[-1][3] == END_ORDINAL
+    assert year_chunks(1800, 1850, 10) == []
+
+
+@pytest.mark.parametrize("first_year, last_year, first_ordinal, end_ordinal", [
+    (1890, 1925, FIRST_ORDINAL, date(1926, 1, 1).toordinal()),
+    (2080, 2100, date(2080, 1, 1).toordinal(), END_ORDINAL)
+])
+def test_almanac_mode_matches_build_almanac(tmp_path, first_year, last_year, first_ordinal, end_ordinal):
+    built = str(tmp_path / "built.bin")
+    reference = str(tmp_path / "reference.bin")
+    rows = build("almanac", first_year, last_year, built, workers=2, chunk_years=7, progress=lambda line: None)
+    
+    assert rows == build_almanac(reference, first_ordinal, end_ordinal)
+    assert _read(built) == _read(reference)
+    assert not os.path.exists(f"{built}.parts")
+
+
+def test_profiles_mode_matches_the_agent_chain(tmp_path):
+    path = str(tmp_path / "profiles.bin")
+    rows = build(
+        "profiles", 2024, 2025, path, profiles=PROFILES, workers=2, chunk_years=1, progress=lambda line: None
+    )
+    
+    start = datetime(2024, 1, 1)
+    days = (datetime(2026, 1, 1) - start).days
+    assert rows == days * 2
+    
+    tables = ProfileAlmanac(path)
+    assert tables.first_ordinal == start.toordinal() and tables.days == days
+    assert tables.table(Profile(chat_id="7", name="X", birth_day=1, birth_month=1, birth_year=1980)) is None
+    
+    for profile in PROFILES[:2]:
+        table = tables.table(profile)
+        pipeline = AgentPipeline(profile)
+        for offset in range(0, days, 17):
+            result = pipeline.run_full(datetime.fromordinal(start.toordinal() + offset))
+            meta = result["metaphysical"]
+            record = table[offset]
+            assert int(record["luck_score"]) == meta["luck_score"]
+            assert int(record["personal_day_number"]) == result["data"]["personal_day_number"]
+            assert ELEMENT_STATES[record["menh_state"]] == meta["menh_state"]
+            assert bool(record["flags"] & PROFILE_FLAG_XUNG) == meta["has_xung"]
+            assert bool(record["flags"] & PROFILE_FLAG_HOP) == meta["has_hop"]
+            assert bool(record["flags"] & PROFILE_FLAG_HOANG_DAO) == meta["is_hoang_dao"]
+
+
+def test_interrupted_build_resumes(tmp_path):
+    path = str(tmp_path / "almanac.bin")
+    chunks = year_chunks(2000, 2029, 10)
+    
+    # What an interrupted build leaves behind: the manifest and the first finished part
+    parts_dir = f"{path}.parts"
+    os.makedirs(parts_dir)
+    with open(os.path.join(parts_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"mode": "almanac", "chunks": chunks, "entries": [], "version": PROFILE_VERSION}, f)
+    start, end, first_ordinal, end_ordinal = chunks[0]
+    build_chunk("almanac", first_ordinal, end_ordinal, [], os.path.join(parts_dir, f"{start}-{end}.part"))
+    
+    lines = []
+    build("almanac", 2000, 2029, path, workers=2, chunk_years=10, progress=lines.append)
+    assert lines[0] == "Resuming: 1/3 chunks already built"
+    
+    reference = str(tmp_path / "reference.bin")
+    build_almanac(reference, chunks[0][2], chunks[-1][3])
+    assert _read(path) == _read(reference)
+
+
+def test_unknown_mode_and_empty_range(tmp_path):
+    with pytest.raises(ValueError):
+        build("calendar", 2000, 2001, str(tmp_path / "x.bin"))
+    with pytest.raises(ValueError):
+        build("almanac", 1800, 1850, str(tmp_path / "x.bin"))
+    with pytest.raises(ValueError):
+        build("profiles", 2000, 2001, str(tmp_path / "x.bin"), profiles=[])
@@ -0,0 +1,131 @@
+"""Read-only HTTP forecast API (bot.api.ForecastAPI)"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+import pytz
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+import bot.api
+from bot.api import ForecastAPI
+from config.profiles import Profile, SubscriberRegistry
+from config.settings import settings
+
+SUBSCRIBER = Profile(chat_id="42", name="Lan", birth_day=3, birth_month=9, birth_year=1995)
+
+
+@pytest.fixture
+def api(scheduler, monkeypatch):
+    monkeypatch.setattr(settings, "API_TOKEN", "t0ken")
+    scheduler.registry = SubscriberRegistry([SUBSCRIBER])
+    return ForecastAPI(SimpleNamespace(scheduler=scheduler))
+
+
+def _get(api, *requests):
+    """Run GET requests (path, headers) against the API; returns (status, headers, json or None)"""
+    async def main():
+        app = web.Application()
+        api.register_routes(app.router)
+        responses = []
+        async with TestClient(TestServer(app)) as client:
+            for path, headers in requests:
+                response = await client.get(path, headers=headers)
+                body = await response.json() if response.status != 304 else None
+                responses.append((response.status, response.headers, body))
+        return responses
+    
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("path", [
+    "/api/forecast?date=2024-13-01",
+    "/api/forecast?date=1890-01-01",
+    "/api/forecast?date=2200-01-01",
+    "/api/range?from=2024-01-01",
+    "/api/range?from=2024-02-01&to=2024-01-01",
+    "/api/range?from=2024-01-01&to=2025-01-01",
+    "/api/range?from=1890-01-01&to=1890-02-01",
+    "/api/best-days?from=1890-01-01&to=1890-12-31",
+    "/api/best-days?from=2024-01-01&to=2024-03-01&truc=Nope",
+    "/api/best-days?k=many",
+])
+def test_bad_requests(api, path):
+    [(status, _, body)] = _get(api, (path, {}))
+    assert status == 400
+    assert body["error"]
+
+
+def test_table_edges_are_accepted(api):
+    first, last = _get(
+        api, ("/api/forecast?date=1900-01-31", {}), ("/api/best-days?from=2100-01-01", {})
+    )
+    assert first[0] == 200 and first[2]["date"] == "1900-01-31"
+    # The default 90-day range is cut at the table's last day
+    assert last[0] == 200 and last[2]["to"] == "2100-02-08"
+
+
+def test_etag_and_not_modified(api):
+    path = "/api/range?from=2024-01-01&to=2024-01-31"
+    (status, headers, body), = _get(api, (path, {}))
+    assert status == 200
+    assert len(body["days"]) == 31
+    assert headers["Cache-Control"] == f"public, max-age={settings.API_CACHE_MAX_AGE}"
+    
+    etag = headers["ETag"]
+    again, other = _get(
+        api,
+        (path, {"If-None-Match": f"W/{etag}"}),
+        ("/api/range?from=2024-01-01&to=2024-01-30", {"If-None-Match": etag})
+    )
+    assert again[0] == 304 and again[1]["ETag"] == etag
+    assert other[0] == 200 and other[1]["ETag"] != etag
+
+
+def test_implicit_dates_are_not_cached_past_midnight(api, monkeypatch):
+    # 23:50 in Vietnam: "tomorrow" changes in 10 minutes
+    now = pytz.timezone("Asia/Ho_Chi_Minh").localize(datetime(2024, 5, 1, 23, 50))
+    monkeypatch.setattr(bot.api, "get_vietnam_datetime", lambda: now)
+    monkeypatch.setattr(settings, "API_CACHE_MAX_AGE", 3600)
+    implicit, best, explicit = _get(
+        api,
+        ("/api/forecast", {}),
+        ("/api/best-days?to=2024-06-30", {}),
+        ("/api/forecast?date=2024-05-02", {})
+    )
+    assert implicit[2]["date"] == "2024-05-02"
+    assert implicit[1]["Cache-Control"] == "public, max-age=600"
+    assert best[1]["Cache-Control"] == "public, max-age=600"
+    assert explicit[1]["Cache-Control"] == "public, max-age=3600"
+    
+    # Shorter than the cap already: unchanged
+    monkeypatch.setattr(settings, "API_CACHE_MAX_AGE", 60)
+    [(_, headers, _)] = _get(api, ("/api/forecast", {}))
+    assert headers["Cache-Control"] == "public, max-age=60"
+
+
+def test_chat_id_requires_a_token(api):
+    path = "/api/forecast?date=2024-05-01&chat_id=42"
+    missing, wrong, header, query, default = _get(
+        api,
+        (path, {}),
+        (path, {"X-API-Token": "nope"}),
+        (path, {"X-API-Token": "t0ken"}),
+        (path + "&token=t0ken", {}),
+        ("/api/forecast?date=2024-05-01", {})
+    )
+    assert missing[0] == 403 and wrong[0] == 403
+    
+    assert header[0] == 200 and query[0] == 200
+    assert header[1]["Cache-Control"] == f"private, max-age={settings.API_CACHE_MAX_AGE}"
+    assert "LAN" in header[2]["message"]
+    assert header[1]["ETag"] != default[1]["ETag"]
+    assert default[1]["Cache-Control"].startswith("public")
+
+
+def test_chat_id_refused_without_a_configured_token(api, monkeypatch):
+    monkeypatch.setattr(settings, "API_TOKEN", "")
+    [(status, _, _)] = _get(api, ("/api/forecast?chat_id=42&token=", {"X-API-Token": ""}))
+    assert status == 403
@@ -0,0 +1,56 @@
+"""Benchmark suite: timing and baseline comparison (benchmarks.suite)"""
+
+import json
+import sys
+
+import pytest
+
+from benchmarks import suite
+
+
+def _results(**ns_per_op):
+    return {"meta": {}, "results": {name: {"ns_per_op": ns} for name, ns in ns_per_op.items()}}
+
+
+def test_compare_flags_slowdowns_over_the_threshold(capsys):
+    baseline = _results(a=100.0, b=100.0, c=100.0)
+    current = _results(a=111.0, b=109.0, c=50.0, d=10.0)
+    
+    assert suite.compare(baseline, current, threshold=10) == ["a"]
+    output = capsys.readouterr().out
+    assert "REGRESSION" in output and "faster" in output and "new" in output
+    assert suite.compare(baseline, current, threshold=20) == []
+
+
+def test_measure():
+    calls = []
+    result = suite.measure(lambda: calls.append(sum(range(1000))), ops=10, min_time=0.01, repeat=2)
+    assert result["ns_per_op"] > 0
+    assert result["ops_per_s"] == pytest.approx(1e9 / result["ns_per_op"], rel=1e-3)
+    # Warm-up, calibration, then loops per repeat
+    assert len(calls) == 2 + result["loops"] * 2
+
+
+def test_run_suite_filter():
+    results = suite.run_suite(quick=True, name_filter="core.get_can_chi_day")
+    assert list(results["results"]) == ["core.get_can_chi_day"]
+    assert results["results"]["core.get_can_chi_day"]["ops"] == 365
+    assert results["meta"]["quick"] is True
+
+
+def test_compare_cli_exit_code(tmp_path, monkeypatch, capsys):
+    baseline = tmp_path / "baseline.json"
+    current = tmp_path / "current.json"
+    baseline.write_text(json.dumps(_results(a=100.0)))
+    
+    current.write_text(json.dumps(_results(a=105.0)))
+    monkeypatch.setattr(sys, "argv", ["suite", "compare", str(baseline), str(current)])
+    suite.main()
+    assert "No regressions over 10%" in capsys.readouterr().out
+    
+    current.write_text(json.dumps(_results(a=150.0)))
+    monkeypatch.setattr(sys, "argv", ["suite", "compare", str(baseline), str(current), "--threshold", "25"])
+    with pytest.raises(SystemExit) as exit_info:
+        suite.main()
+    assert exit_info.value.code == 1
+    assert "1 regression(s) over 25%: a" in capsys.readouterr().out
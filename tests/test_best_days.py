@@ -0,0 +1,58 @@
+"""Best-day index (agents.best_days)"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from agents.best_days import get_best_day_index
+from agents.pipeline import AgentPipeline
+from config.profiles import Profile
+
+START = datetime(2024, 1, 1)
+END = datetime(2024, 4, 30)
+
+
+@pytest.fixture(scope="module")
+def profile():
+    return Profile.from_settings()
+
+
+@pytest.fixture(scope="module")
+def evaluated(profile):
+    dates = [START + timedelta(days=i) for i in range((END - START).days + 1)]
+    return AgentPipeline(profile).evaluate_many(dates)
+
+
+def _brute_force(evaluated, top_k, keep=lambda day: True):
+    days = sorted((day for day in evaluated if keep(day)), key=lambda day: (-day["luck_score"], day["date"]))
+    return [(day["date"], day["luck_score"]) for day in days[:top_k]]
+
+
+def _pairs(results):
+    return [(day["date"], day["luck_score"]) for day in results]
+
+
+def test_top_k_matches_the_agent_chain(profile, evaluated):
+    index = get_best_day_index(profile)
+    assert _pairs(index.query(START, END, top_k=7)) == _brute_force(evaluated, 7)
+
+
+def test_filters(profile, evaluated):
+    index = get_best_day_index(profile)
+    results = index.query(START, END, top_k=5, hoang_dao_only=True, no_xung=True)
+    assert _pairs(results) == _brute_force(
+        evaluated, 5, lambda day: day["is_hoang_dao"] and not day["has_xung"]
+    )
+    
+    sundays = index.query(START, END, top_k=3, weekday=6, truc="Thành")
+    assert all(day["date"].weekday() == 6 and day["truc"] == "Thành" for day in sundays)
+    assert all(day["luck_score"] >= 8 for day in index.query(START, END, top_k=50, min_score=8))
+
+
+def test_invalid_truc(profile):
+    with pytest.raises(ValueError):
+        get_best_day_index(profile).query(START, END, truc="Không")
+
+
+def test_range_outside_the_almanac(profile):
+    assert get_best_day_index(profile).query(datetime(1890, 1, 1), datetime(1890, 12, 31)) == []
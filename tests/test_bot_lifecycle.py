@@ -0,0 +1,64 @@
+"""TelegramBot start/stop order around the scheduler, send queue and store"""
+
+import asyncio
+
+from telegram.ext import ExtBot
+
+from bot.scheduler import ForecastScheduler
+from bot.send_queue import SendQueue
+from bot.telegram_bot import TelegramBot
+from config.settings import settings
+
+
+def test_send_queue_runs_before_the_scheduler_and_drains_before_the_store_closes(monkeypatch):
+    monkeypatch.setattr(settings, "TELEGRAM_WEBHOOK_URL", "https://example.test/")
+    events = []
+    
+    async def set_webhook(self, **kwargs):
+        return True
+    
+    async def send_message(self, **kwargs):
+        events.append("send_message")
+    
+    async def application_call(name):
+        events.append(f"application.{name}")
+    
+    def scheduler_start(self):
+        # The catch-up run can submit right away
+        self.telegram_bot.send_queue.submit("1", "catch-up bulletin")
+        events.append("scheduler.start")
+    
+    send_queue_stop = SendQueue.stop
+    
+    async def stop_send_queue(self, timeout: float = 30):
+        events.append("send_queue.stop")
+        await send_queue_stop(self)
+    
+    scheduler_close = ForecastScheduler.close
+    
+    def close_scheduler(self):
+        events.append("scheduler.close")
+        scheduler_close(self)
+    
+    monkeypatch.setattr(ExtBot, "set_webhook", set_webhook)
+    monkeypatch.setattr(ExtBot, "send_message", send_message)
+    monkeypatch.setattr(ForecastScheduler, "start", scheduler_start)
+    monkeypatch.setattr(ForecastScheduler, "stop", lambda self: events.append("scheduler.stop"))
+    monkeypatch.setattr(ForecastScheduler, "close", close_scheduler)
+    monkeypatch.setattr(SendQueue, "stop", stop_send_queue)
+    bot = TelegramBot()
+    for name in ("initialize", "start", "stop", "shutdown"):
+        monkeypatch.setattr(bot.application, name, lambda name=name: application_call(name))
+    
+    async def main():
+        await bot.start()
+        await bot.stop()
+        bot.scheduler.executor.shutdown()
+    
+    asyncio.run(main())
+    assert events == [
+        "application.initialize", "application.start", "scheduler.start",
+        # The queued bulletin goes out while draining, before the store closes
+        "scheduler.stop", "send_queue.stop", "send_message", "scheduler.close",
+        "application.stop", "application.shutdown"
+    ]
@@ -0,0 +1,67 @@
+"""/thang and /tuan calendar grids (AgentPipeline.evaluate_many, format_calendar)"""
+
+import asyncio
+import calendar
+from datetime import datetime, timedelta
+
+from agents.agent_4_telegram_notifier import TELEGRAM_MESSAGE_LIMIT, WEEKDAY_LABELS
+from agents.pipeline import AgentPipeline
+from config.profiles import Profile
+
+# February 2024 starts on a Thursday and has 29 days
+MONTH_START = datetime(2024, 2, 1)
+MONTH_DAYS = calendar.monthrange(2024, 2)[1]
+
+
+def _dates(start, days):
+    return [start + timedelta(days=i) for i in range(days)]
+
+
+def test_evaluate_many_matches_the_agent_chain():
+    pipeline = AgentPipeline(Profile.from_settings())
+    dates = _dates(MONTH_START, MONTH_DAYS)
+    
+    for day, target_date in zip(pipeline.evaluate_many(dates), dates):
+        full = pipeline.run_full(target_date)
+        assert day == {
+            "date": target_date,
+            "luck_score": full["metaphysical"]["luck_score"],
+            "is_hoang_dao": full["metaphysical"]["is_hoang_dao"],
+            "has_xung": full["metaphysical"]["has_xung"],
+            "can_chi": full["data"]["can_chi"],
+            "truc": full["data"]["truc"]
+        }
+
+
+def test_month_grid_layout():
+    pipeline = AgentPipeline(Profile.from_settings())
+    days = pipeline.evaluate_many(_dates(MONTH_START, MONTH_DAYS))
+    chunks = pipeline.agent4.format_calendar("THÁNG 02/2024", days)
+    
+    assert all(len(chunk) <= TELEGRAM_MESSAGE_LIMIT for chunk in chunks)
+    message = "\n".join(chunks)
+    
+    grid = message.split("```")[1].strip("\n").splitlines()
+    assert grid[0].split() == WEEKDAY_LABELS
+    # 1 Feb sits under T5, the last row ends on the 29th (a Thursday)
+    assert grid[1] == " " * 5 * 3 + "  1    2    3    4"
+    assert grid[-2].split()[-1] == "29"
+    # Every day gets one detail line, in order
+    details = [line for line in message.splitlines() if line[:2] in WEEKDAY_LABELS and ": *" in line]
+    assert [line.split()[1].rstrip(":") for line in details] == [
+        day["date"].strftime("%d/%m") for day in days
+    ]
+    
+    best = max(days, key=lambda day: day["luck_score"])
+    assert f"*Ngày tốt nhất:* {best['date'].strftime('%d/%m/%Y')}" in message
+
+
+def test_week_calendar_from_the_scheduler(scheduler):
+    week_start = datetime(2024, 2, 12)
+    chunks = asyncio.run(scheduler.run_calendar(week_start, 7, "TUẦN 12/02 - 18/02/2024"))
+    
+    pipeline = AgentPipeline(scheduler.default_profile)
+    assert chunks == pipeline.agent4.format_calendar(
+        "TUẦN 12/02 - 18/02/2024", pipeline.evaluate_many(_dates(week_start, 7))
+    )
+    assert "TUẦN 12/02 - 18/02/2024" in chunks[0]
@@ -0,0 +1,48 @@
+"""Can Chi calculations and the vectorized range engine (core.can_chi)"""
+
+from datetime import datetime, timedelta
+
+from core.can_chi import (
+    check_hop, check_tam_hop, check_xung, get_can_chi_day, get_can_chi_many, get_can_chi_range, get_day_number
+)
+from core.constants import CAN_TO_ELEMENT, CHI_TO_ELEMENT, NGU_HANH
+
+
+def test_range_matches_single_day():
+    start = datetime(1899, 12, 1)
+    end = datetime(1901, 3, 1)
+    result = get_can_chi_range(start, end)
+    
+    assert len(result["day_number"]) == (end - start).days + 1
+    for i, day_number in enumerate(result["day_number"]):
+        single = get_can_chi_day(start + timedelta(days=i))
+        assert day_number == get_day_number(start + timedelta(days=i))
+        assert result["can"][i] == single["can_index"]
+        assert result["chi"][i] == single["chi_index"]
+        assert NGU_HANH[result["element_can"][i]] == CAN_TO_ELEMENT[single["can"]]
+        assert NGU_HANH[result["element_chi"][i]] == CHI_TO_ELEMENT[single["chi"]]
+
+
+def test_many_accepts_unordered_day_numbers():
+    days = [45000, -3, 0, 12345]
+    result = get_can_chi_many(days)
+    for i, day_number in enumerate(days):
+        single = get_can_chi_day(datetime(1900, 1, 1) + timedelta(days=day_number))
+        assert (result["can"][i], result["chi"][i]) == (single["can_index"], single["chi_index"])
+
+
+def test_known_day():
+    assert get_can_chi_day(datetime(1900, 1, 1))["can_chi"] == "Canh Tý"
+
+
+def test_relations():
+    assert check_xung("Tý", "Ngọ") and check_xung("Ngọ", "Tý")
+    assert not check_xung("Tý", "Sửu")
+    assert check_hop("Tý", "Sửu")
+    assert check_tam_hop("Thân", "Tý")
+
+
+def test_relations_with_unknown_names_are_false():
+    assert check_xung("Tý", "Rồng") is False
+    assert check_hop("", "Sửu") is False
+    assert check_tam_hop(None, "Tý") is False
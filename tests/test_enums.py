@@ -0,0 +1,58 @@
+"""Integer-coded enums and precomputed relation matrices (core.enums, core.can_chi)"""
+
+from core.can_chi import (
+    ELEMENT_RELATION, HOP_MATRIX, SEASON_ELEMENT_STATE, TRUC_IS_HOANG_DAO, XUNG_MATRIX, check_element_relationship
+)
+from core.constants import (
+    DIA_CHI, ELEMENT_STATE_BY_SEASON, ELEMENT_STATES, HOANG_DAO, HOP_PAIRS, NGU_HANH, NGU_HANH_KHAC, NGU_HANH_SINH,
+    SEASONS, THIEN_CAN, TRUC_12, XUNG_PAIRS
+)
+from core.enums import CHI_INDEX, Can, Chi, Element, Relation, Truc
+
+
+def test_labels_match_constants():
+    assert [can.label for can in Can] == THIEN_CAN
+    assert [chi.label for chi in Chi] == DIA_CHI
+    assert [element.label for element in Element] == NGU_HANH
+    assert [truc.label for truc in Truc] == TRUC_12
+
+
+def test_chi_matrices_match_pairs():
+    for i, chi1 in enumerate(DIA_CHI):
+        for j, chi2 in enumerate(DIA_CHI):
+            assert XUNG_MATRIX[i][j] == ((chi1, chi2) in XUNG_PAIRS or (chi2, chi1) in XUNG_PAIRS)
+            assert HOP_MATRIX[i][j] == ((chi1, chi2) in HOP_PAIRS or (chi2, chi1) in HOP_PAIRS)
+    assert XUNG_MATRIX[CHI_INDEX["Dần"]][CHI_INDEX["Thân"]]
+
+
+def test_element_relation_matrix():
+    for i, element1 in enumerate(NGU_HANH):
+        for j, element2 in enumerate(NGU_HANH):
+            relation = ELEMENT_RELATION[i][j]
+            if element1 == element2:
+                assert relation == Relation.SAME
+            elif NGU_HANH_SINH[element1] == element2:
+                assert relation == Relation.SINH
+            elif NGU_HANH_SINH[element2] == element1:
+                assert relation == Relation.DUOC_SINH
+            elif NGU_HANH_KHAC[element1] == element2:
+                assert relation == Relation.KHAC
+            else:
+                assert relation == Relation.BI_KHAC
+
+
+def test_season_state_and_hoang_dao_tables():
+    for s, season in enumerate(SEASONS):
+        for e, element in enumerate(NGU_HANH):
+            assert ELEMENT_STATES[SEASON_ELEMENT_STATE[s][e]] == ELEMENT_STATE_BY_SEASON[season][element]
+    assert [truc for truc, flag in zip(TRUC_12, TRUC_IS_HOANG_DAO) if flag] == [t for t in TRUC_12 if t in HOANG_DAO]
+
+
+def test_element_relationship():
+    assert check_element_relationship("Kim", "Thủy") == {"type": "sinh", "description": "Kim sinh Thủy (tốt)"}
+    assert check_element_relationship("Hỏa", "Kim")["type"] == "khac"
+
+
+def test_element_relationship_unknown_names():
+    assert check_element_relationship("Kim", "Gió")["type"] == "neutral"
+    assert check_element_relationship("Gió", "Gió")["type"] == "same"
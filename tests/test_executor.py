@@ -0,0 +1,53 @@
+"""Agent executor: inline, thread and process modes (bot.executor)"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from agents.pipeline import run_evaluate_job
+from bot.executor import AgentExecutor
+from config.profiles import Profile
+
+
+def _run(executor: AgentExecutor, func, *args):
+    async def main():
+        try:
+            return await executor.run(func, *args)
+        finally:
+            executor.shutdown()
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+def test_modes_give_the_same_result(mode):
+    dates = [datetime(2024, 1, day) for day in range(1, 4)]
+    profile = Profile.from_settings()
+    assert _run(AgentExecutor(mode, max_workers=1), run_evaluate_job, profile, dates) == run_evaluate_job(profile, dates)
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        AgentExecutor("fiber")
+
+
+def test_thread_mode_keeps_the_loop_responsive():
+    executor = AgentExecutor("thread", max_workers=1)
+    
+    async def main():
+        ticks = 0
+        job = asyncio.ensure_future(executor.run(time.sleep, 0.3))
+        while not job.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        executor.shutdown()
+        return ticks
+    
+    assert asyncio.run(main()) >= 10
+
+
+def test_timeout():
+    executor = AgentExecutor("thread", max_workers=1, timeout=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        _run(executor, time.sleep, 0.3)
@@ -0,0 +1,100 @@
+"""Streaming export (agents.export and /api/export)"""
+
+import asyncio
+import gzip
+import io
+import json
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from aiohttp import ClientPayloadError, web
+from aiohttp.test_utils import TestClient, TestServer
+
+from agents.export import export
+from bot.api import ForecastAPI
+
+
+@pytest.fixture
+def api(scheduler):
+    return ForecastAPI(SimpleNamespace(scheduler=scheduler))
+
+
+def _download(api, path):
+    """GET path; returns (status, headers, raw body)"""
+    async def main():
+        app = web.Application()
+        api.register_routes(app.router)
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get(path, auto_decompress=False)
+            return response.status, response.headers, await response.read()
+    
+    return asyncio.run(main())
+
+
+def _expected(scheduler, start, end, fmt):
+    output = io.StringIO()
+    export(output, start, end, scheduler.default_profile, fmt)
+    return output.getvalue().encode("utf-8")
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_stream_matches_the_file_export(api, scheduler, fmt):
+    status, headers, body = _download(api, f"/api/export?from=2024-01-01&to=2025-02-10&format={fmt}")
+    assert status == 200
+    assert headers["Transfer-Encoding"] == "chunked"
+    # More than one batch, and the CSV header only once
+    assert body == _expected(scheduler, datetime(2024, 1, 1), datetime(2025, 2, 10), fmt)
+
+
+def test_gzip_stream(api, scheduler):
+    status, headers, body = _download(api, "/api/export?from=2024-01-01&to=2024-03-31&gzip=1")
+    assert status == 200
+    assert headers["Content-Type"] == "application/gzip"
+    assert 'filename="forecasts_20240101_20240331.ndjson.gz"' in headers["Content-Disposition"]
+    assert gzip.decompress(body) == _expected(scheduler, datetime(2024, 1, 1), datetime(2024, 3, 31), "ndjson")
+
+
+@pytest.mark.parametrize("query", [
+    "from=1890-01-01&to=1890-12-31",
+    "from=2100-01-01&to=2101-01-01",
+    "from=2024-01-01",
+    "from=2024-01-01&to=2024-01-31&format=xml",
+])
+def test_bad_requests_before_streaming(api, query):
+    status, headers, body = _download(api, f"/api/export?{query}")
+    assert status == 400
+    assert "Content-Disposition" not in headers
+    assert json.loads(body)["error"]
+
+
+def test_failure_mid_stream_aborts_the_download(api, scheduler, monkeypatch):
+    run = scheduler.executor.run
+    calls = []
+    
+    async def failing_run(job, *args):
+        calls.append(job)
+        if len(calls) == 2:
+            raise RuntimeError("worker died")
+        return await run(job, *args)
+    
+    monkeypatch.setattr(scheduler.executor, "run", failing_run)
+    
+    async def main():
+        app = web.Application()
+        api.register_routes(app.router)
+        async with TestClient(TestServer(app)) as client:
+            response = await client.get("/api/export?from=2024-01-01&to=2025-12-31&gzip=1", auto_decompress=False)
+            received = bytearray()
+            with pytest.raises(ClientPayloadError):
+                async for chunk in response.content.iter_any():
+                    received.extend(chunk)
+            return response.status, bytes(received)
+    
+    status, body = asyncio.run(main())
+    assert status == 200
+    assert len(calls) == 2
+    # No terminating chunk and no gzip trailer: the partial body is not a valid file
+    assert body
+    with pytest.raises(EOFError):
+        gzip.decompress(body)
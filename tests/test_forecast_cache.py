@@ -0,0 +1,46 @@
+"""Forecast cache and deterministic forecasts (bot.forecast_cache, core.seed)"""
+
+import time
+from datetime import datetime
+
+from agents.pipeline import AgentPipeline
+from bot.forecast_cache import ForecastCache
+from config.profiles import Profile
+from core.seed import seeded_choice, stable_seed
+from helpers import strip_timestamps
+
+
+def test_lru_eviction():
+    cache = ForecastCache(max_size=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_ttl_expiry():
+    cache = ForecastCache(max_size=10, ttl_seconds=0.05)
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.06)
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_stable_seed():
+    # CRC32, not hash(): fixed across processes and runs
+    assert stable_seed("2024-01-01", 14, 4) == stable_seed("2024-01-01", 14, 4)
+    assert stable_seed("2024-01-01", 14, 4) != stable_seed("2024-01-02", 14, 4)
+    assert stable_seed("x") == 0x8CDC1683
+    options = list(range(10))
+    assert seeded_choice(123, "tip", options) == seeded_choice(123, "tip", options)
+
+
+def test_forecast_is_deterministic():
+    day = datetime(2024, 6, 1)
+    first = AgentPipeline(Profile.from_settings()).run(day)
+    second = AgentPipeline(Profile.from_settings()).run(day)
+    assert strip_timestamps(first) == strip_timestamps(second)
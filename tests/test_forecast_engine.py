@@ -0,0 +1,40 @@
+"""Forecast state memoization (agents.forecast_engine)"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from agents.forecast_engine import pack_state
+from agents.pipeline import AgentPipeline
+from config.profiles import Profile
+from helpers import strip_timestamps
+
+PROFILES = [
+    Profile.from_settings(),
+    Profile(chat_id="2", name="B", birth_day=29, birth_month=2, birth_year=1988),
+    Profile(chat_id="3", name="C", birth_day=1, birth_month=12, birth_year=1975, element="Thủy", branch="Ngọ"),
+]
+
+
+@pytest.mark.parametrize("profile", PROFILES, ids=lambda profile: profile.name)
+def test_run_matches_run_full(profile):
+    pipeline = AgentPipeline(profile)
+    day = datetime(2024, 1, 1)
+    for offset in range(0, 1500, 7):
+        target = day + timedelta(days=offset)
+        assert strip_timestamps(pipeline.run(target)) == strip_timestamps(pipeline.run_full(target)), target
+
+
+def test_states_are_computed_once():
+    pipeline = AgentPipeline(PROFILES[1])
+    data = pipeline.agent1.analyze(datetime(2024, 3, 1))
+    first = pipeline.engine.lookup(data)
+    assert pipeline.engine.lookup(dict(data)) is first
+
+
+def test_pack_state_is_unique():
+    keys = {
+        pack_state(can, chi, truc, season, number, 4, 11, 9)
+        for can in range(10) for chi in range(12) for truc in range(12) for season in range(4) for number in (1, 9)
+    }
+    assert len(keys) == 10 * 12 * 12 * 4 * 2
@@ -0,0 +1,60 @@
+"""Health check server and lazy startup (main.HealthCheckServer, main.DeferredRoutes)"""
+
+import asyncio
+import subprocess
+import sys
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from conftest import ROOT
+from main import HealthCheckServer
+
+
+def test_importing_main_skips_the_heavy_modules():
+    code = (
+        "import sys, main; "
+        "print(sorted(m for m in ('telegram', 'apscheduler', 'numpy', 'agents.pipeline', 'bot.telegram_bot') "
+        "if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "[]"
+
+
+def test_health_answers_while_starting_and_routes_are_mounted_later():
+    server = HealthCheckServer(port=0)
+    
+    async def api(request):
+        return web.json_response({"ok": True})
+    
+    async def main():
+        async with TestClient(TestServer(server.app)) as client:
+            health = await client.get("/health")
+            starting = await (await client.get("/health")).json()
+            waiting = await client.get("/api/forecast")
+            
+            # What Application.start does once the bot has loaded
+            server.routes.add_get("/api/forecast", api)
+            mounted = await client.get("/api/forecast")
+            head = await client.head("/api/forecast")
+            post = await client.post("/api/forecast")
+            server.mark_ready()
+            
+            ready = await (await client.get("/health")).json()
+            missing = await client.get("/nope")
+            return (
+                health.status, starting, waiting.status, waiting.headers.get("Retry-After"),
+                mounted.status, await mounted.json(), head.status, post.status, ready, missing.status
+            )
+    
+    (health, starting, waiting, retry_after, mounted, body, head, post, ready, missing) = asyncio.run(main())
+    assert health == 200 and starting["status"] == "starting" and starting["startup_seconds"] is None
+    assert waiting == 503 and retry_after == "5"
+    assert mounted == 200 and body == {"ok": True}
+    assert head == 200
+    # Not ready yet: unknown routes answer 503
+    assert post == 503
+    assert ready["status"] == "healthy" and ready["startup_seconds"] >= 0
+    assert missing == 404
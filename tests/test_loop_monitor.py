@@ -0,0 +1,70 @@
+"""Event-loop lag monitor and slow-callback detector (bot.loop_monitor)"""
+
+import asyncio
+import time
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from bot.loop_monitor import LoopMonitor, _percentile
+from config.settings import settings
+from main import HealthCheckServer
+
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+def test_percentile():
+    assert _percentile([], 0.5) == 0.0
+    values = [float(i) for i in range(1, 101)]
+    assert _percentile(values, 0.5) == 51.0
+    assert _percentile(values, 0.99) == 100.0
+    assert _percentile(values, 1.0) == 100.0
+
+
+def test_blocked_loop_is_reported_with_its_stack(monkeypatch):
+    monitor = LoopMonitor(interval=0.02, slow_threshold=0.1)
+    server = HealthCheckServer(port=0, loop_monitor=monitor)
+    
+    async def main():
+        async with TestClient(TestServer(server.app)) as client:
+            monitor.start()
+            await asyncio.sleep(0.1)
+            block_the_loop(0.3)
+            await asyncio.sleep(0.1)
+            
+            health = await (await client.get("/health")).json()
+            disabled = await client.get("/debug/loop")
+            monkeypatch.setattr(settings, "DEBUG_TOKEN", "dbg")
+            forbidden = await client.get("/debug/loop", headers={"X-Debug-Token": "nope"})
+            debug = await client.get("/debug/loop", headers={"X-Debug-Token": "dbg"})
+            report = await debug.json()
+            await monitor.stop()
+            return health, disabled.status, forbidden.status, debug.status, report
+    
+    health, disabled, forbidden, status, report = asyncio.run(main())
+    summary = monitor.summary()
+    assert summary["samples"] > 3
+    assert summary["lag_max_ms"] >= 200
+    assert summary["lag_p50_ms"] < 100
+    
+    slow = [entry for entry in monitor.slow_callbacks if entry["blocked_ms"] >= 200]
+    assert len(slow) == 1
+    # The watchdog caught the loop thread inside the blocking call
+    assert slow[0]["stack"] and any("in block_the_loop" in line for line in slow[0]["stack"])
+    
+    assert health["event_loop"]["samples"] > 0
+    assert (disabled, forbidden, status) == (404, 403, 200)
+    assert report["lag_max_ms"] >= 200
+    assert report["slow_callbacks_recent"] == list(monitor.slow_callbacks)
+    assert monitor._task.done()
+
+
+def test_debug_loop_without_a_monitor(monkeypatch):
+    monkeypatch.setattr(settings, "DEBUG_TOKEN", "dbg")
+    
+    async def main():
+        async with TestClient(TestServer(HealthCheckServer(port=0).app)) as client:
+            return (await client.get("/debug/loop?token=dbg")).status
+    
+    assert asyncio.run(main()) == 404
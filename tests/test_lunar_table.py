@@ -0,0 +1,58 @@
+"""Table-driven solar/lunar conversion (core.lunar_table)"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from core.lunar_table import (
+    END_ORDINAL, FIRST_ORDINAL, lunar_to_solar_ordinal, solar_ordinal_to_lunar
+)
+
+lunardate = pytest.importorskip("lunardate")
+
+
+def _expected(day: date) -> tuple:
+    lunar = lunardate.LunarDate.fromSolarDate(day.year, day.month, day.day)
+    return lunar.year, lunar.month, lunar.day, bool(lunar.isLeapMonth)
+
+
+def _edge_days():
+    first = date.fromordinal(FIRST_ORDINAL)
+    last = date.fromordinal(END_ORDINAL - 1)
+    for start in (first, last - timedelta(days=59), date(2023, 1, 1)):
+        for offset in range(60):
+            yield start + timedelta(days=offset)
+
+
+def test_matches_lunardate_at_table_edges():
+    for day in _edge_days():
+        assert solar_ordinal_to_lunar(day.toordinal()) == _expected(day), day
+
+
+def test_matches_lunardate_on_sampled_days():
+    for ordinal in range(FIRST_ORDINAL, END_ORDINAL, 97):
+        assert solar_ordinal_to_lunar(ordinal) == _expected(date.fromordinal(ordinal))
+
+
+def test_round_trip():
+    for ordinal in list(range(FIRST_ORDINAL, FIRST_ORDINAL + 400)) + list(range(END_ORDINAL - 400, END_ORDINAL)):
+        assert lunar_to_solar_ordinal(*solar_ordinal_to_lunar(ordinal)) == ordinal
+
+
+def test_leap_month():
+    # 2023 has a leap 2nd month: lunar 1/2 nhuận = 2023-03-22
+    assert solar_ordinal_to_lunar(date(2023, 3, 22).toordinal()) == (2023, 2, 1, True)
+    assert lunar_to_solar_ordinal(2023, 2, 1, True) == date(2023, 3, 22).toordinal()
+
+
+@pytest.mark.parametrize("ordinal", [FIRST_ORDINAL - 1, END_ORDINAL])
+def test_out_of_range(ordinal):
+    with pytest.raises(ValueError):
+        solar_ordinal_to_lunar(ordinal)
+
+
+def test_invalid_lunar_dates():
+    with pytest.raises(ValueError):
+        lunar_to_solar_ordinal(2024, 2, 1, True)  # 2024 has no leap 2nd month
+    with pytest.raises(ValueError):
+        lunar_to_solar_ordinal(1899, 1, 1)
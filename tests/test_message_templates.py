@@ -0,0 +1,118 @@
+"""Compiled forecast and strategy templates (agents.message_templates)"""
+
+import re
+from datetime import datetime, timedelta
+from html.parser import HTMLParser
+
+import pytest
+
+from agents.message_templates import PARSE_MODES, StrategyTemplate, get_style
+from agents.pipeline import AgentPipeline
+from config.profiles import Profile
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return AgentPipeline(Profile.from_settings())
+
+
+@pytest.fixture(scope="module")
+def results(pipeline):
+    return pipeline.run_many(START + timedelta(days=i) for i in range(120))
+
+
+def _reference_forecast(agent4, data, meta, strategy, lucky_color):
+    """
+    The Markdown forecast as Agent 4 built it before templates
+    (the texts are now escaped, e.g. node_modules would open an italic entity)
+    """
+    escape = get_style("markdown").escape
+    message = f"""🔮 *BẢN TIN THIÊN CƠ CHO {agent4.user_name.upper()}*
+📅 *Dự báo cho ngày:* {data['solar_formatted']} ({data['lunar_formatted']} - {data['can_chi']})
+
+📊 *Chỉ số năng lượng:*
+• Thần số học ngày cá nhân: Số *{data['personal_day_number']}*
+• Độ may mắn: *{meta['luck_score']}/10* {"⭐" * min(meta['luck_score'], 10)}
+• Trạng thái mệnh {agent4.user_element} ({agent4.year_pillar}): *{meta['menh_state']}*
+
+✅ *NÊN LÀM (Good Commit):*
+"""
+    for item in strategy["should_do"]:
+        message += f"• {escape(item)}\n"
+    message += "\n❌ *NÊN TRÁNH (Bad Request):*\n"
+    for item in strategy["should_avoid"]:
+        message += f"• {escape(item)}\n"
+    message += f"""
+💡 *LỜI NHẮN VŨ TRỤ (Daily Log):*
+{escape(f'"{strategy["cosmic_message"]}"')}
+
+🎯 *Màu may mắn:* `{lucky_color}`
+"""
+    return message.strip()
+
+
+def _reference_summary(strategy):
+    """Agent 3's plain summary as built before templates"""
+    summary = "✅ NÊN LÀM:\n"
+    for item in strategy["should_do"]:
+        summary += f"  • {item}\n"
+    summary += "\n❌ NÊN TRÁNH:\n"
+    for item in strategy["should_avoid"]:
+        summary += f"  • {item}\n"
+    summary += f"\n💡 LỜI NHẮN VŨ TRỤ:\n  \"{strategy['cosmic_message']}\"\n"
+    return summary.strip()
+
+
+def test_markdown_forecast_matches_the_original_layout(pipeline, results):
+    agent4 = pipeline.agent4
+    for result in results:
+        data, meta, strategy = result["data"], result["metaphysical"], result["strategy"]
+        lucky_color = agent4._get_lucky_color(data["element_can"], data["seed"])
+        assert result["telegram"]["message"] == _reference_forecast(agent4, data, meta, strategy, lucky_color)
+
+
+def test_strategy_summary_matches_the_original_layout(pipeline, results):
+    for result in results:
+        assert pipeline.agent3.get_summary(result["strategy"]) == _reference_summary(result["strategy"])
+
+
+def test_every_format_carries_the_same_text(pipeline, results):
+    data, meta, strategy = results[0]["data"], results[0]["metaphysical"], results[0]["strategy"]
+    plain = pipeline.agent4.render(data, meta, strategy, fmt="plain")
+    
+    assert PARSE_MODES["plain"] is None
+    assert "*" not in plain and "`" not in plain
+    
+    # Stripping the entities and escapes of each format gives back the plain text
+    markdown_v2 = pipeline.agent4.render(data, meta, strategy, fmt="markdownv2")
+    assert re.sub(r"\\(.)", r"\1", re.sub(r"(?<!\\)[*`]", "", markdown_v2)) == plain
+    
+    class TextOnly(HTMLParser):
+        text = ""
+        
+        def handle_data(self, chunk):
+            self.text += chunk
+    
+    parser = TextOnly(convert_charrefs=True)
+    parser.feed(pipeline.agent4.render(data, meta, strategy, fmt="html"))
+    assert parser.text == plain
+
+
+def test_markdown_v2_escapes_reserved_characters():
+    template = StrategyTemplate("markdownv2")
+    summary = template.render({
+        "should_do": ["Deploy v1.2 (ngày tốt)!"],
+        "should_avoid": ["a_b [c]"],
+        "cosmic_message": "x-y"
+    })
+    assert "Deploy v1\\.2 \\(ngày tốt\\)\\!" in summary
+    assert "a\\_b \\[c\\]" in summary
+    assert '"x\\-y"' in summary
+    assert summary.startswith("✅ *NÊN LÀM:*")
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        StrategyTemplate("rst")
@@ -0,0 +1,91 @@
+"""Prometheus-style metrics (core.metrics) and the /metrics endpoint"""
+
+import asyncio
+import re
+from datetime import datetime
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from agents.pipeline import AgentPipeline, STAGE_DATES
+from config.profiles import Profile
+from core.metrics import CONTENT_TYPE, Histogram, MetricsRegistry
+from main import HealthCheckServer
+
+
+def test_render_text_format():
+    registry = MetricsRegistry()
+    commands = registry.counter("commands_total", "Commands handled", ["command"])
+    commands.labels("dubao").inc()
+    commands.labels("dubao").inc(2)
+    commands.labels('a"b\\c').inc()
+    registry.gauge("queue_depth", "Queued messages").labels().set(1.5)
+    latency = registry.histogram("latency_seconds", "Latency", ["stage"], buckets=(0.1, 1.0))
+    child = latency.labels("agent1")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        child.observe(value)
+    registry.register_collector("cache", lambda: [
+        ("cache_hits_total", "counter", "Cache hits", ("cache",), [(("api",), 7)])
+    ])
+    
+    assert registry.render().splitlines() == [
+        "# HELP commands_total Commands handled",
+        "# TYPE commands_total counter",
+        'commands_total{command="dubao"} 3',
+        'commands_total{command="a\\"b\\\\c"} 1',
+        "# HELP queue_depth Queued messages",
+        "# TYPE queue_depth gauge",
+        "queue_depth 1.5",
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{stage="agent1",le="0.1"} 2',
+        'latency_seconds_bucket{stage="agent1",le="1.0"} 3',
+        'latency_seconds_bucket{stage="agent1",le="+Inf"} 4',
+        'latency_seconds_sum{stage="agent1"} 3.65',
+        'latency_seconds_count{stage="agent1"} 4',
+        "# HELP cache_hits_total Cache hits",
+        "# TYPE cache_hits_total counter",
+        'cache_hits_total{cache="api"} 7',
+    ]
+
+
+def test_families_and_labels():
+    registry = MetricsRegistry()
+    family = registry.counter("events_total", "Events", ["kind"])
+    assert registry.counter("events_total", "Events", ["kind"]) is family
+    # Values are normalized to strings: the same child either way
+    assert family.labels(1) is family.labels("1")
+    with pytest.raises(ValueError):
+        family.labels("a", "b")
+    with pytest.raises(ValueError):
+        registry.gauge("events_total", "Events")
+
+
+def test_histogram_quantile():
+    histogram = Histogram(buckets=(1, 2, 5))
+    assert histogram.quantile(0.5) == 0.0
+    for value in (0.5, 1.5, 1.8, 4, 10):
+        histogram.observe(value)
+    assert histogram.count == 5
+    assert histogram.quantile(0.2) == 1
+    assert histogram.quantile(0.6) == 2
+    assert histogram.quantile(0.8) == 5
+    assert histogram.quantile(1.0) == float("inf")
+
+
+def test_metrics_endpoint_reports_agent_stages():
+    before = STAGE_DATES.labels("agent1").value
+    AgentPipeline(Profile.from_settings()).run_many([datetime(2024, 1, d) for d in range(1, 11)])
+    assert STAGE_DATES.labels("agent1").value == before + 10
+    
+    async def main():
+        async with TestClient(TestServer(HealthCheckServer(port=0).app)) as client:
+            response = await client.get("/metrics")
+            return response.status, response.headers["Content-Type"], await response.text()
+    
+    status, content_type, text = asyncio.run(main())
+    assert status == 200
+    assert content_type == CONTENT_TYPE
+    assert "# TYPE agent_stage_seconds histogram" in text
+    count = re.search(r'^agent_stage_dates_total\{stage="agent1"\} (\d+)$', text, re.M)
+    assert int(count.group(1)) == before + 10
@@ -0,0 +1,46 @@
+"""Agent chain: single-date and batch paths (agents.pipeline)"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from agents.agent_1_data_collector import DataCollectorAgent
+from agents.pipeline import AgentPipeline
+from config.profiles import Profile
+from helpers import strip_timestamps
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    return AgentPipeline(Profile.from_settings())
+
+
+def test_analyze_many_matches_analyze():
+    agent = DataCollectorAgent(14, 4)
+    dates = [datetime(2023, 1, 1) + timedelta(days=i) for i in range(800)]
+    dates += [datetime(1900, 2, 1), datetime(2099, 12, 31), datetime(2023, 3, 22)]  # unordered, edges, leap month
+    
+    batch = agent.analyze_many(dates)
+    assert strip_timestamps(batch) == strip_timestamps([agent.analyze(day) for day in dates])
+    assert [type(value) for value in batch[0].values()] == [type(value) for value in agent.analyze(dates[0]).values()]
+
+
+def test_analyze_many_empty_and_out_of_range():
+    agent = DataCollectorAgent(14, 4)
+    assert agent.analyze_many([]) == []
+    with pytest.raises(ValueError):
+        agent.analyze_many([datetime(2024, 1, 1), datetime(2150, 1, 1)])
+
+
+def test_run_many_matches_run(pipeline):
+    dates = [datetime(2024, 2, 1) + timedelta(days=i) for i in range(45)]
+    assert strip_timestamps(pipeline.run_many(dates)) == strip_timestamps([pipeline.run(day) for day in dates])
+
+
+def test_evaluate_many_matches_run(pipeline):
+    dates = [datetime(2024, 5, 1) + timedelta(days=i) for i in range(10)]
+    for summary, day in zip(pipeline.evaluate_many(dates), dates):
+        result = pipeline.run(day)
+        assert summary["date"] == day
+        assert summary["luck_score"] == result["metaphysical"]["luck_score"]
+        assert summary["can_chi"] == result["data"]["can_chi"]
@@ -0,0 +1,46 @@
+"""Rolling window of precomputed forecasts (ForecastScheduler.refresh_forecast_window)"""
+
+import asyncio
+from datetime import timedelta
+
+from agents.pipeline import AgentPipeline
+from core.lunar_calendar import get_vietnam_datetime
+
+
+def test_window_holds_the_next_days(scheduler):
+    asyncio.run(scheduler.refresh_forecast_window())
+    
+    today = get_vietnam_datetime()
+    keys = [(today + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range(3)]
+    assert sorted(scheduler.forecast_window) == keys
+    
+    pipeline = AgentPipeline(scheduler.default_profile)
+    assert scheduler.forecast_window[keys[1]] == pipeline.run(today + timedelta(days=1))["telegram"]["message"]
+
+
+def test_window_drops_past_days_and_serves_commands(scheduler):
+    scheduler.forecast_window["2000-01-01"] = "stale"
+    asyncio.run(scheduler.refresh_forecast_window())
+    assert "2000-01-01" not in scheduler.forecast_window
+    
+    today = get_vietnam_datetime()
+    scheduler.forecast_window[today.strftime("%Y-%m-%d")] = "from the window"
+    assert asyncio.run(scheduler.run_agent_chain(today)) == "from the window"
+
+
+def test_window_reuses_stored_forecasts(scheduler):
+    asyncio.run(scheduler.refresh_forecast_window())
+    stored = dict(scheduler.forecast_window)
+    
+    scheduler.forecast_window.clear()
+    calls = []
+    original = scheduler.executor.run
+    
+    async def counting_run(func, *args):
+        calls.append(func.__name__)
+        return await original(func, *args)
+    
+    scheduler.executor.run = counting_run
+    asyncio.run(scheduler.refresh_forecast_window())
+    assert scheduler.forecast_window == stored
+    assert calls == []
@@ -0,0 +1,61 @@
+"""Subscriber profiles and per-profile agent constants (config.profiles, Agent 3)"""
+
+import json
+
+import pytest
+
+from agents.agent_3_dev_strategist import DevStrategistAgent
+from agents.pipeline import AgentPipeline, get_pipeline
+from config.profiles import Profile, SubscriberRegistry
+
+META = {"luck_score": 4, "has_xung": False, "is_hoang_dao": True, "menh_state": "Vượng"}
+DATA = {"element_can": "Thổ", "personal_day_number": 4, "seed": 1}
+
+
+def _advice(agent: DevStrategistAgent, has_xung: bool) -> list:
+    meta = dict(META, has_xung=has_xung)
+    state = agent.analyze_state(DATA, meta)
+    return state["should_do"] + state["cosmic_messages"]
+
+
+def test_default_user_keeps_the_original_advice():
+    agent = DevStrategistAgent(user_element="Kim", user_life_path=3)
+    assert "Mặc áo màu trắng/vàng (tương sinh với Kim)" in _advice(agent, False)
+    assert "Mệnh Kim của bạn cần Thủy để mài giũa. Hãy học thêm, code nhiều hơn!" in _advice(agent, False)
+    assert any("bạn là Dev số 3 (sáng tạo)" in line for line in _advice(agent, True))
+
+
+def test_advice_follows_the_profile():
+    agent = DevStrategistAgent(user_element="Hỏa", user_life_path=7)
+    advice = _advice(agent, False) + _advice(agent, True)
+    text = "\n".join(advice)
+    assert "Mặc áo màu đỏ/xanh lá (tương sinh với Hỏa)" in advice
+    assert "Mệnh Hỏa của bạn cần Thổ để mài giũa" in text
+    assert "bạn là Dev số 7 (phân tích)" in text
+    assert "Kim" not in text and "Dev số 3" not in text
+
+
+def test_pipeline_wires_the_profile_into_agent3():
+    profile = Profile(chat_id="42", name="B", birth_day=1, birth_month=1, birth_year=1990, element="Thủy")
+    pipeline = AgentPipeline(profile)
+    assert (pipeline.agent3.user_element, pipeline.agent3.user_life_path) == ("Thủy", profile.life_path)
+
+
+def test_profile_defaults_and_validation():
+    profile = Profile(chat_id="1", name="A", birth_day=14, birth_month=4, birth_year=2001)
+    assert (profile.element, profile.branch, profile.life_path, profile.year_pillar) == ("Kim", "Tỵ", 3, "Tân Tỵ")
+    with pytest.raises(ValueError):
+        Profile(chat_id="1", name="A", birth_day=1, birth_month=1, birth_year=2000, element="Gió")
+
+
+def test_registry_loads_json_and_shares_pipelines(tmp_path):
+    path = tmp_path / "subscribers.json"
+    path.write_text(json.dumps([
+        {"chat_id": 1, "name": "A", "birth_day": 14, "birth_month": 4, "birth_year": 2001},
+        {"chat_id": 2, "name": "A", "birth_day": 14, "birth_month": 4, "birth_year": 2001},
+    ]), encoding="utf-8")
+    registry = SubscriberRegistry.load(str(path))
+    
+    first, second = registry.get("1"), registry.get(2)
+    assert first.chat_id == "1" and second.chat_id == "2"
+    assert get_pipeline(first) is get_pipeline(second)
@@ -0,0 +1,84 @@
+"""Sampling profiler (core.sampling) and /debug/profile"""
+
+import asyncio
+import threading
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from config.settings import settings
+from core.sampling import SamplingProfiler
+from main import HealthCheckServer
+
+
+def spin(stop):
+    while not stop.is_set():
+        sum(range(100))
+
+
+def _with_threads(body):
+    """Run body() while a busy thread and an idle thread are alive"""
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=spin, args=(stop,), name="busy-worker"),
+        threading.Thread(target=stop.wait, name="idle-sleeper")
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        return body()
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def test_folded_stacks_of_the_filtered_thread():
+    profiler = SamplingProfiler(rate_hz=200, thread_filter="busy")
+    _with_threads(lambda: profiler.run(0.3))
+    
+    assert profiler.samples > 10
+    lines = profiler.folded().splitlines()
+    stacks = {line.rsplit(" ", 1)[0]: int(line.rsplit(" ", 1)[1]) for line in lines}
+    # One stack per sample, rooted at the thread name, the busy function on it
+    assert sum(stacks.values()) == profiler.samples
+    assert all(stack.startswith("busy-worker;") for stack in stacks)
+    assert all(";spin (test_sampling.py:" in stack for stack in stacks)
+    # Most frequent first
+    counts = [int(line.rsplit(" ", 1)[1]) for line in lines]
+    assert counts == sorted(counts, reverse=True)
+    assert 0 <= profiler.overhead() < 1
+
+
+def test_idle_threads_can_be_left_out():
+    with_idle = SamplingProfiler(rate_hz=200, thread_filter="idle")
+    without_idle = SamplingProfiler(rate_hz=200, thread_filter="idle", include_idle=False)
+    
+    def body():
+        with_idle.run(0.1)
+        without_idle.run(0.1)
+    
+    _with_threads(body)
+    assert with_idle.stacks and all(stack.startswith("idle-sleeper;") for stack in with_idle.stacks)
+    assert not without_idle.stacks and without_idle.samples > 0
+
+
+def test_debug_profile_endpoint(monkeypatch):
+    server = HealthCheckServer(port=0)
+    
+    async def main():
+        async with TestClient(TestServer(server.app)) as client:
+            disabled = await client.get("/debug/profile?seconds=0.1")
+            monkeypatch.setattr(settings, "DEBUG_TOKEN", "dbg")
+            forbidden = await client.get("/debug/profile?seconds=0.1&token=nope")
+            invalid = await client.get("/debug/profile?seconds=0", headers={"X-Debug-Token": "dbg"})
+            profiled = await client.get(
+                "/debug/profile?seconds=0.2&rate=200&thread=MainThread", headers={"X-Debug-Token": "dbg"}
+            )
+            return disabled.status, forbidden.status, invalid.status, profiled.status, \
+                profiled.headers, await profiled.text()
+    
+    disabled, forbidden, invalid, status, headers, text = asyncio.run(main())
+    assert (disabled, forbidden, invalid, status) == (404, 403, 400, 200)
+    assert int(headers["X-Profile-Samples"]) > 0
+    # The event loop thread, waiting for the sampler while the endpoint runs
+    assert text and all(line.startswith("MainThread;") for line in text.splitlines())
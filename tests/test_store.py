@@ -0,0 +1,180 @@
+"""Persistent store and bulletin delivery log (bot.store, ForecastScheduler.send_daily_forecast)"""
+
+import asyncio
+import sqlite3
+import threading
+from datetime import timedelta
+
+import pytest
+
+from bot.scheduler import ForecastScheduler
+from bot.store import STATUS_FAILED, STATUS_SENT, ForecastStore
+from config.profiles import Profile, SubscriberRegistry
+from core.lunar_calendar import get_vietnam_datetime
+
+PROFILES = [
+    Profile(chat_id=str(chat_id), name=f"User {chat_id}", birth_day=chat_id, birth_month=5, birth_year=1990)
+    for chat_id in range(1, 5)
+]
+
+
+def _tomorrow_key():
+    return (get_vietnam_datetime() + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def test_writes_survive_a_restart(tmp_path):
+    path = str(tmp_path / "store.db")
+    store = ForecastStore(path, batch_size=1000)
+    store.put_forecast(("k",), "2024-01-01", "message")
+    store.record_delivery(1, "2024-01-02", True)
+    store.record_delivery(2, "2024-01-02", False)
+    # Reads see buffered writes
+    assert store.get_forecast(("k",), "2024-01-01") == "message"
+    assert store.delivered_chats("2024-01-02") == {"1"}
+    store.close()
+    
+    store = ForecastStore(path)
+    assert store.get_forecast(("k",), "2024-01-01") == "message"
+    assert store.delivered_chats("2024-01-02") == {"1"}
+    store.record_delivery(1, "2024-01-02", False)
+    store.record_delivery(2, "2024-01-02", True)
+    assert [row[:3] for row in store.deliveries("2024-01-02")] == [("1", STATUS_SENT, 2), ("2", STATUS_SENT, 2)]
+    store.close()
+
+
+def test_concurrent_writes_and_flushes_lose_nothing(tmp_path):
+    store = ForecastStore(str(tmp_path / "store.db"), batch_size=10 ** 6)
+    stop = threading.Event()
+    
+    def flusher():
+        while not stop.is_set():
+            store.flush()
+    
+    def writer(worker):
+        for i in range(500):
+            store.record_delivery(f"{worker}-{i}", "2024-01-01", True)
+    
+    flushing = threading.Thread(target=flusher)
+    flushing.start()
+    writers = [threading.Thread(target=writer, args=(worker,)) for worker in range(4)]
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    flushing.join()
+    
+    assert store.delivery_summary("2024-01-01") == {STATUS_SENT: 2000}
+    store.close()
+
+
+def test_failed_commit_keeps_the_buffer(tmp_path):
+    store = ForecastStore(str(tmp_path / "store.db"), batch_size=1000)
+    store.put_forecast(("k",), "2024-01-01", "message")
+    
+    connection = store.connection
+    
+    class Failing:
+        def __enter__(self):
+            raise OSError("disk full")
+        
+        def __exit__(self, *exc):
+            return False
+    
+    store.connection = Failing()
+    with pytest.raises(OSError):
+        store.record_delivery(1, "2024-01-01", True)
+    with pytest.raises(OSError):
+        store.flush()
+    store.connection = connection
+    
+    store.record_delivery(2, "2024-01-01", False)
+    assert store.delivery_summary("2024-01-01") == {STATUS_SENT: 1, STATUS_FAILED: 1}
+    assert store.forecasts_between(("k",), "2024-01-01", "2024-01-01") == [("2024-01-01", "message")]
+    store.close()
+
+
+def _committed_deliveries(path, date):
+    """Delivery rows another process would see (bypasses the store's buffer)"""
+    connection = sqlite3.connect(path)
+    try:
+        return dict(connection.execute("SELECT chat_id, status FROM deliveries WHERE date = ?", (date,)))
+    finally:
+        connection.close()
+
+
+def test_deliveries_are_committed_without_close_and_forecasts_stay_batched(tmp_path):
+    path = str(tmp_path / "store.db")
+    store = ForecastStore(path, batch_size=1000)
+    store.put_forecast(("k",), "2024-01-01", "message")
+    store.record_delivery(1, "2024-01-02", True)
+    store.record_delivery(2, "2024-01-02", False)
+    
+    assert _committed_deliveries(path, "2024-01-02") == {"1": STATUS_SENT, "2": STATUS_FAILED}
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT COUNT(*) FROM forecasts").fetchone() == (0,)
+    connection.close()
+    store.close()
+
+
+def test_bulletin_is_not_sent_twice(scheduler, fake_bot):
+    scheduler.registry = SubscriberRegistry(PROFILES)
+    asyncio.run(scheduler.send_daily_forecast())
+    assert sorted(chat_id for chat_id, _ in fake_bot.sent) == ["1", "2", "3", "4"]
+    
+    asyncio.run(scheduler.send_daily_forecast())
+    assert len(fake_bot.sent) == 4
+    
+    # A new process on the same database skips them too
+    scheduler.close()
+    restarted = ForecastScheduler(fake_bot)
+    restarted.registry = SubscriberRegistry(PROFILES)
+    try:
+        asyncio.run(restarted.send_daily_forecast())
+        assert len(fake_bot.sent) == 4
+        assert restarted.store.delivered_chats(_tomorrow_key()) == {"1", "2", "3", "4"}
+    finally:
+        restarted.executor.shutdown()
+        restarted.close()
+
+
+class SlowBot:
+    """Delivers queued messages one at a time, when told to"""
+    
+    def __init__(self):
+        self.pending = []
+    
+    async def send_message_to_user(self, message, chat_id=None):
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((chat_id, future))
+        return future
+
+
+def test_each_delivery_is_logged_as_it_completes(scheduler):
+    bot = SlowBot()
+    scheduler.telegram_bot = bot
+    scheduler.registry = SubscriberRegistry(PROFILES)
+    date_key = _tomorrow_key()
+    
+    async def main():
+        task = asyncio.create_task(scheduler.send_daily_forecast())
+        while len(bot.pending) < len(PROFILES):
+            await asyncio.sleep(0)
+        bot.pending[0][1].set_result(True)
+        bot.pending[1][1].set_result(False)
+        await asyncio.sleep(0)
+        # Committed, not just buffered: a crash now would not resend to chat 1
+        logged = _committed_deliveries(scheduler.store.path, date_key)
+        
+        # Shutdown in the middle of the run: the outstanding deliveries are not cancelled
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        bot.pending[2][1].set_result(True)
+        await asyncio.sleep(0)
+        return logged, bot.pending[3][1].cancelled()
+    
+    logged, cancelled = asyncio.run(main())
+    assert logged == {"1": STATUS_SENT, "2": STATUS_FAILED}
+    assert not cancelled
+    assert scheduler.store.delivered_chats(date_key) == {"1", "3"}
+    assert scheduler.store.delivery_summary(date_key) == {STATUS_SENT: 2, STATUS_FAILED: 1}
@@ -0,0 +1,124 @@
+"""Tracing spans and the sampled chain profiler (core.tracing)"""
+
+import json
+import os
+import pstats
+import sys
+import threading
+from datetime import datetime
+
+import pytest
+
+from agents.pipeline import AgentPipeline
+from config.profiles import Profile
+from core.tracing import NOOP_SPAN, TRACER, ChainProfiler, span
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    TRACER.configure(path)
+    yield path
+    TRACER.configure("")
+
+
+def _spans(path):
+    TRACER.flush()
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_disabled_tracing_is_a_noop():
+    assert not TRACER.enabled
+    assert span("anything", a=1) is NOOP_SPAN
+    with span("anything") as current:
+        current.set_attribute("b", 2)
+    assert TRACER.current() is None
+
+
+def test_agent_stages_nest_under_the_command(trace_file):
+    pipeline = AgentPipeline(Profile.from_settings())
+    with span("command", command="dubao") as command:
+        with span("run_agent_chain", source="computed"):
+            pipeline.run(datetime(2024, 3, 1))
+        command.set_attribute("chat_id", "1")
+    
+    spans = {record["name"]: record for record in _spans(trace_file)}
+    assert set(spans) == {"command", "run_agent_chain", "agent1", "agent2", "agent3", "agent4"}
+    
+    root, chain = spans["command"], spans["run_agent_chain"]
+    assert root["parent_id"] is None
+    assert root["attributes"] == {"command": "dubao", "chat_id": "1"}
+    assert chain["parent_id"] == root["span_id"]
+    for stage in ("agent1", "agent2", "agent3", "agent4"):
+        assert spans[stage]["parent_id"] == chain["span_id"]
+        assert spans[stage]["trace_id"] == root["trace_id"]
+        assert spans[stage]["attributes"] == {"dates": 1}
+    assert root["duration_ms"] >= chain["duration_ms"] >= sum(spans[f"agent{i}"]["duration_ms"] for i in range(1, 5))
+
+
+def test_failed_span_records_the_error(trace_file):
+    with pytest.raises(KeyError):
+        with span("lookup"):
+            raise KeyError("x")
+    with span("next"):
+        pass
+    
+    failed, following = _spans(trace_file)
+    assert failed["error"] == "KeyError"
+    # The failed span was closed: the next one is a new root
+    assert following["parent_id"] is None and following["trace_id"] != failed["trace_id"]
+    assert TRACER.status()["spans_written"] >= 2
+
+
+def test_chain_profiler_samples_and_dumps(tmp_path):
+    profiler = ChainProfiler()
+    
+    def job(n):
+        return sum(i * i for i in range(n))
+    
+    profiler.configure(0.0, str(tmp_path / "chain"), dump_every=2)
+    assert profiler.run(job, 10) == 285
+    assert profiler.profiled == 0 and profiler.dump() is None
+    
+    profiler.configure(1.0)
+    assert profiler.run(job, 1000) == job(1000)
+    assert not os.path.exists(profiler.path())
+    profiler.run(job, 1000)
+    
+    # Dumped after every second profiled job
+    assert profiler.profiled == 2
+    stats = pstats.Stats(profiler.path())
+    assert any(name == "job" for _, _, name in stats.stats)
+    assert profiler.status()["path"] == profiler.path()
+
+
+def test_spans_finished_from_threads_during_flushes_are_all_written(trace_file):
+    switch_interval = sys.getswitchinterval()
+    # Switch threads as often as possible, so finish() and flush() interleave
+    sys.setswitchinterval(1e-6)
+    stop = threading.Event()
+    
+    def flusher():
+        while not stop.is_set():
+            TRACER.flush()
+    
+    def worker(n):
+        for i in range(500):
+            with span("job", worker=n, i=i):
+                pass
+    
+    flushing = threading.Thread(target=flusher)
+    flushing.start()
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    try:
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+    finally:
+        stop.set()
+        flushing.join()
+        sys.setswitchinterval(switch_interval)
+    
+    assert len(_spans(trace_file)) == 2000
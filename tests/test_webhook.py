@@ -0,0 +1,69 @@
+"""Webhook mode on the shared aiohttp server (TelegramBot.handle_webhook / start)"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from telegram.ext import ExtBot
+
+from bot.scheduler import ForecastScheduler
+from bot.telegram_bot import TelegramBot
+from config.settings import settings
+
+UPDATE = {
+    "update_id": 1,
+    "message": {
+        "message_id": 1, "date": 0, "text": "/help",
+        "chat": {"id": 1, "type": "private"}
+    }
+}
+
+
+@pytest.fixture
+def webhook_settings(monkeypatch):
+    monkeypatch.setattr(settings, "TELEGRAM_WEBHOOK_URL", "https://example.test/")
+    monkeypatch.setattr(settings, "TELEGRAM_WEBHOOK_SECRET", "s3cret")
+
+
+def test_handle_webhook(webhook_settings):
+    bot = TelegramBot()
+    
+    async def main():
+        app = web.Application()
+        bot.register_webhook_route(app.router)
+        async with TestClient(TestServer(app)) as client:
+            path = settings.TELEGRAM_WEBHOOK_PATH
+            forbidden = await client.post(path, json=UPDATE, headers={"X-Telegram-Bot-Api-Secret-Token": "nope"})
+            bad = await client.post(path, data=b"{", headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"})
+            ok = await client.post(path, json=UPDATE, headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"})
+            return forbidden.status, bad.status, ok.status, bot.application.update_queue.qsize()
+    
+    assert asyncio.run(main()) == (403, 400, 200, 1)
+
+
+def test_webhook_registration_keeps_pending_updates(webhook_settings, monkeypatch):
+    calls = []
+    
+    async def set_webhook(self, **kwargs):
+        calls.append(kwargs)
+        return True
+    
+    async def noop(*args, **kwargs):
+        pass
+    
+    monkeypatch.setattr(ExtBot, "set_webhook", set_webhook)
+    monkeypatch.setattr(ForecastScheduler, "start", lambda self: None)
+    monkeypatch.setattr(ForecastScheduler, "stop", lambda self: None)
+    bot = TelegramBot()
+    for name in ("initialize", "start", "stop", "shutdown"):
+        monkeypatch.setattr(bot.application, name, noop)
+    
+    async def main():
+        await bot.start()
+        await bot.stop()
+    
+    asyncio.run(main())
+    assert calls[0]["url"] == "https://example.test" + settings.TELEGRAM_WEBHOOK_PATH
+    assert calls[0]["drop_pending_updates"] is False
+    assert calls[0]["secret_token"] == "s3cret"